@@ -1,17 +1,55 @@
 import sys
 import networkx as nx
-import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QLabel, \
     QMessageBox, QFileDialog
-import json
+
+from graph_core.edge_import import EdgeListError, parse_edge_list, read_edge_list_file
+from graph_core.euler import EulerReadiness, eulerian_tour, write_tour
+from graph_core.graph_io import FILE_FILTER, load_graph_file, save_graph_file
+from graph_core.graph_store import StoreMultiGraph
+from graph_core.layout import LayoutCache
+from graph_core.postman import route_inspection
+from graph_core.tracing import Tracer
+from graph_ui.edge_render import TextLabels, draw_multigraph_edges
+from graph_ui.jobs import JobRunner, JobStatusBar
+from graph_ui.redraw import Debouncer
+from graph_ui.result_table import TourTable
+from graph_ui.tracing import TracePanel, TracedCanvas
+
+# 状态栏中最多列出的奇度点个数
+ODD_SHOWN = 10
+# 不超过该步数的路线在结果栏中完整列出，更长的只显示概要，逐步内容在右侧列表中按需加载
+INLINE_STEPS = 50
+# 边数超过该值时不在图上标注顺序号，改由列表逐步查看
+EDGE_LABEL_LIMIT = 2000
 
 
 class EulerianPathApp(QWidget):
     def __init__(self):
         super().__init__()
-        self.graph = nx.MultiGraph()
+        # 建立在紧凑图存储上的多重图，平行边各占一个边编号
+        self.graph = StoreMultiGraph()
+        self.graph_version = 0  # 图每次变化时递增，用于判断缓存是否过期
+        self.layout_cache = LayoutCache()
+        # 布局任务最终给出的节点坐标及其图版本。LayoutCache 可能正被后台的布局任务使用，界面线程只读这里的坐标
+        self.pos = {}
+        self.pos_version = None
+        # 随加边实时更新的奇度点和连通分支，加载文件后在后台重建，重建期间为 None
+        self.readiness = EulerReadiness()
+        # 布局与欧拉环游计算放到后台线程，界面线程只负责绘制
+        # 记录每次操作各阶段的耗时，可在性能统计栏中查看或导出
+        self.tracer = Tracer()
+        self.jobs = JobRunner(self, tracer=self.tracer)
+        self.jobs.locked_changed.connect(self.set_editing_enabled)
+        # 连续加边时合并为一次重绘
+        self.redraw = Debouncer(self.update_graph, parent=self)
+        self.text_labels = TextLabels(fontsize=10, weight='bold')
+        # 当前显示的路线和各条边的绘制坐标（逐步查看时高亮用），图变化后清空
+        self.tour = None
+        self.edge_points = None
+        self.edge_pairs = None
+        self.step_background = None
         self.init_ui()
 
     def init_ui(self):
@@ -33,6 +71,15 @@ class EulerianPathApp(QWidget):
         self.add_edge_button = QPushButton('添加边', self)
         self.add_edge_button.clicked.connect(self.add_edge)
         input_layout.addWidget(self.add_edge_button)
+
+        # 批量导入边，每行 “起始节点,终止节点”
+        self.import_file_button = QPushButton('从文件导入边', self)
+        self.import_file_button.clicked.connect(self.import_edges_from_file)
+        input_layout.addWidget(self.import_file_button)
+
+        self.import_clipboard_button = QPushButton('从剪贴板导入边', self)
+        self.import_clipboard_button.clicked.connect(self.import_edges_from_clipboard)
+        input_layout.addWidget(self.import_clipboard_button)
         layout.addLayout(input_layout)
 
         # 按钮区域
@@ -40,6 +87,11 @@ class EulerianPathApp(QWidget):
         self.find_euler_button.clicked.connect(self.find_eulerian_circuit)
         layout.addWidget(self.find_euler_button)
 
+        # 图不能一笔画时，求重复经过部分最短的闭合路线（按边的 weight 属性计算长度）
+        self.find_postman_button = QPushButton('中国邮路（最短巡检路线）', self)
+        self.find_postman_button.clicked.connect(self.find_postman_route)
+        layout.addWidget(self.find_postman_button)
+
         self.load_button = QPushButton('加载图', self)
         self.load_button.clicked.connect(self.load_graph)
         layout.addWidget(self.load_button)
@@ -48,20 +100,56 @@ class EulerianPathApp(QWidget):
         self.save_button.clicked.connect(self.save_graph)
         layout.addWidget(self.save_button)
 
+        # 能否一笔画，编辑时实时更新
+        self.readiness_label = QLabel(self)
+        layout.addWidget(self.readiness_label)
+
         # 结果显示
         self.result_label = QLabel('结果：', self)
         layout.addWidget(self.result_label)
 
+        # 后台任务进度与取消
+        self.job_status = JobStatusBar(self.jobs, self)
+        layout.addWidget(self.job_status)
+        self.trace_panel = TracePanel(self.tracer, self)
+        layout.addWidget(self.trace_panel)
+
         # 图形可视化
-        self.fig, self.ax = plt.subplots(figsize=(6, 6))
-        self.canvas = FigureCanvas(self.fig)
-        layout.addWidget(self.canvas)
+        # 直接创建 Figure 而不经过 pyplot，启动时不必加载 pyplot 及其全局图形管理
+        self.fig = Figure(figsize=(6, 6))
+        self.ax = self.fig.subplots()
+        self.canvas = TracedCanvas(self.fig, self.tracer)
+        # 整图重绘后缓存背景，逐步查看时只重画高亮的边
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+
+        # 右侧为路线的逐步列表，选中一步即在图上高亮该边
+        view_layout = QHBoxLayout()
+        view_layout.addWidget(self.canvas, 3)
+        tour_layout = QVBoxLayout()
+        self.tour_table = TourTable(self)
+        self.tour_table.step_selected.connect(self.show_step)
+        tour_layout.addWidget(self.tour_table)
+        step_layout = QHBoxLayout()
+        self.prev_step_button = QPushButton('上一步', self)
+        self.prev_step_button.clicked.connect(lambda: self.tour_table.select_step(self.tour_table.current_step() - 1))
+        step_layout.addWidget(self.prev_step_button)
+        self.next_step_button = QPushButton('下一步', self)
+        self.next_step_button.clicked.connect(lambda: self.tour_table.select_step(self.tour_table.current_step() + 1))
+        step_layout.addWidget(self.next_step_button)
+        tour_layout.addLayout(step_layout)
+        self.export_tour_button = QPushButton('导出路线', self)
+        self.export_tour_button.clicked.connect(self.export_tour)
+        tour_layout.addWidget(self.export_tour_button)
+        view_layout.addLayout(tour_layout, 1)
+        layout.addLayout(view_layout)
 
         self.setLayout(layout)
 
+        self.show_readiness()
         self.clear_plots()
 
     def add_edge(self):
+        self.tracer.action('添加边')
         start_node = self.start_node_input.text().strip()
         end_node = self.end_node_input.text().strip()
 
@@ -70,153 +158,252 @@ class EulerianPathApp(QWidget):
             return
 
         self.graph.add_edge(start_node, end_node)
+        self.graph_version += 1
+        self.invalidate_layout([start_node, end_node])
+        self.readiness.add_edge(start_node, end_node)
+        self.show_readiness()
         self.start_node_input.clear()
         self.end_node_input.clear()
-        self.update_graph()
+        self.redraw.request()
+
+    def import_edges_from_file(self):
+        filename, _ = QFileDialog.getOpenFileName(self, '导入边列表', '', '边列表文件 (*.csv *.tsv *.txt);;所有文件 (*)')
+        if filename:
+            self.import_edges(filename=filename)
+
+    def import_edges_from_clipboard(self):
+        self.import_edges(QApplication.clipboard().text())
+
+    def import_edges(self, text=None, filename=None):
+        # 整体校验后一次性加入图中，只触发一次重绘；给出 filename 时从文件读取，读取失败与格式错误一样提示
+        self.tracer.action('导入边')
+        try:
+            if filename is not None:
+                text = read_edge_list_file(filename)
+            heads, tails, _ = parse_edge_list(text)
+        except EdgeListError as e:
+            QMessageBox.warning(self, '导入失败', str(e))
+            return
+
+        self.graph.add_edges_from(zip(heads, tails))
+        self.graph_version += 1
+        self.invalidate_layout(set(heads) | set(tails))
+        for u, v in zip(heads, tails):
+            self.readiness.add_edge(u, v)
+        self.show_readiness()
+        self.redraw.request()
+
+    def set_editing_enabled(self, locked):
+        # 读取图的后台任务运行期间禁止修改图；布局任务在图的副本上计算，不影响修改
+        for button in (self.add_edge_button, self.import_file_button, self.import_clipboard_button, self.load_button,
+                       self.save_button):
+            button.setEnabled(not locked)
+
+    def show_readiness(self):
+        state = self.readiness
+        if state is None:
+            self.readiness_label.setText('正在统计奇度点和连通分支……')
+            return
+        if not state.components:
+            self.readiness_label.setText('图中还没有边')
+            return
+        verdict = {'circuit': '有欧拉环路', 'path': '有欧拉路径'}.get(state.kind, '不能一笔画')
+        odd = sorted(state.odd, key=str)
+        shown = '、'.join(map(str, odd[:ODD_SHOWN])) + ('等' if len(odd) > ODD_SHOWN else '')
+        text = f'{verdict}：奇度点 {len(odd)} 个'
+        if odd:
+            text += f'（{shown}）'
+        self.readiness_label.setText(text + f'，连通分支 {state.components} 个')
+
+    def set_readiness(self, state):
+        self.readiness = state
+        self.show_readiness()
 
     def find_eulerian_circuit(self):
-        if not nx.is_eulerian(self.graph):
-            QMessageBox.warning(self, '不是欧拉图', '此图不是一个欧拉图，无法完成一笔画！')
+        # 在后台线程中计算，再次点击会取代尚未完成的计算；已知不能一笔画时直接提示，不再遍历图
+        self.tracer.action('查找欧拉环游')
+        if self.readiness is not None and self.readiness.kind is None:
+            self.show_eulerian_circuit(None)
             return
+        self.jobs.submit('circuit', self.compute_eulerian_circuit, on_result=self.show_eulerian_circuit,
+                         on_error=self.show_circuit_error)
 
-        try:
-            eulerian_circuit = list(nx.eulerian_circuit(self.graph))
-            result = ''
-            # 使用字典存储每条边的多个顺序标记
-            edge_labels = {}  # 存储边的标签，值为列表
-            for idx, (u, v) in enumerate(eulerian_circuit):
-                # 按字母顺序存储边（确保唯一性）
-                u, v = sorted((u, v))
-                if (u, v) not in edge_labels:
-                    edge_labels[(u, v)] = []
-                edge_labels[(u, v)].append(idx + 1)  # 使用列表来存储顺序号
-            result = ' -> '.join(u for u, v in eulerian_circuit)
-            self.result_label.setText('欧拉环路：' + result + ' -> ' + eulerian_circuit[0][0])
-            # 更新图形显示，传递高亮边和边标签
-            self.update_graph_with_labels(eulerian_circuit, edge_labels)
-        except nx.NetworkXError as e:
-            QMessageBox.warning(self, '错误', f'计算欧拉环游时出错：{e}')
+    def compute_eulerian_circuit(self, progress=None):
+        # 算法在 graph_core.euler 中，不依赖界面；恰有两个奇度点时得到的是欧拉路径
+        return eulerian_tour(self.graph, progress)
 
-    def load_graph(self):
-        filename, _ = QFileDialog.getOpenFileName(self, '打开图文件', '', 'JSON 文件 (*.json)')
-        if filename:
-            try:
-                with open(filename, 'r') as f:
-                    data = json.load(f)
+    def show_eulerian_circuit(self, tour):
+        if tour is None:
+            QMessageBox.warning(self, '无法一笔画', '此图既没有欧拉环路也没有欧拉路径，无法完成一笔画！'
+                                                    '可使用“中国邮路”求重复经过最少的路线。')
+            return
+
+        kind = '欧拉环路' if tour.closed else '欧拉路径'
+        self.show_tour(tour, kind)
+
+    def find_postman_route(self):
+        self.tracer.action('中国邮路')
+        self.jobs.submit('circuit', self.compute_postman_route, on_result=self.show_postman_route,
+                         on_error=self.show_circuit_error)
 
-                    # 将图转换为多重图
-                    G_multigraph = nx.MultiGraph()
+    def compute_postman_route(self, progress=None):
+        return route_inspection(self.graph, progress=progress)
+
+    def show_postman_route(self, route):
+        if route is None:
+            QMessageBox.warning(self, '无法巡检', '图中的边不连通，不存在经过所有边的闭合路线！')
+            return
 
-                    # 添加节点
-                    for node in data['nodes']:
-                        G_multigraph.add_node(node['id'])
+        quality = '最优' if route.exact else '近似'
+        self.show_tour(route, f'中国邮路（{quality}，总长 {route.cost:g}，重复经过 {route.extra_cost:g}）')
+
+    def show_tour(self, tour, title):
+        # 长路线不拼接成一个大字符串，只显示概要
+        if len(tour) <= INLINE_STEPS:
+            self.result_label.setText(f'{title}：' + ' -> '.join(tour.nodes()))
+        else:
+            start, _, _ = tour.step(0)
+            _, end, _ = tour.step(len(tour) - 1)
+            self.result_label.setText(f'{title}：共 {len(tour)} 步，{start} -> … -> {end}')
+        self.tour = tour
+        self.tour_table.set_tour(tour)
+        # 更新图形显示，边上标出经过的顺序（重复经过的边标出每一次的顺序号）
+        self.update_graph_with_labels(tour)
+
+    def show_step(self, k):
+        # 高亮第 k 步经过的边，并在这一步的终点画一个标记
+        if self.tour is None or self.edge_points is None:
+            return
+        _, _, e = self.tour.step(k)
+        line = self.edge_points[e]
+        # 边的坐标按端点编号从小到大排列，终点决定标记画在哪一端
+        end = line[-1] if self.edge_pairs[e][1] == self.tour.node_ids[k + 1] else line[0]
+        self.step_line.set_data(line[:, 0], line[:, 1])
+        self.step_marker.set_data([end[0]], [end[1]])
+        self.blit_step()
+
+    def add_step_artists(self):
+        # ax.clear() 会移除高亮对象，每次整图绘制后重新创建；animated 的对象不参与整图绘制，由 blit_step 单独绘制
+        self.step_line, = self.ax.plot([], [], color='red', linewidth=3, zorder=4, animated=True)
+        self.step_marker, = self.ax.plot([], [], 'o', color='red', markersize=12, zorder=5, animated=True)
+
+    def on_draw(self, event):
+        self.step_background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.step_line)
+        self.ax.draw_artist(self.step_marker)
+
+    def blit_step(self):
+        if self.step_background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.step_background)
+        self.ax.draw_artist(self.step_line)
+        self.ax.draw_artist(self.step_marker)
+        self.canvas.blit(self.ax.bbox)
+
+    def clear_tour(self):
+        self.tour = None
+        self.edge_points = None
+        self.edge_pairs = None
+        self.tour_table.set_tour(None)
+
+    def export_tour(self):
+        self.tracer.action('导出路线')
+        if self.tour is None:
+            QMessageBox.warning(self, '无法导出', '请先查找欧拉环游或中国邮路！')
+            return
+        filename, _ = QFileDialog.getSaveFileName(self, '导出路线', 'tour.csv', 'CSV 文件 (*.csv)')
+        if filename:
+            # 在后台分段写出，不在内存中生成整条路线的文本；路线自带节点名，不读取图，导出期间可以继续修改图
+            self.jobs.submit('export', write_tour, self.tour, filename, locks=False,
+                             on_result=lambda count: QMessageBox.information(self, '成功', f'已导出 {count} 步路线！'),
+                             on_error=lambda e: QMessageBox.warning(self, '错误', f'导出路线失败：{e}'))
 
-                    # 添加边，确保多重边被添加
-                    for link in data['links']:
-                        G_multigraph.add_edge(link['source'], link['target'])
-                    self.graph = G_multigraph
-                    self.update_graph()
-            except Exception as e:
-                QMessageBox.warning(self, '错误', f'加载图失败：{e}')
+    def show_circuit_error(self, error):
+        QMessageBox.warning(self, '错误', f'计算欧拉环游时出错：{error}')
+
+    def load_graph(self):
+        self.tracer.action('加载图')
+        filename, _ = QFileDialog.getOpenFileName(self, '打开图文件', '', FILE_FILTER)
+        if filename:
+            # 将图转换为无向多重图，确保多重边被添加；有向图文件的每条边按无向边读入
+            self.jobs.submit('file', load_graph_file, filename, multigraph=True, directed=False, on_result=self.set_graph,
+                             on_error=lambda e: QMessageBox.warning(self, '错误', f'加载图失败：{e}'))
+
+    def set_graph(self, graph):
+        self.graph = graph
+        self.graph_version += 1
+        self.layout_cache.invalidate()
+        self.readiness = None
+        self.show_readiness()
+        self.jobs.submit('readiness', EulerReadiness.from_graph, graph, on_result=self.set_readiness)
+        self.update_graph()
 
     def save_graph(self):
-        filename, _ = QFileDialog.getSaveFileName(self, '保存图文件', '', 'JSON 文件 (*.json)')
+        self.tracer.action('保存图')
+        filename, _ = QFileDialog.getSaveFileName(self, '保存图文件', '', FILE_FILTER)
         if filename:
-            try:
-                data = nx.node_link_data(self.graph)
-                with open(filename, 'w') as f:
-                    json.dump(data, f)
-                QMessageBox.information(self, '成功', '图已成功保存！')
-            except Exception as e:
-                QMessageBox.warning(self, '错误', f'保存图失败：{e}')
-
-    def update_graph_with_labels(self, highlight_edges, edge_labels):
+            self.jobs.submit('file', save_graph_file, self.graph, filename,
+                             on_result=lambda _: QMessageBox.information(self, '成功', '图已成功保存！'),
+                             on_error=lambda e: QMessageBox.warning(self, '错误', f'保存图失败：{e}'))
+
+    def update_graph_with_labels(self, tour):
+        if self.pos_version != self.graph_version:
+            # 布局尚未完成时不重画，路线只在列表中显示
+            return
         self.ax.clear()
         self.ax.set_axis_off()  # Hide axis and ticks
-        pos = nx.spring_layout(self.graph)  # 使用布局算法定位节点
+        pos = self.pos  # 使用布局任务给出的坐标定位节点
 
         nx.draw_networkx_nodes(
             self.graph, pos, node_size=700, node_color='lightblue', ax=self.ax
         )
-        nx.draw_networkx_labels(self.graph, pos, font_size=10, font_weight='bold', ax=self.ax)
-
-        # 绘制多重边，去掉偶数条边时的中间直连线
-        for u, v in edge_labels:
-            edges = list(self.graph[u][v].values())  # 获取多重边信息
-            edge_count = len(edges)
-            shunxu_index = 0
-            for idx in range(edge_count):
-
-                offset = 0.2 * (idx - (edge_count - 1) / 2)  # 偏移值，确保偶数条边对称显示
-                connection_style = f'arc3,rad={offset}'  # 设置弧线的弯曲度
-
-                nx.draw_networkx_edges(
-                    self.graph, pos,
-                    arrows=True,
-                    edgelist=[(u, v)],
-                    edge_color='gray',
-                    style='solid',
-                    ax=self.ax,
-                    connectionstyle=connection_style
-                )
-
-                edge_label = edge_labels.get((u, v), edge_labels.get((u, v), None))[shunxu_index]
-                shunxu_index += 1
-                # 如果有序号，显示它
-                if edge_label:
-                    # 获取当前边的所有位置
-                    edge_count = len(self.graph[u][v])
-                    # 计算边的显示位置
-                    label_pos = (pos[u] + pos[v]) / 2 + offset * 0.1  # 标签位置偏移
-
-                    # 通过稍微调整偏移量，避免标签偏离路径
-                    label_pos_with_offset = label_pos + np.array([offset * 0.1, 0])  # 可以根据实际情况调整
-
-                    # 手动为每条边添加标签
-                    self.ax.text(
-                        label_pos_with_offset[0], label_pos_with_offset[1],
-                        str(edge_label),
-                        color='blue',
-                        fontsize=10,
-                        fontweight='bold',
-                        ha='center', va='center'  # 确保标签居中
-                    )
+        self.text_labels.draw_node_labels(self.ax, self.graph, pos)
+
+        # 绘制多重边（同一束平行边只处理一次，全部边合并为一个图形对象），去掉偶数条边时的中间直连线
+        self.edge_pairs, self.edge_points, midpoints = draw_multigraph_edges(self.ax, self.graph, pos)
+
+        # 绘制和求一笔画都按 graph.edges() 的顺序给边编号，每条边的中点直接标上它的顺序号，所有标记一次性批量绘制
+        if self.graph.number_of_edges() <= EDGE_LABEL_LIMIT:
+            self.text_labels.draw(self.ax, midpoints, tour.edge_labels(), color='blue')
+        self.add_step_artists()
         self.canvas.draw()
 
+    def invalidate_layout(self, nodes):
+        # 修改图后正在计算的布局对应旧图，直接作废，由合并后的重绘重新提交
+        self.layout_cache.invalidate(nodes)
+        self.jobs.cancel('layout')
+
     def update_graph(self, highlight_edges=None):
+        # 布局在后台基于图的副本计算（期间仍可修改图），完成后回到界面线程绘制；大图布局的收敛过程也随时重画
+        self.jobs.submit('layout', self.layout_cache.positions, self.graph.copy(), self.graph_version, locks=False,
+                         on_result=lambda pos, version=self.graph_version: self.set_positions(pos, version),
+                         on_partial=self.draw_graph)
+
+    def set_positions(self, pos, version):
+        self.pos, self.pos_version = pos, version
+        self.draw_graph(pos)
+
+    def draw_graph(self, pos):
+        # 图已变化，之前的路线不再有效
+        self.clear_tour()
         self.ax.clear()
         self.ax.set_axis_off()  # Hide axis and ticks
 
-        pos = nx.spring_layout(self.graph)  # 使用布局算法定位节点
-
         nx.draw_networkx_nodes(
             self.graph, pos, node_size=700, node_color='lightblue', ax=self.ax
         )
-        nx.draw_networkx_labels(self.graph, pos, font_size=10, font_weight='bold', ax=self.ax)
-        # 绘制多重边，去掉偶数条边时的中间直连线
-        for u, v in self.graph.edges():
-            edges = list(self.graph[u][v].values())  # 获取多重边信息
-            edge_count = len(edges)
-
-            for idx in range(edge_count):
-                offset = 0.2 * (idx - (edge_count - 1) / 2)  # 偏移值，确保偶数条边对称显示
-                connection_style = f'arc3,rad={offset}'  # 设置弧线的弯曲度
-
-                nx.draw_networkx_edges(
-                    self.graph, pos,
-                    arrows=True,
-                    edgelist=[(u, v)],
-                    edge_color='gray',
-                    style='solid',
-                    ax=self.ax,
-                    connectionstyle=connection_style
-                )
+        self.text_labels.draw_node_labels(self.ax, self.graph, pos)
+        # 绘制多重边（同一束平行边只处理一次，全部边合并为一个图形对象），去掉偶数条边时的中间直连线
+        draw_multigraph_edges(self.ax, self.graph, pos)
+        self.add_step_artists()
 
         self.canvas.draw()
 
     def clear_plots(self):
         self.ax.clear()
         self.ax.set_axis_off()  # Hide axis and ticks
+        self.add_step_artists()
         self.canvas.draw()
 
 
@@ -0,0 +1,48 @@
+# 三个图论软件共用的计算模块（布局、最短路、欧拉环游、中国邮路、边着色等），不依赖 Qt 界面。
+# 下列名称在首次访问时才导入所在的子模块，import graph_core 本身不会加载 NumPy、NetworkX
+import importlib
+
+_EXPORTS = {
+    'CSRGraph': 'graph_core.shortest_path',
+    'ChromaticIndex': 'graph_core.chromatic_index',
+    'EdgeColoring': 'graph_core.edge_coloring',
+    'EulerReadiness': 'graph_core.euler',
+    'EulerTour': 'graph_core.euler',
+    'GraphArrays': 'graph_core.graph_io',
+    'GraphStore': 'graph_core.graph_store',
+    'LandmarkIndex': 'graph_core.landmarks',
+    'LayoutCache': 'graph_core.layout',
+    'ManyPaths': 'graph_core.shortest_path',
+    'PostmanTour': 'graph_core.postman',
+    'ShortestPathEngine': 'graph_core.shortest_path',
+    'StoreGraph': 'graph_core.graph_store',
+    'StoreMultiGraph': 'graph_core.graph_store',
+    'Tracer': 'graph_core.tracing',
+    'chromatic_index': 'graph_core.chromatic_index',
+    'eulerian_tour': 'graph_core.euler',
+    'greedy_edge_coloring': 'graph_core.edge_coloring',
+    'load_graph_file': 'graph_core.graph_io',
+    'minimize_edge_colors': 'graph_core.edge_coloring',
+    'misra_gries_edge_coloring': 'graph_core.edge_coloring',
+    'multilevel_layout': 'graph_core.force_layout',
+    'parse_edge_list': 'graph_core.edge_import',
+    'route_inspection': 'graph_core.postman',
+    'save_graph_file': 'graph_core.graph_io',
+    'store_of': 'graph_core.graph_store',
+    'write_tour': 'graph_core.euler',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,161 @@
+import csv
+import json
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from graph_core.shortest_path import CSRGraph, dijkstra, path_from_pred
+
+# 每个进程池任务包含的源点分组数，减少进程间通信次数
+GROUPS_PER_TASK = 64
+
+_worker_csr = None
+
+
+def read_queries(filename, index, delimiter=','):
+    # 逐行读取 (起点, 终点) 查询，立即映射为整数编号存入数组，不保留节点名字符串。
+    # 以 # 开头的行和空行忽略；图中不存在的节点单独收集返回。
+    sources, targets, unknown = [], [], []
+    with open(filename, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.reader(f, delimiter=delimiter):
+            if not row or row[0].startswith('#'):
+                continue
+            if len(row) < 2:
+                raise ValueError(f'查询格式错误：{row}')
+            s, t = row[0].strip(), row[1].strip()
+            if s in index and t in index:
+                sources.append(index[s])
+                targets.append(index[t])
+            else:
+                unknown.append((s, t))
+    return np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64), unknown
+
+
+def group_by_source(sources, targets):
+    # 按起点分组，每组只需一次单源搜索
+    order = np.argsort(sources, kind='stable')
+    sources, targets = sources[order], targets[order]
+    bounds = np.flatnonzero(np.diff(sources)) + 1
+    starts = np.concatenate([[0], bounds]).astype(np.int64)
+    ends = np.concatenate([bounds, [len(sources)]]).astype(np.int64)
+    for lo, hi in zip(starts.tolist(), ends.tolist()):
+        yield int(sources[lo]), targets[lo:hi]
+
+
+class SharedCSR:
+    # 把 CSRGraph 的三个数组放入共享内存，子进程只读映射，不复制图数据
+
+    ARRAYS = ('offsets', 'targets', 'weights')
+
+    def __init__(self, csr):
+        self.blocks = []
+        self.spec = {'num_nodes': csr.num_nodes, 'directed': csr.directed}
+        for name in self.ARRAYS:
+            array = getattr(csr, name)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+            self.blocks.append(block)
+            self.spec[name] = (block.name, array.shape, array.dtype.str)
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    @staticmethod
+    def attach(spec):
+        blocks, arrays = [], {}
+        for name in SharedCSR.ARRAYS:
+            block_name, shape, dtype = spec[name]
+            block = shared_memory.SharedMemory(name=block_name)
+            arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+            blocks.append(block)
+        # 子进程只需要整数编号，节点名表留在主进程
+        csr = CSRGraph(range(spec['num_nodes']), arrays['offsets'], arrays['targets'], arrays['weights'],
+                       spec['directed'])
+        csr.blocks = blocks  # 保持共享内存映射的引用
+        return csr
+
+
+def _init_worker(spec):
+    global _worker_csr
+    _worker_csr = SharedCSR.attach(spec)
+
+
+def _solve_groups(tasks, csr=None, with_paths=False):
+    csr = csr if csr is not None else _worker_csr
+    results = []
+    for source, targets in tasks:
+        dist, pred = dijkstra(csr, source, targets=targets.tolist())
+        dists = [dist[t] for t in targets.tolist()]
+        paths = None
+        if with_paths:
+            paths = [path_from_pred(pred, source, t) if dist[t] != math.inf else []
+                     for t in targets.tolist()]
+        results.append((source, targets, dists, paths))
+    return results
+
+
+def _solve_task(args):
+    tasks, with_paths = args
+    return _solve_groups(tasks, with_paths=with_paths)
+
+
+def solve_batch(csr, sources, targets, workers=None, with_paths=False):
+    # 逐组产出 (源点编号, 终点编号数组, 距离列表, 路径列表或 None)，结果按起点分组而非输入顺序
+    groups = group_by_source(sources, targets)
+    workers = workers or multiprocessing.cpu_count()
+
+    def chunks():
+        chunk = []
+        for group in groups:
+            chunk.append(group)
+            if len(chunk) == GROUPS_PER_TASK:
+                yield chunk, with_paths
+                chunk = []
+        if chunk:
+            yield chunk, with_paths
+
+    if workers <= 1:
+        for tasks, _ in chunks():
+            yield from _solve_groups(tasks, csr=csr, with_paths=with_paths)
+        return
+
+    shared = SharedCSR(csr)
+    try:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(shared.spec,)) as pool:
+            for results in pool.imap_unordered(_solve_task, chunks()):
+                yield from results
+    finally:
+        shared.close()
+
+
+def write_results(results, nodes, out, fmt='csv', unknown=()):
+    # 以流式方式写出结果，每组写完即释放；不可达的距离记为 inf，图中不存在的节点距离留空
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(['source', 'target', 'distance', 'path'])
+        for source, targets, dists, paths in results:
+            for i, t in enumerate(targets.tolist()):
+                path = ' '.join(str(nodes[p]) for p in paths[i]) if paths is not None else ''
+                writer.writerow([nodes[source], nodes[t], dists[i], path])
+                count += 1
+        for s, t in unknown:
+            writer.writerow([s, t, '', ''])
+    else:
+        for source, targets, dists, paths in results:
+            for i, t in enumerate(targets.tolist()):
+                record = {'source': nodes[source], 'target': nodes[t],
+                          'distance': dists[i] if dists[i] != math.inf else None}
+                if paths is not None:
+                    record['path'] = [nodes[p] for p in paths[i]]
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                count += 1
+        for s, t in unknown:
+            out.write(json.dumps({'source': s, 'target': t, 'distance': None, 'error': 'unknown node'},
+                                 ensure_ascii=False) + '\n')
+    return count
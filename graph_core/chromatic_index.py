@@ -0,0 +1,254 @@
+import multiprocessing
+import queue
+import random
+import time
+
+from graph_core.edge_coloring import EdgeColoring, max_degree
+from graph_core.progress import report
+
+# 简单图的边色数（chromatic index）。由 Vizing 定理，边色数只可能是 Δ 或 Δ + 1：
+#   二部图由 Kőnig 定理恰为 Δ，直接构造；
+#   Misra–Gries 构造出 Δ 色方案，或存在“过满”的连通分支（边数 > Δ·⌊节点数/2⌋）时，不必搜索即可确定；
+#   再用步数有限的 Kempe 链局部搜索把 Δ + 1 色方案降为 Δ 色（大多数图在这一步得出结论）；
+#   否则用 DSatur 顺序的分支限界搜索 Δ 色方案，多个进程以不同的随机种子同时搜索，任一进程找到方案或穷尽搜索即结束。
+# 到达时间预算仍未确定时，返回已有的 Δ + 1 色方案和已证明的下界 Δ
+
+# 默认时间预算（秒）
+TIME_BUDGET = 10.0
+# 搜索每扩展多少个结点检查一次时间和取消
+CHECK_INTERVAL = 256
+# 局部搜索的步数上限为 该系数 × 边数 + LOCAL_MOVES（Δ 色可行的随机图通常只需约 0.1 × 边数 步）
+LOCAL_MOVES_PER_EDGE = 20
+LOCAL_MOVES = 1000
+
+
+class ChromaticIndex:
+    # 求解结果：edge_colors 为按 graph.edges() 端点顺序的 {边: 颜色编号}，num_colors 为其颜色数（上界），
+    # lower_bound 为已证明的下界，method 说明结论的来源
+    def __init__(self, edge_colors, num_colors, lower_bound, method, elapsed):
+        self.edge_colors = edge_colors
+        self.num_colors = num_colors
+        self.lower_bound = lower_bound
+        self.method = method
+        self.elapsed = elapsed
+
+    @property
+    def exact(self):
+        return self.num_colors == self.lower_bound
+
+
+def _components(n, edges):
+    # 各连通分支的 (节点数, 边数)，只统计有边的节点
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for u, v in edges:
+        ru, rv = find(u), find(v)
+        if ru != rv:
+            parent[ru] = rv
+    nodes, sizes = {}, {}
+    for u, v in edges:
+        r = find(u)
+        sizes[r] = sizes.get(r, 0) + 1
+    for x in {x for edge in edges for x in edge}:
+        r = find(x)
+        nodes[r] = nodes.get(r, 0) + 1
+    return [(nodes[r], sizes[r]) for r in sizes]
+
+
+def _is_bipartite(n, edges):
+    adjacency = [[] for _ in range(n)]
+    for u, v in edges:
+        adjacency[u].append(v)
+        adjacency[v].append(u)
+    side = [-1] * n
+    for start in range(n):
+        if side[start] >= 0:
+            continue
+        side[start] = 0
+        stack = [start]
+        while stack:
+            x = stack.pop()
+            for y in adjacency[x]:
+                if side[y] < 0:
+                    side[y] = side[x] ^ 1
+                    stack.append(y)
+                elif side[y] == side[x]:
+                    return False
+    return True
+
+
+def search_coloring(n, edges, delta, seed=0, deadline=None, tick=None):
+    # 分支限界判断 edges 能否用 delta 种颜色着色。每次选择两端已用颜色最多（饱和度最大）的未着色边，
+    # 依次尝试可用颜色，无颜色可用时回溯。度为 delta 的节点上的边必然用到全部颜色，预先染成 0..delta-1 以消除颜色对称性。
+    # seed 不为 0 时饱和度相同的边随机排序，不同种子的搜索路径不同。
+    # 返回 ('found', 各边颜色列表)、('exhausted', None)（已证明不可行）或 ('timeout', None)
+    m = len(edges)
+    rng = random.Random(seed)
+    incident = [[] for _ in range(n)]
+    for e, (u, v) in enumerate(edges):
+        incident[u].append(e)
+        incident[v].append(e)
+    tie = [len(incident[u]) + len(incident[v]) + (rng.random() if seed else 0.0) for u, v in edges]
+    color = [-1] * m
+    used = [0] * n
+    full = (1 << delta) - 1
+
+    def assign(e, c):
+        u, v = edges[e]
+        color[e] = c
+        used[u] |= 1 << c
+        used[v] |= 1 << c
+
+    hub = max(range(n), key=lambda x: len(incident[x]))
+    for c, e in enumerate(incident[hub]):
+        assign(e, c)
+    uncolored = {e for e in range(m) if color[e] < 0}
+
+    def choose():
+        best, best_key = -1, None
+        for e in uncolored:
+            u, v = edges[e]
+            key = ((used[u] | used[v]).bit_count(), tie[e])
+            if best_key is None or key > best_key:
+                best, best_key = e, key
+        u, v = edges[best]
+        return best, full & ~(used[u] | used[v])
+
+    stack = []
+    if not uncolored:
+        return 'found', color
+    e, options = choose()
+    expanded = 0
+    while True:
+        expanded += 1
+        if not expanded % CHECK_INTERVAL:
+            if tick is not None:
+                tick()
+            if deadline is not None and time.perf_counter() > deadline:
+                return 'timeout', None
+        if options:
+            low = options & -options
+            assign(e, low.bit_length() - 1)
+            stack.append((e, options ^ low))
+            uncolored.discard(e)
+            if not uncolored:
+                return 'found', color
+            e, options = choose()
+        else:
+            if not stack:
+                return 'exhausted', None
+            e, options = stack.pop()
+            u, v = edges[e]
+            bit = ~(1 << color[e])
+            used[u] &= bit
+            used[v] &= bit
+            color[e] = -1
+            uncolored.add(e)
+
+
+class _Stopped(Exception):
+    # 其他进程已得出结论，本进程的搜索提前结束
+    pass
+
+
+def _portfolio_worker(n, edges, delta, seed, seconds, stop, results):
+    def tick():
+        if stop.is_set():
+            raise _Stopped()
+    try:
+        results.put((seed,) + search_coloring(n, edges, delta, seed, time.perf_counter() + seconds, tick))
+    except _Stopped:
+        pass
+
+
+def _portfolio(n, edges, delta, seconds, workers, progress):
+    # 多个进程以不同种子同时搜索，第一个得出结论（找到方案或穷尽搜索）的进程决定结果，其余进程随即停止。
+    # 使用 spawn 方式启动子进程：调用方常在带 Qt 线程的进程中，fork 不安全
+    if workers <= 1:
+        started = time.perf_counter()
+        return search_coloring(n, edges, delta, 0, started + seconds,
+                               lambda: report(progress, (time.perf_counter() - started) / seconds, '正在搜索 Δ 色方案'))
+
+    context = multiprocessing.get_context('spawn')
+    stop, results = context.Event(), context.Queue()
+    processes = [context.Process(target=_portfolio_worker, args=(n, edges, delta, seed, seconds, stop, results),
+                                 daemon=True) for seed in range(workers)]
+    for process in processes:
+        process.start()
+    started = time.perf_counter()
+    outcome = ('timeout', None)
+    try:
+        pending = workers
+        while pending:
+            report(progress, min((time.perf_counter() - started) / seconds, 1.0), '正在搜索 Δ 色方案')
+            try:
+                _, status, colors = results.get(timeout=0.2)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+            pending -= 1
+            if status != 'timeout':
+                outcome = (status, colors)
+                break
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+    return outcome
+
+
+def chromatic_index(graph, time_budget=TIME_BUDGET, workers=None, progress=None):
+    started = time.perf_counter()
+    coloring = EdgeColoring()
+    for u, v in graph.edges():
+        if u == v:
+            raise ValueError(f'节点 {u} 上有自环，无法进行边着色。')
+        coloring.node(u)
+        coloring.node(v)
+    index = coloring.index
+    edges = [(index[u], index[v]) for u, v in graph.edges()]
+    n, delta = len(coloring.names), max_degree(graph)
+
+    def finish(edge_colors, num_colors, lower_bound, method):
+        return ChromaticIndex(edge_colors, num_colors, lower_bound, method, time.perf_counter() - started)
+
+    if not edges:
+        return finish({}, 0, 0, '图中没有边')
+    if _is_bipartite(n, edges):
+        report(progress, 0.0, '正在构造 Kőnig 着色')
+        coloring.max_degree = delta
+        for u, v in edges:
+            coloring.insert_bipartite(u, v)
+        return finish(coloring.edge_colors(graph), delta, delta, '二部图（Kőnig 定理）')
+
+    report(progress, 0.0, '正在进行 Misra–Gries 着色')
+    upper = EdgeColoring.from_graph(graph)
+    best = upper.edge_colors(graph)
+    if upper.num_colors <= delta:
+        return finish(best, delta, delta, 'Misra–Gries 构造出 Δ 色方案')
+    if any(size > delta * (nodes // 2) for nodes, size in _components(n, edges)):
+        return finish(best, delta + 1, delta + 1, '存在过满的连通分支')
+    report(progress, 0.0, '正在进行 Kempe 链局部搜索')
+    if upper.reduce_colors(delta, started + time_budget, max_moves=LOCAL_MOVES_PER_EDGE * len(edges) + LOCAL_MOVES,
+                           tick=lambda: report(progress, 0.0, '正在进行 Kempe 链局部搜索')):
+        return finish(upper.edge_colors(graph), delta, delta, 'Kempe 链局部搜索得到 Δ 色方案')
+
+    remaining = time_budget - (time.perf_counter() - started)
+    if remaining <= 0:
+        return finish(best, delta + 1, delta, '超出时间预算')
+    workers = workers or min(4, multiprocessing.cpu_count())
+    status, colors = _portfolio(n, edges, delta, remaining, workers, progress)
+    if status == 'found':
+        return finish(dict(zip(graph.edges(), colors)), delta, delta, '分支限界搜索到 Δ 色方案')
+    if status == 'exhausted':
+        return finish(best, delta + 1, delta + 1, '分支限界证明不存在 Δ 色方案')
+    return finish(best, delta + 1, delta, '超出时间预算')
@@ -0,0 +1,297 @@
+import random
+import time
+
+from graph_core.progress import PROGRESS_INTERVAL, report
+
+# 局部搜索每走多少步检查一次时间和取消
+CHECK_INTERVAL = 256
+# 放回一条边时最多尝试几组 a/b Kempe 链，都失败才做随机扰动
+KEMPE_TRIES = 4
+
+
+def greedy_edge_coloring(graph, num_colors, progress=None):
+    # 按 graph.edges 的顺序贪心地为每条边选择编号最小的可用颜色（0..num_colors-1）。
+    # 成功时返回 {边: 颜色编号}，某条边找不到可用颜色时返回 None
+    # 初始化边的颜色为未着色
+    edge_colors = {edge: -1 for edge in graph.edges}  # -1 表示未着色
+
+    total = graph.number_of_edges()
+    for idx, edge in enumerate(graph.edges):
+        if not (idx + 1) % PROGRESS_INTERVAL:
+            report(progress, idx / total, '正在进行边着色')
+        available_colors = [True] * num_colors
+
+        # 检查相邻边的颜色
+        for end in edge:
+            for neighbor in graph.neighbors(end):
+                for key in ((end, neighbor), (neighbor, end)):
+                    color = edge_colors.get(key, -1)
+                    if color != -1:
+                        available_colors[color] = False
+
+        # 找到可用颜色
+        for color in range(num_colors):
+            if available_colors[color]:
+                edge_colors[edge] = color
+                break
+        else:
+            return None  # 无法为某条边找到可用颜色
+
+    return edge_colors  # 所有边着色成功
+
+
+def _random_bit(bits, rng):
+    # 位集 bits（非空）中随机一位的编号
+    positions = [i for i in range(bits.bit_length()) if bits >> i & 1]
+    return positions[rng.randrange(len(positions))]
+
+
+def max_degree(graph):
+    return max((d for _, d in graph.degree()), default=0)
+
+
+class EdgeColoring:
+    # 简单图的边着色，节点以整数编号。每个节点保存已用颜色的位集（Python 整数，第 c 位表示颜色 c）
+    # 以及 颜色 -> 邻居、邻居 -> 颜色 两个字典，查询某节点的空闲颜色、某颜色的边都是 O(1)。
+    # insert 用 Misra–Gries 算法为一条新边着色，只改动该边一端的扇形和一条双色交错路径，
+    # 任何时候使用的颜色都不超过 最大度 + 1 种
+    def __init__(self):
+        self.names = []
+        self.index = {}
+        self.used = []
+        self.at = []  # at[v][c]：v 上颜色为 c 的边的另一端
+        self.color = []  # color[v][x]：边 (v, x) 的颜色
+        self.changed = set()  # 自上次 take_changed 以来颜色有变化的边 (编号小的端点, 编号大的端点)
+        self.max_degree = 0  # 可用颜色为 0..max_degree，一次性着色整张图时预先设为最终的最大度
+
+    @classmethod
+    def from_graph(cls, graph, progress=None):
+        coloring = cls()
+        coloring.max_degree = max_degree(graph)
+        total = graph.number_of_edges()
+        for idx, (u, v) in enumerate(graph.edges()):
+            if not (idx + 1) % PROGRESS_INTERVAL:
+                report(progress, idx / total, '正在进行边着色')
+            coloring.add_edge(u, v)
+        coloring.changed.clear()
+        return coloring
+
+    @classmethod
+    def from_colors(cls, graph, edge_colors):
+        # 由已有的 {边: 颜色编号}（如精确求解的结果）建立，之后可以继续增量加边
+        coloring = cls()
+        coloring.max_degree = max_degree(graph)
+        for (u, v), c in edge_colors.items():
+            coloring._set(coloring.node(u), coloring.node(v), c)
+        coloring.changed.clear()
+        return coloring
+
+    def node(self, name):
+        v = self.index.get(name)
+        if v is None:
+            v = self.index[name] = len(self.names)
+            self.names.append(name)
+            self.used.append(0)
+            self.at.append({})
+            self.color.append({})
+        return v
+
+    @property
+    def num_colors(self):
+        # 实际用到的颜色数（最大颜色编号 + 1）
+        return max(self.used, default=0).bit_length()
+
+    def free(self, v):
+        # 节点 v 上编号最小的空闲颜色
+        used = self.used[v]
+        return (~used & (used + 1)).bit_length() - 1
+
+    def _set(self, u, x, c):
+        self.at[u][c] = x
+        self.at[x][c] = u
+        self.color[u][x] = c
+        self.color[x][u] = c
+        self.used[u] |= 1 << c
+        self.used[x] |= 1 << c
+        self.changed.add((u, x) if u < x else (x, u))
+
+    def _unset(self, u, x):
+        c = self.color[u].pop(x)
+        del self.color[x][u]
+        del self.at[u][c]
+        del self.at[x][c]
+        self.used[u] &= ~(1 << c)
+        self.used[x] &= ~(1 << c)
+        return c
+
+    def _chain(self, x, a, b):
+        # 从 x 出发、颜色依次为 a, b, a, ... 的极大交错路径（Kempe 链），返回 [(端点, 端点, 颜色)]
+        path, col = [], a
+        while col in self.at[x]:
+            y = self.at[x][col]
+            path.append((x, y, col))
+            x, col = y, b if col == a else a
+        return path
+
+    def _flip(self, path, a, b):
+        # 互换交错路径上的颜色 a、b
+        for x, y, _ in path:
+            self._unset(x, y)
+        for x, y, col in path:
+            self._set(x, y, b if col == a else a)
+
+    def add_edge(self, u, v):
+        # 按节点名加入一条边并着色；边已存在时不做任何事
+        if u == v:
+            raise ValueError(f'节点 {u} 上有自环，无法进行边着色。')
+        a, b = self.node(u), self.node(v)
+        if b not in self.color[a]:
+            self.insert(a, b)
+
+    def insert(self, u, v):
+        self.max_degree = max(self.max_degree, len(self.color[u]) + 1, len(self.color[v]) + 1)
+        # 两端有共同的空闲颜色时直接使用，大多数边走这条捷径
+        both = self.used[u] | self.used[v]
+        c = (~both & (both + 1)).bit_length() - 1
+        if c <= self.max_degree:
+            self._set(u, v, c)
+            return
+
+        # Misra–Gries：以 u 为中心取极大扇形 v = f0, f1, ..., fk，其中边 (u, f(i+1)) 的颜色在 fi 上空闲
+        fan, in_fan = [v], {v}
+        while True:
+            last = fan[-1]
+            bits = self.used[u] & ~self.used[last]
+            while bits:
+                low = bits & -bits
+                x = self.at[u][low.bit_length() - 1]
+                if x not in in_fan:
+                    fan.append(x)
+                    in_fan.add(x)
+                    break
+                bits ^= low
+            else:
+                break
+
+        c, d = self.free(u), self.free(fan[-1])
+        if self.used[u] >> d & 1:
+            # d 在 u 上已被使用：把从 u 出发的 d/c 交错路径上的颜色互换，之后 d 在 u 上空闲
+            self._flip(self._chain(u, d, c), d, c)
+
+        # 取扇形中第一个 d 空闲的节点 w（其前缀仍是扇形），把前缀旋转一格，再把 (u, w) 染成 d
+        # （互换颜色后扇形可能在某处断开，断开处之后的节点不能选）
+        w = None
+        for i, x in enumerate(fan):
+            if i and self.used[fan[i - 1]] >> self.color[u][x] & 1:
+                break
+            if not self.used[x] >> d & 1:
+                w = i
+                break
+        shifted = [self._unset(u, x) for x in fan[1:w + 1]]
+        for x, col in zip(fan, shifted):
+            self._set(u, x, col)
+        self._set(u, fan[w], d)
+
+    def insert_bipartite(self, u, v):
+        # 二部图只用 0..max_degree-1 共 Δ 种颜色（Kőnig 定理的构造）：取 u 上的空闲颜色 a、v 上的空闲颜色 b，
+        # 把从 v 出发的 a/b 交错路径上的颜色互换后 a 在 v 上空闲（二部图中这条路径不会回到 u），再把 (u, v) 染成 a
+        both = self.used[u] | self.used[v]
+        c = (~both & (both + 1)).bit_length() - 1
+        if c < self.max_degree:
+            self._set(u, v, c)
+            return
+        a, b = self.free(u), self.free(v)
+        self._flip(self._chain(v, a, b), a, b)
+        self._set(u, v, a)
+
+    def reduce_colors(self, k, deadline=None, seed=0, tick=None, max_moves=None):
+        # 局部搜索把颜色数降到 k（k 不小于最大度）：只取下颜色编号 >= k 的边，其余边保持原色，再逐条放回 0..k-1。
+        # 放回 (u, v) 时：两端有共同空闲色直接使用；否则取 u 上空闲的 a、v 上空闲的 b，若从 v 出发的 a/b Kempe 链
+        # 不到达 u，互换链上颜色后 a 在两端都空闲；几次尝试的链都连到 u 时随机扰动：把 u 上颜色为 b 的边换下来重新排队，
+        # 或互换 u 上的一条 Kempe 链改变 u 的空闲色。
+        # 到达 deadline 或走满 max_moves 步仍未放完时，剩余的边用 Misra–Gries 放回（仍是至多 Δ + 1 色的合法方案），返回 False
+        rng = random.Random(seed)
+        full = (1 << k) - 1
+        pending = [(u, x) for u in range(len(self.names)) for x, c in self.color[u].items() if c >= k and u < x]
+        for u, x in pending:
+            self._unset(u, x)
+        moves = 0
+        while pending:
+            moves += 1
+            if moves == max_moves:
+                break
+            if not moves % CHECK_INTERVAL:
+                if tick is not None:
+                    tick()
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+            u, v = pending.pop(rng.randrange(len(pending)))
+            if rng.random() < 0.5:
+                u, v = v, u
+            free_u, free_v = full & ~self.used[u], full & ~self.used[v]
+            common = free_u & free_v
+            if common:
+                self._set(u, v, (common & -common).bit_length() - 1)
+                continue
+            for _ in range(KEMPE_TRIES):
+                a, b = _random_bit(free_u, rng), _random_bit(free_v, rng)
+                path = self._chain(v, a, b)
+                if not path or path[-1][1] != u:
+                    self._flip(path, a, b)
+                    self._set(u, v, a)
+                    break
+            else:
+                if rng.random() < 0.5:
+                    # 把 u 上颜色为 b 的边 (u, x) 换下，(u, v) 染成 b，待放回的边变为 (u, x)
+                    b = _random_bit(free_v, rng)
+                    x = self.at[u][b]
+                    self._unset(u, x)
+                    self._set(u, v, b)
+                    pending.append((u, x))
+                else:
+                    # 互换从 u 出发的 c/a 链，u 上的空闲色由 a 变为 c
+                    a, c = _random_bit(free_u, rng), _random_bit(self.used[u], rng)
+                    self._flip(self._chain(u, c, a), c, a)
+                    pending.append((u, v))
+        else:
+            return True
+        for u, v in pending:
+            self.insert(u, v)
+        return False
+
+    def take_changed(self):
+        # 取出并清空变化过的边，返回 [(节点名, 节点名, 颜色)]
+        changed, self.changed = self.changed, set()
+        names = self.names
+        return [(names[a], names[b], self.color[a][b]) for a, b in changed if b in self.color[a]]
+
+    def edge_colors(self, graph):
+        # 按 graph.edges() 的端点顺序给出 {边: 颜色编号}
+        index, color = self.index, self.color
+        return {(u, v): color[index[u]][index[v]] for u, v in graph.edges()}
+
+
+def misra_gries_edge_coloring(graph, progress=None):
+    # 用至多 最大度 + 1 种颜色为简单图的边着色（Vizing 定理的构造性证明），最坏 O(m·n)，实际接近 O(m·Δ)
+    return EdgeColoring.from_graph(graph, progress)
+
+
+def minimize_edge_colors(graph, time_budget=10.0, progress=None):
+    # 自动减少颜色数：先用 Misra–Gries 得到至多 Δ + 1 色的方案（上界），再从上界减一起逐个尝试更少的颜色，
+    # 直到下界 Δ。每一步在上一步的方案上只重新放置超出颜色范围的边（reduce_colors），不从头着色。
+    # 返回 (EdgeColoring, [(颜色数, 用时秒数, 是否成功)])，第一项为构造上界的一步
+    started = time.perf_counter()
+    coloring = EdgeColoring.from_graph(graph, progress)
+    steps = [(coloring.num_colors, time.perf_counter() - started, True)]
+    lower = coloring.max_degree
+    for k in range(coloring.num_colors - 1, lower - 1, -1):
+        def tick():
+            report(progress, min((time.perf_counter() - started) / time_budget, 1.0), f'正在尝试 {k} 种颜色')
+        tick()
+        began = time.perf_counter()
+        ok = coloring.reduce_colors(k, started + time_budget, tick=tick)
+        steps.append((k, time.perf_counter() - began, ok))
+        if not ok:
+            break
+    coloring.changed.clear()
+    return coloring, steps
@@ -0,0 +1,93 @@
+import csv
+
+import numpy as np
+
+# 常见的表头字段，首行全部由这些词组成时视为表头跳过
+_HEADER_WORDS = {'source', 'target', 'weight', 'head', 'tail', 'u', 'v', 'from', 'to', 'node1', 'node2',
+                 '起点', '终点', '权重', '头节点', '尾节点', '起始节点', '终止节点'}
+
+
+class EdgeListError(ValueError):
+    # 边列表中存在非法行或文件无法读取；errors 为 (行号, 原因) 列表，文件读取失败时为空，原因见 message
+
+    def __init__(self, errors, message=None):
+        self.errors = errors
+        if message is None:
+            shown = '；'.join(f'第 {line} 行{reason}' for line, reason in errors[:5])
+            more = f' 等 {len(errors)} 处错误' if len(errors) > 5 else ''
+            message = shown + more
+        super().__init__(message)
+
+
+def read_edge_list_file(filename):
+    # 读取边列表文件的全部文本；文件无法打开、是目录或不是 UTF-8 编码时抛出 EdgeListError
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return f.read()
+    except UnicodeDecodeError:
+        raise EdgeListError([], '文件不是 UTF-8 编码的文本') from None
+    except OSError as e:
+        raise EdgeListError([], f'无法读取文件：{e.strerror or e}') from e
+
+
+def _split_rows(lines):
+    # 按内容自动选择分隔符：逗号、制表符，否则按空白分隔
+    sample = lines[:100]
+    if any(',' in line for line in sample):
+        return list(csv.reader(lines, delimiter=','))
+    if any('\t' in line for line in sample):
+        return list(csv.reader(lines, delimiter='\t'))
+    return [line.split() for line in lines]
+
+
+def parse_edge_list(text, weighted=False, allow_negative=True):
+    # 解析每行一条边的文本（“头节点,尾节点[,权重]”），空行和以 # 开头的行忽略。
+    # 列数、节点名和权重的检查都对整列一次完成；只要有一行非法就整体拒绝并抛出 EdgeListError。
+    # 返回 (头节点列表, 尾节点列表, 权重数组或 None)
+    numbered = [(i + 1, line.strip()) for i, line in enumerate(text.splitlines())]
+    numbered = [(i, line) for i, line in numbered if line and not line.startswith('#')]
+    if not numbered:
+        return [], [], np.empty(0) if weighted else None
+    line_numbers = np.array([i for i, _ in numbered])
+    rows = _split_rows([line for _, line in numbered])
+
+    if {field.strip().lower() for field in rows[0]} <= _HEADER_WORDS:
+        rows, line_numbers = rows[1:], line_numbers[1:]
+    need = 3 if weighted else 2
+    errors = []
+
+    counts = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+    short = counts < need
+    errors += [(line, f'列数不足（需要 {need} 列）') for line in line_numbers[short].tolist()]
+    rows = [row if len(row) >= need else [''] * need for row in rows]
+
+    heads = np.array([row[0].strip() for row in rows], dtype=object)
+    tails = np.array([row[1].strip() for row in rows], dtype=object)
+    empty = ((heads == '') | (tails == '')) & ~short
+    errors += [(line, '节点名为空') for line in line_numbers[empty].tolist()]
+
+    weights = None
+    if weighted:
+        column = np.array([row[2].strip() for row in rows])
+        try:
+            weights = column.astype(np.float64)
+            invalid = ~np.isfinite(weights)
+        except ValueError:
+            # 只有出错时才逐个定位非法的权重
+            weights = np.full(len(column), np.nan)
+            for i, value in enumerate(column.tolist()):
+                try:
+                    weights[i] = float(value)
+                except ValueError:
+                    pass
+            invalid = ~np.isfinite(weights)
+        invalid &= ~short
+        errors += [(line, '权重不是有效的数字') for line in line_numbers[invalid].tolist()]
+        if not allow_negative:
+            negative = weights < 0
+            errors += [(line, '权重不能为负') for line in line_numbers[negative].tolist()]
+
+    if errors:
+        errors.sort()
+        raise EdgeListError(errors)
+    return heads.tolist(), tails.tolist(), weights
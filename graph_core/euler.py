@@ -0,0 +1,197 @@
+import csv
+from array import array
+
+import numpy as np
+
+from graph_core.progress import PROGRESS_INTERVAL, report
+
+
+class EulerTour:
+    # 一笔画的结果：欧拉环路（首尾相同）或欧拉路径（从一个奇度点到另一个奇度点）。
+    # 节点和边都以编号保存，names 为编号对应的节点名，需要时才转换，百万条边的结果也只占几十 MB
+    def __init__(self, names, node_ids, edge_ids, num_edges=None):
+        self.names = names
+        self.node_ids = node_ids  # 依次经过的节点编号，比经过的边数多 1
+        self.edge_ids = edge_ids  # 依次经过的边编号，边按 graph.edges() 的顺序编号；中国邮路中同一条边可出现多次
+        self.num_edges = len(edge_ids) if num_edges is None else num_edges
+
+    def __len__(self):
+        return len(self.edge_ids)
+
+    @property
+    def closed(self):
+        return self.node_ids[0] == self.node_ids[-1]
+
+    def nodes(self):
+        names = self.names
+        return [names[i] for i in self.node_ids.tolist()]
+
+    def step(self, k):
+        # 第 k 步（从 0 开始）的 (起点, 终点, 边编号)
+        return self.names[self.node_ids[k]], self.names[self.node_ids[k + 1]], int(self.edge_ids[k])
+
+    def edge_order(self):
+        # 第 e 条边在一笔画中的顺序号（从 1 开始），与 graph.edges() 的顺序一一对应；重复经过的边取最后一次
+        order = np.zeros(self.num_edges, dtype=np.int64)
+        order[self.edge_ids] = np.arange(1, len(self.edge_ids) + 1)
+        return order
+
+    def edge_labels(self):
+        # 每条边的顺序号标签，重复经过的边列出每一次的顺序号，如 "3,17"
+        if len(self.edge_ids) == self.num_edges:
+            return self.edge_order().tolist()
+        labels = [[] for _ in range(self.num_edges)]
+        for k, e in enumerate(self.edge_ids.tolist(), 1):
+            labels[e].append(str(k))
+        return [','.join(label) for label in labels]
+
+
+class EulerReadiness:
+    # 随加边增量维护的一笔画条件：奇度点集合和有边节点的并查集（按大小合并 + 路径减半），每加一条边约 O(α(n))。
+    # 只支持加边；整图替换（加载文件）时用 from_graph 重建
+    def __init__(self):
+        self.odd = set()
+        self.parent = {}
+        self.size = {}
+        self.components = 0  # 有边的连通分支数，孤立节点不计
+
+    @classmethod
+    def from_graph(cls, graph, progress=None):
+        state = cls()
+        total = graph.number_of_edges()
+        for idx, (u, v) in enumerate(graph.edges()):
+            state.add_edge(u, v)
+            if not (idx + 1) % PROGRESS_INTERVAL:
+                report(progress, idx / total, '正在统计奇度点和连通分支')
+        return state
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def add_edge(self, u, v):
+        # 自环不改变奇偶性
+        if u != v:
+            for x in (u, v):
+                if x in self.odd:
+                    self.odd.remove(x)
+                else:
+                    self.odd.add(x)
+        for x in (u, v):
+            if x not in self.parent:
+                self.parent[x] = x
+                self.size[x] = 1
+                self.components += 1
+        ru, rv = self.find(u), self.find(v)
+        if ru != rv:
+            if self.size[ru] < self.size[rv]:
+                ru, rv = rv, ru
+            self.parent[rv] = ru
+            self.size[ru] += self.size[rv]
+            self.components -= 1
+
+    @property
+    def kind(self):
+        # 'circuit'（有欧拉环路）、'path'（有欧拉路径）或 None（不能一笔画）
+        if self.components != 1:
+            return None
+        if not self.odd:
+            return 'circuit'
+        return 'path' if len(self.odd) == 2 else None
+
+
+def half_edges(num_nodes, sources, targets):
+    # 无向（多重）图的邻接表，按节点排成一段段连续的“半边”：每条边在两端各出现一次，自环在同一节点出现两次。
+    # 节点 v 的半边为 offsets[v]:offsets[v + 1]，adj_node 为另一端节点，adj_edge 为边编号。
+    # 循环中逐个取元素时，array 比 NumPy 数组（每次取值都要创建标量对象）和列表（每个元素一个 int 对象）都更快、更省内存
+    ends = np.concatenate([sources, targets])
+    half = np.argsort(ends, kind='stable')
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ends, minlength=num_nodes), out=offsets[1:])
+    adj_node = array('q', np.concatenate([targets, sources])[half].tobytes())
+    adj_edge = array('q', (half % len(sources)).tobytes())
+    return array('q', offsets.tobytes()), adj_node, adj_edge
+
+
+def hierholzer(num_nodes, sources, targets, progress=None):
+    # 迭代的 Hierholzer 算法，O(n + m)。sources/targets 为无向（多重）图各条边的端点编号，允许平行边和自环。
+    # 没有奇度点时求欧拉环路，恰有两个时求从编号较小的奇度点出发的欧拉路径，否则返回 None；
+    # 有边的节点不连通时遍历不完所有边，同样返回 None（孤立节点不影响结果）。
+    # 返回 (节点编号序列, 边编号序列)
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    m = len(sources)
+    if m == 0:
+        return None
+    degree = np.bincount(sources, minlength=num_nodes) + np.bincount(targets, minlength=num_nodes)
+    odd = np.flatnonzero(degree & 1)
+    if len(odd) == 0:
+        start = int(np.flatnonzero(degree)[0])
+    elif len(odd) == 2:
+        start = int(odd[0])
+    else:
+        return None
+
+    # ptr[v] 指向节点 v 下一条尚未检查的半边，used 标记已走过的边，每条半边只检查一次
+    offsets, adj_node, adj_edge = half_edges(num_nodes, sources, targets)
+    ptr = offsets[:-1]
+    used = bytearray(m)
+
+    # 栈中保存当前走到的节点和走到它所经过的边；节点的边走完时出栈，出栈顺序的逆序即为一笔画
+    stack_node, stack_edge = [start], [-1]
+    out_node, out_edge = array('q'), array('q')
+    while stack_node:
+        v = stack_node[-1]
+        i, end = ptr[v], offsets[v + 1]
+        while i < end and used[adj_edge[i]]:
+            i += 1
+        if i == end:
+            ptr[v] = i
+            stack_node.pop()
+            out_node.append(v)
+            out_edge.append(stack_edge.pop())
+            if not len(out_edge) % PROGRESS_INTERVAL:
+                report(progress, len(out_edge) / m, '正在查找欧拉环游')
+        else:
+            e = adj_edge[i]
+            used[e] = 1
+            ptr[v] = i + 1
+            stack_node.append(adj_node[i])
+            stack_edge.append(e)
+
+    if len(out_edge) <= m:
+        return None
+    node_ids = np.frombuffer(out_node, dtype=np.int64)[::-1].copy()
+    # 逆序后第一项是起点的占位边 -1
+    edge_ids = np.frombuffer(out_edge, dtype=np.int64)[-2::-1].copy()
+    return node_ids, edge_ids
+
+
+def write_tour(tour, filename, progress=None):
+    # 以 CSV 流式写出一笔画的每一步（step, from, to），每次只转换一段节点名，返回写出的步数
+    names, node_ids = tour.names, tour.node_ids
+    total = len(tour)
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['step', 'from', 'to'])
+        for start in range(0, total, PROGRESS_INTERVAL):
+            chunk = [names[i] for i in node_ids[start:start + PROGRESS_INTERVAL + 1].tolist()]
+            writer.writerows(zip(range(start + 1, start + len(chunk)), chunk, chunk[1:]))
+            report(progress, start / total, '正在导出路线')
+    return total
+
+
+def eulerian_tour(graph, progress=None):
+    # 求无向（多重）图的欧拉环路或欧拉路径，不存在时返回 None，否则返回 EulerTour
+    names = list(graph.nodes)
+    index = {node: i for i, node in enumerate(names)}
+    m = graph.number_of_edges()
+    pairs = np.fromiter((x for u, v in graph.edges() for x in (index[u], index[v])), dtype=np.int64, count=2 * m)
+    pairs = pairs.reshape(-1, 2)
+    result = hierholzer(len(names), pairs[:, 0], pairs[:, 1], progress)
+    if result is None:
+        return None
+    return EulerTour(names, *result)
@@ -0,0 +1,255 @@
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+
+from graph_core.progress import report
+
+# 多层力导向布局（Fruchterman–Reingold 的多层版本），用于 nx.spring_layout 过慢的大图：
+# 先反复把图粗化（相邻节点两两合并），在最粗的小图上充分迭代，再逐层把坐标传回细一层的节点作为初值，只做少量迭代。
+# 每层的理想边长 k 按该层平均每个粗节点包含的原节点数取 sqrt(n / 该层节点数)，原图上为 1。
+# 斥力只计算网格中相邻格内的节点对（距离超过 2k 的斥力忽略，FR 原文的网格变体），全部用 NumPy 数组运算
+
+# 粗化到节点数不超过该值为止
+COARSEST_SIZE = 50
+# 一次粗化后节点数仍超过原来的该比例时停止粗化（如大量孤立的星形结构已无法继续合并）
+COARSEN_RATIO = 0.9
+# 最粗一层和其余各层的迭代次数
+COARSEST_ITERATIONS = 200
+LEVEL_ITERATIONS = 20
+# 每批计算的斥力节点对数上限，限制临时数组的内存
+MAX_PAIRS = 1 << 21
+# 每个相邻格最多取多少个节点计算斥力；稠密的图会聚成节点很多的团块，超出时随机抽样并按比例放大斥力，
+# 使每次迭代的工作量与节点数成正比
+CELL_SAMPLE = 8
+# 汇报中间结果的最短间隔（秒）
+PARTIAL_INTERVAL = 1.0
+
+
+def _best_edges(n, src, dst, priority):
+    # 每个节点的关联边中优先级最高的一条，没有关联边的节点为 -1
+    ends = np.concatenate([src, dst])
+    edges = np.concatenate([np.arange(len(src))] * 2)
+    order = np.lexsort((priority[edges], ends))
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = ends[order][1:] != ends[order][:-1]
+    best = np.full(n, -1, dtype=np.int64)
+    best[ends[order][last]] = edges[order][last]
+    return best
+
+
+def _coarsen(n, src, dst, rng):
+    # 一次粗化，返回 (每个节点所属的粗节点编号, 粗节点数)。
+    # 先做几轮“局部最优”匹配：每个节点选优先级最高的关联边，两端选中同一条边时这两个节点合并；
+    # 剩下未匹配的节点并入一个已匹配的邻居（星形结构可一次合并），孤立节点两两合并
+    cluster = np.full(n, -1, dtype=np.int64)
+    matched = np.zeros(n, dtype=bool)
+    count = 0
+    for _ in range(3):
+        free = ~matched[src] & ~matched[dst]
+        if not free.any():
+            break
+        s, d = src[free], dst[free]
+        best = _best_edges(n, s, d, rng.random(len(s)))
+        e = np.flatnonzero((best[s] == np.arange(len(s))) & (best[d] == np.arange(len(s))))
+        ids = np.arange(count, count + len(e))
+        cluster[s[e]] = ids
+        cluster[d[e]] = ids
+        matched[s[e]] = matched[d[e]] = True
+        count += len(e)
+
+    rest = np.flatnonzero(~matched)
+    if len(rest):
+        # 未匹配节点的已匹配邻居
+        anchor = matched[dst] & ~matched[src]
+        host = np.full(n, -1, dtype=np.int64)
+        host[src[anchor]] = cluster[dst[anchor]]
+        anchor = matched[src] & ~matched[dst]
+        host[dst[anchor]] = cluster[src[anchor]]
+        cluster[rest] = host[rest]
+        alone = rest[host[rest] < 0]
+        cluster[alone] = count + np.arange(len(alone)) // 2
+        count += (len(alone) + 1) // 2
+    return cluster, count
+
+
+def _coarse_edges(cluster, src, dst, weight, count):
+    # 粗图的边：去掉粗节点内部的边，平行边合并并累加权重
+    a, b = cluster[src], cluster[dst]
+    keep = a != b
+    lo, hi = np.minimum(a[keep], b[keep]), np.maximum(a[keep], b[keep])
+    keys, inverse = np.unique(lo * count + hi, return_inverse=True)
+    return keys // count, keys % count, np.bincount(inverse.reshape(-1), weight[keep], minlength=len(keys))
+
+
+def _repulsion(xy, k, rng, executor, workers):
+    # 网格斥力：格宽 2k，每个节点只与自身及周围 8 格内距离不超过 2k 的节点相斥，斥力为 k² / 距离。
+    # 每对节点只计算一次：同一格内只取编号较大的一方，相邻格只看右侧和上方的 4 个格，力同时加到两端
+    n = len(xy)
+    size = 2 * k
+    cells = np.floor(xy / size).astype(np.int64)
+    cells -= cells.min(axis=0)
+    height = int(cells[:, 1].max()) + 3
+    key = (cells[:, 0] + 1) * height + cells[:, 1] + 1
+    order = np.argsort(key, kind='stable')
+    sorted_key = key[order]
+
+    # 每个节点在 5 个格中的节点区间 [start, start + count)
+    starts, counts = [], []
+    for dx, dy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        target = key + dx * height + dy
+        lo = np.searchsorted(sorted_key, target, 'left')
+        starts.append(lo)
+        counts.append(np.searchsorted(sorted_key, target, 'right') - lo)
+    starts = np.stack(starts, axis=1).ravel()
+    cell_counts = np.stack(counts, axis=1).ravel()
+    counts = np.minimum(cell_counts, CELL_SAMPLE)
+    scale = cell_counts / np.maximum(counts, 1)
+    same_cell = np.tile([True, False, False, False, False], n)
+    nodes = np.repeat(np.arange(n), 5)
+
+    # 按节点对数分批，每批的临时数组不超过 MAX_PAIRS 项，各批可以在线程中并行计算
+    cumulative = np.cumsum(counts)
+    bounds = np.searchsorted(cumulative, np.arange(MAX_PAIRS, int(cumulative[-1]) + MAX_PAIRS, MAX_PAIRS))
+    pieces = [piece for piece in np.split(np.arange(len(nodes)), np.unique(np.minimum(bounds, len(nodes) - 1))[:-1] + 1)
+              if len(piece)]
+
+    # 抽样用的随机数在分批之前取好，线程中不共用随机数生成器
+    sampled = cell_counts > counts
+    draw_start = np.concatenate([[0], np.cumsum(np.where(sampled, counts, 0))])
+    draws = rng.random(int(draw_start[-1]))
+
+    def work(piece):
+        repeat = counts[piece]
+        first = np.repeat(nodes[piece], repeat)
+        offsets = np.arange(len(first)) - np.repeat(np.cumsum(repeat) - repeat, repeat)
+        # 节点数超过 CELL_SAMPLE 的格随机取节点（可能重复）
+        picked = np.repeat(sampled[piece], repeat)
+        chosen = sampled[piece]
+        offsets[picked] = (draws[draw_start[piece[0]]:draw_start[piece[-1] + 1]] *
+                           np.repeat(cell_counts[piece][chosen], repeat[chosen])).astype(np.int64)
+        second = order[np.repeat(starts[piece], repeat) + offsets]
+        delta = xy[first] - xy[second]
+        dist2 = np.einsum('ij,ij->i', delta, delta)
+        near = (dist2 < size * size) & ((second > first) | ~np.repeat(same_cell[piece], repeat))
+        first, second, delta, dist2 = first[near], second[near], delta[near], dist2[near]
+        # 重合的节点之间给一个很小的距离，避免除以零
+        strength = k * k * np.repeat(scale[piece], repeat)[near] / np.maximum(dist2, 1e-9 * k * k)
+        force = delta * strength[:, None]
+        return [np.bincount(first, force[:, axis], minlength=n) - np.bincount(second, force[:, axis], minlength=n)
+                for axis in (0, 1)]
+
+    parts = executor.map(work, pieces) if executor is not None and workers > 1 else map(work, pieces)
+    disp = np.zeros((n, 2))
+    for fx, fy in parts:
+        disp[:, 0] += fx
+        disp[:, 1] += fy
+    return disp
+
+
+def _iterate(xy, src, dst, weight, k, iterations, temperature, step, rng, executor, workers):
+    # 力导向迭代，step(i) 在每次迭代后调用，返回 True 时提前结束
+    n = len(xy)
+    cooling = (0.05 ** (1 / iterations)) if iterations else 1.0
+    for i in range(iterations):
+        disp = _repulsion(xy, k, rng, executor, workers)
+        # 引力 d² / k，沿边方向
+        delta = xy[dst] - xy[src]
+        dist = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+        pull = delta * (weight * dist / k)[:, None]
+        for axis in (0, 1):
+            disp[:, axis] += (np.bincount(src, pull[:, axis], minlength=n) -
+                              np.bincount(dst, pull[:, axis], minlength=n))
+        # 每个节点的位移不超过当前温度
+        length = np.sqrt(np.einsum('ij,ij->i', disp, disp))
+        xy += disp * (np.minimum(length, temperature) / np.maximum(length, 1e-12))[:, None]
+        temperature *= cooling
+        if step(i):
+            return True
+    return False
+
+
+def _rescale(xy):
+    # 与 nx.spring_layout 相同：中心移到原点，缩放到 [-1, 1]
+    xy = xy - xy.mean(axis=0)
+    extent = np.abs(xy).max()
+    return xy / extent if extent > 0 else xy
+
+
+def multilevel_layout(graph, seed=None, workers=None, progress=None, partial=None):
+    # 返回 {节点: 坐标}，坐标范围与 nx.spring_layout 相同。
+    # progress 返回 True（用户请求提前结束）时停止迭代，把当前坐标逐层传回原图后返回；
+    # 给定 partial 时每隔 PARTIAL_INTERVAL 秒用原图上的当前坐标调用一次 partial({节点: 坐标})，用于显示收敛过程。
+    # workers > 1 时斥力分批在多个线程中计算（NumPy 运算期间释放 GIL）
+    nodes = list(graph.nodes)
+    n = len(nodes)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {nodes[0]: np.zeros(2)}
+    rng = np.random.default_rng(seed)
+    index = {node: i for i, node in enumerate(nodes)}
+    m = graph.number_of_edges()
+    pairs = np.fromiter((index[x] for edge in graph.edges() for x in edge[:2]), dtype=np.int64, count=2 * m)
+    pairs = pairs.reshape(-1, 2)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    src, dst = np.minimum(pairs[:, 0], pairs[:, 1]), np.maximum(pairs[:, 0], pairs[:, 1])
+    keys, weight = np.unique(src * n + dst, return_counts=True)
+
+    # 逐层粗化，levels[i] 为 (节点数, 边起点, 边终点, 边权, 每个节点在粗一层中所属的粗节点编号)
+    levels = [(n, keys // n, keys % n, weight.astype(np.float64), None)]
+    while levels[-1][0] > COARSEST_SIZE:
+        size, src, dst, weight, _ = levels[-1]
+        cluster, count = _coarsen(size, src, dst, rng)
+        if count > COARSEN_RATIO * size:
+            break
+        levels[-1] = levels[-1][:4] + (cluster,)
+        levels.append((count, *_coarse_edges(cluster, src, dst, weight, count), None))
+
+    # 工作量按各层 迭代次数 ×（节点数 + 边数）估计，用于汇报进度
+    plan = [COARSEST_ITERATIONS if i == len(levels) - 1 else LEVEL_ITERATIONS for i in range(len(levels))]
+    work = [it * (level[0] + len(level[1])) for it, level in zip(plan, levels)]
+    total, done = sum(work), 0
+    workers = workers or min(4, os.cpu_count() or 1)
+    last_partial = time.perf_counter()
+
+    def to_finest(xy, level):
+        # 把第 level 层的坐标沿粗化映射传回原图
+        for i in range(level - 1, -1, -1):
+            xy = xy[levels[i][4]]
+        return xy
+
+    size = levels[-1][0]
+    xy = rng.uniform(0, math.sqrt(n), size=(size, 2))
+    stopped = False
+    with ThreadPoolExecutor(workers) if workers > 1 else nullcontext() as executor:
+        for level in range(len(levels) - 1, -1, -1):
+            size, src, dst, weight, cluster = levels[level]
+            k = math.sqrt(n / size)
+            if level < len(levels) - 1:
+                # 细一层的节点从所属粗节点的位置出发，在粗一层的理想边长范围内加扰动使合并的节点分开
+                coarse_k = math.sqrt(n / levels[level + 1][0])
+                xy = xy[cluster] + rng.uniform(-0.5 * coarse_k, 0.5 * coarse_k, size=(size, 2))
+            if stopped:
+                continue
+            iterations = plan[level]
+
+            def step(i):
+                nonlocal last_partial
+                fraction = (done + work[level] * (i + 1) / iterations) / total
+                if report(progress, fraction, '正在计算多层布局'):
+                    return True
+                if partial is not None and time.perf_counter() - last_partial >= PARTIAL_INTERVAL:
+                    partial(dict(zip(nodes, _rescale(to_finest(xy, level)))))
+                    last_partial = time.perf_counter()
+                return False
+
+            # 最粗一层从随机位置开始，温度较高；其余各层只需局部调整
+            temperature = math.sqrt(size) * k / 10 if level == len(levels) - 1 else 2 * k
+            stopped = _iterate(xy, src, dst, weight, k, iterations, temperature, step, rng, executor, workers)
+            done += work[level]
+    return dict(zip(nodes, _rescale(xy)))
+
@@ -0,0 +1,70 @@
+import math
+import random
+
+import networkx as nx
+
+# 带固定随机种子的合成测试图。节点名统一为字符串，与界面中手工输入或导入的图一致
+
+
+def _weighted(graph, rng, low=1.0, high=10.0):
+    for u, v in graph.edges():
+        graph[u][v]['weight'] = round(rng.uniform(low, high), 2)
+    return graph
+
+
+def _named(graph):
+    return nx.relabel_nodes(graph, str)
+
+
+def random_sparse(n, avg_degree=4, seed=0):
+    # 随机稀疏加权图 G(n, m)，平均度约为 avg_degree
+    rng = random.Random(seed)
+    graph = nx.gnm_random_graph(n, n * avg_degree // 2, seed=seed)
+    return _weighted(_named(graph), rng)
+
+
+def road_grid(side, drop=0.1, seed=0):
+    # 类似路网的网格图：随机删去一部分道路（保持连通），权重为路段长度乘以随机拥堵系数
+    rng = random.Random(seed)
+    graph = nx.grid_2d_graph(side, side)
+    for u, v in graph.edges():
+        graph[u][v]['weight'] = rng.random()
+    # 随机生成树上的道路保留，保证连通
+    keep = set(map(frozenset, nx.minimum_spanning_edges(graph, data=False)))
+    graph.remove_edges_from([(u, v) for u, v in list(graph.edges())
+                             if frozenset((u, v)) not in keep and rng.random() < drop])
+    for u, v in graph.edges():
+        graph[u][v]['weight'] = round(math.dist(u, v) * rng.uniform(1.0, 3.0), 2)
+    return nx.relabel_nodes(graph, lambda node: f'{node[0]},{node[1]}')
+
+
+def dense(n, p=0.5, seed=0):
+    # 稠密随机加权图 G(n, p)
+    rng = random.Random(seed)
+    return _weighted(_named(nx.gnp_random_graph(n, p, seed=seed)), rng)
+
+
+def eulerian_multigraph(n, m, seed=0):
+    # 由一条长度为 m 的随机闭合游走构造的多重图（允许平行边），该游走本身就是一条已知的欧拉环路。
+    # 返回 (图, 环路节点序列)，环路首尾相同
+    rng = random.Random(seed)
+    walk = [0]
+    for _ in range(m - 1):
+        walk.append(rng.randrange(n))
+    walk.append(0)
+    walk = [str(node) for node in walk]
+    graph = nx.MultiGraph()
+    graph.add_edges_from(zip(walk, walk[1:]))
+    return graph, walk
+
+
+def bipartite(n1, n2, p, seed=0):
+    # 随机二部图，由 Kőnig 定理其边色数等于最大度
+    graph = nx.bipartite.random_graph(n1, n2, p, seed=seed)
+    graph = nx.Graph(graph.edges())
+    return _named(graph), max((d for _, d in graph.degree()), default=0)
+
+
+def regular(n, d, seed=0):
+    # 随机 d-正则图，边色数为 d 或 d + 1
+    return _named(nx.random_regular_graph(d, n, seed=seed))
@@ -0,0 +1,439 @@
+import json
+import math
+import os
+import re
+import struct
+from array import array
+
+import numpy as np
+
+from graph_core.progress import report
+
+# 二进制图文件（.gbin）格式，所有整数均为小端：
+#   64 字节文件头：魔数 GRPHBIN1，节点数、边数、标志位、节点名字节数（各 8 字节）
+#   节点表：整数节点为 int64[n]；否则为 int64[n + 1] 的偏移 + UTF-8 节点名拼接
+#   边表：sources、targets（int32，节点数过多时为 int64），有权重时再跟 float64 的 weights，
+#   其中没有权重的边为 NaN；权重全为整数时置 FLAG_INT_WEIGHTS，读入时恢复为 int
+# 每一段都按 8 字节对齐，打开时用 np.memmap 映射，不把整个文件读入内存。
+# 二进制格式只保存节点名、边端点和权重，节点、边和图的其他属性只有 JSON 格式才保存。
+BINARY_MAGIC = b'GRPHBIN1'
+BINARY_SUFFIX = '.gbin'
+_HEADER = struct.Struct('<8sQQQQ')
+_HEADER_SIZE = 64
+
+FLAG_DIRECTED = 1
+FLAG_MULTIGRAPH = 2
+FLAG_WEIGHTED = 4
+FLAG_INT_NODES = 8
+FLAG_WIDE_IDS = 16
+FLAG_INT_WEIGHTS = 32
+
+
+class GraphArrays:
+    # 以数组形式表示的图：节点列表 + 按节点编号存储的边端点与权重（无权图 weights 为 None，
+    # 部分边没有权重时这些边为 NaN；int_weights 表示原来的权重全为整数，转换为 networkx 图时恢复为 int）。
+    # 其余属性（读 JSON 文件时得到）稀疏保存：node_attrs 为 {节点编号: 属性字典}，edge_attrs 为 {边编号: 属性字典}，
+    # graph_attrs 为图属性字典
+
+    def __init__(self, nodes, sources, targets, weights=None, directed=False, multigraph=False,
+                 node_attrs=None, edge_attrs=None, graph_attrs=None, int_weights=False):
+        self.nodes = nodes
+        self.sources = sources
+        self.targets = targets
+        self.weights = weights
+        self.int_weights = int_weights
+        self.directed = directed
+        self.multigraph = multigraph
+        self.node_attrs = node_attrs or {}
+        self.edge_attrs = edge_attrs or {}
+        self.graph_attrs = graph_attrs or {}
+
+    @property
+    def num_edges(self):
+        return len(self.sources)
+
+    @classmethod
+    def from_networkx(cls, graph, weight='weight'):
+        from graph_core.graph_store import COLUMNS, store_of
+
+        store = store_of(graph)
+        if store is not None and weight in COLUMNS:
+            # 图存储本身就是数组，直接取用（边按加入顺序）
+            return cls(list(store.nodes.names), store.sources.values, store.targets.values,
+                       store.values(weight, np.nan), False, store.multigraph)
+        nodes = list(graph.nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        m = graph.number_of_edges()
+        sources = np.fromiter((index[u] for u, v in graph.edges()), dtype=np.int64, count=m)
+        targets = np.fromiter((index[v] for u, v in graph.edges()), dtype=np.int64, count=m)
+        weights, int_weights = None, False
+        values = [d.get(weight) for u, v, d in graph.edges(data=True)]
+        present = [w for w in values if w is not None]
+        if present:
+            weights = np.array([np.nan if w is None else w for w in values], dtype=np.float64)
+            int_weights = all(isinstance(w, (int, np.integer)) for w in present)
+        return cls(nodes, sources, targets, weights, graph.is_directed(), graph.is_multigraph(),
+                   int_weights=int_weights)
+
+    def edge_weights(self, default=1.0):
+        # 各边的权重数组，没有权重的边取 default
+        if self.weights is None:
+            return np.full(self.num_edges, default, dtype=np.float64)
+        missing = np.isnan(self.weights)
+        return np.where(missing, default, self.weights) if missing.any() else self.weights
+
+    def weight_list(self):
+        # 各边权重的列表，没有权重的边为 None；原来的权重全为整数时恢复为 int。无权图为 None
+        if self.weights is None:
+            return None
+        cast = int if self.int_weights else float
+        return [None if w != w else cast(w) for w in self.weights.tolist()]
+
+    def to_networkx(self, multigraph=None):
+        # multigraph 为 None 时按文件中的标志创建图，否则强制使用（多重）图
+        # networkx 只在转换时导入，只读写数组的无界面脚本（如批量查询）不必加载它
+        import networkx as nx
+
+        multigraph = self.multigraph if multigraph is None else multigraph
+        if self.directed:
+            graph = nx.MultiDiGraph() if multigraph else nx.DiGraph()
+        else:
+            graph = nx.MultiGraph() if multigraph else nx.Graph()
+        nodes = self.nodes
+        graph.graph.update(self.graph_attrs)
+        graph.add_nodes_from(nodes)
+        for i, attrs in self.node_attrs.items():
+            graph.nodes[nodes[i]].update(attrs)
+        sources = (nodes[i] for i in self.sources.tolist())
+        targets = (nodes[i] for i in self.targets.tolist())
+        weights = self.weight_list()
+        if self.edge_attrs or (weights is not None and None in weights):
+            weights = weights or [None] * self.num_edges
+            graph.add_edges_from((u, v, {**({} if w is None else {'weight': w}), **self.edge_attrs.get(j, {})})
+                                 for j, (u, v, w) in enumerate(zip(sources, targets, weights)))
+        elif weights is None:
+            graph.add_edges_from(zip(sources, targets))
+        else:
+            graph.add_weighted_edges_from(zip(sources, targets, weights))
+        return graph
+
+    def to_csr(self):
+        from graph_core.shortest_path import CSRGraph
+
+        return CSRGraph.from_arrays(self.nodes, self.sources, self.targets, self.edge_weights(), self.directed)
+
+
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+_SEPARATOR = re.compile(r'[ \t\r\n]*([,\]])')
+
+
+class _JSONStream:
+    # 增量读取 JSON：按块读入文件，只对数组中的单个元素调用 json 解码，
+    # 峰值内存与最大的单个元素和块大小有关，而与文件大小无关
+
+    def __init__(self, f, chunk_size=1 << 20):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        # 跳过空白，返回下一个字符，文件结束时返回空串
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise ValueError(f'JSON 格式错误：位置 {self.pos} 处应为 {ch!r}')
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # 值恰好在缓冲区末尾结束时（如数字）可能被截断，读入更多内容后重新解析
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def _separator(self, closing):
+        ch = self.peek()
+        self.pos += 1
+        if ch == closing:
+            return False
+        if ch != ',':
+            raise ValueError(f'JSON 格式错误：位置 {self.pos} 处应为 "," 或 {closing!r}')
+        return True
+
+    def array(self):
+        # 按批产出数组元素：每次在当前缓冲区内连续解码尽可能多的完整元素，缓冲区用完再读入下一块
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        decode = self.decoder.raw_decode
+        ws, sep = _WHITESPACE.match, _SEPARATOR.match
+        while True:
+            buf, pos = self.buf, self.pos
+            batch = []
+            closed = False
+            while True:
+                pos = ws(buf, pos).end()
+                try:
+                    obj, end = decode(buf, pos)
+                except json.JSONDecodeError:
+                    break
+                # 元素之后必须能看到分隔符，否则元素可能被块边界截断（如数字），留到下一块重新解码
+                m = sep(buf, end)
+                if m is None:
+                    break
+                batch.append(obj)
+                pos = m.end()
+                if m.group(1) == ']':
+                    closed = True
+                    break
+            self.pos = pos
+            if batch:
+                yield batch
+            if closed:
+                return
+            if not self._fill():
+                raise ValueError('JSON 格式错误：数组未结束')
+
+    def keys(self):
+        # 逐个产出对象的键，调用方必须在取下一个键之前用 value() 或 array() 读掉对应的值
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            if not self._separator('}'):
+                return
+
+
+def _hashable(node):
+    # networkx 把元组节点写成 JSON 数组
+    return tuple(_hashable(x) for x in node) if isinstance(node, list) else node
+
+
+def read_node_link_arrays(filename, weight='weight'):
+    # 流式读取 node-link JSON，直接得到 GraphArrays，不构建完整的 JSON 对象树。
+    # 节点编号、边端点和权重存为数组，其余节点、边属性和图属性只为带有它们的节点、边保存字典
+    nodes, index = [], {}
+    node_attrs, edge_attrs, graph_attrs = {}, {}, {}
+
+    def intern(node):
+        if type(node) is list:
+            node = _hashable(node)
+        i = index.get(node)
+        if i is None:
+            i = index[node] = len(nodes)
+            nodes.append(node)
+        return i
+
+    sources, targets, weights = array('q'), array('q'), array('d')
+    weighted, int_weights = False, True
+    directed = multigraph = False
+    with open(filename, 'r', encoding='utf-8') as f:
+        stream = _JSONStream(f)
+        for key in stream.keys():
+            if key == 'nodes':
+                for batch in stream.array():
+                    for node in batch:
+                        i = intern(node['id'])
+                        if len(node) > 1:
+                            node_attrs.setdefault(i, {}).update((k, v) for k, v in node.items() if k != 'id')
+            elif key in ('links', 'edges'):
+                for batch in stream.array():
+                    for link in batch:
+                        sources.append(intern(link['source']))
+                        targets.append(intern(link['target']))
+                        w = link.get(weight)
+                        if w is None:
+                            w = math.nan
+                        elif isinstance(w, str) or not isinstance(w, (int, float)):
+                            raise ValueError(f'第 {len(weights) + 1} 条边的权重 {w!r} 不是数值')
+                        else:
+                            weighted = True
+                            int_weights = int_weights and isinstance(w, int)
+                        weights.append(w)
+                        if len(link) > 2 + (weight in link):
+                            # 多重图的键由图存储重新编号，不作为属性保存
+                            attrs = {k: v for k, v in link.items() if k not in ('source', 'target', 'key', weight)}
+                            if attrs:
+                                edge_attrs[len(weights) - 1] = attrs
+            else:
+                value = stream.value()
+                if key == 'graph':
+                    graph_attrs = value
+                elif key == 'directed':
+                    directed = bool(value)
+                elif key == 'multigraph':
+                    multigraph = bool(value)
+    return GraphArrays(
+        nodes,
+        np.frombuffer(sources, dtype=np.int64),
+        np.frombuffer(targets, dtype=np.int64),
+        np.frombuffer(weights, dtype=np.float64) if weighted else None,
+        directed,
+        multigraph,
+        node_attrs,
+        edge_attrs,
+        graph_attrs,
+        weighted and int_weights,
+    )
+
+
+def write_node_link(graph, filename):
+    # 与 nx.node_link_data + json.dump 输出相同的结构（边列表键为 links），但逐条写出，不在内存中构建整个字典
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'directed': graph.is_directed(), 'multigraph': graph.is_multigraph(),
+                            'graph': graph.graph})[:-1])
+        f.write(', "nodes": [')
+        for i, (node, attrs) in enumerate(graph.nodes(data=True)):
+            f.write((', ' if i else '') + json.dumps({**attrs, 'id': node}))
+        f.write('], "links": [')
+        if graph.is_multigraph():
+            edges = ({**d, 'source': u, 'target': v, 'key': k} for u, v, k, d in graph.edges(keys=True, data=True))
+        else:
+            edges = ({**d, 'source': u, 'target': v} for u, v, d in graph.edges(data=True))
+        for i, link in enumerate(edges):
+            f.write((', ' if i else '') + json.dumps(link))
+        f.write(']}')
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def write_binary(arrays, filename):
+    n, m = len(arrays.nodes), arrays.num_edges
+    flags = (FLAG_DIRECTED if arrays.directed else 0) | (FLAG_MULTIGRAPH if arrays.multigraph else 0)
+    if arrays.weights is not None:
+        flags |= FLAG_WEIGHTED
+        if arrays.int_weights:
+            flags |= FLAG_INT_WEIGHTS
+    int_nodes = all(isinstance(node, (int, np.integer)) and not isinstance(node, bool) for node in arrays.nodes)
+    names = b''
+    if int_nodes:
+        flags |= FLAG_INT_NODES
+    else:
+        encoded = [str(node).encode('utf-8') for node in arrays.nodes]
+        name_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=name_offsets[1:])
+        names = b''.join(encoded)
+    id_dtype = '<i4'
+    if n >= 2 ** 31:
+        flags |= FLAG_WIDE_IDS
+        id_dtype = '<i8'
+
+    with open(filename, 'wb') as f:
+        f.write(_HEADER.pack(BINARY_MAGIC, n, m, flags, len(names)).ljust(_HEADER_SIZE, b'\0'))
+
+        def section(data):
+            f.write(data)
+            f.write(b'\0' * (_align(f.tell()) - f.tell()))
+
+        if int_nodes:
+            section(np.asarray(arrays.nodes, dtype='<i8').tobytes())
+        else:
+            section(name_offsets.astype('<i8').tobytes())
+            section(names)
+        section(np.asarray(arrays.sources).astype(id_dtype).tobytes())
+        section(np.asarray(arrays.targets).astype(id_dtype).tobytes())
+        if arrays.weights is not None:
+            section(np.asarray(arrays.weights, dtype='<f8').tobytes())
+
+
+def read_binary(filename):
+    # 用内存映射打开 .gbin 文件，边数组直接引用文件内容；节点名表解码为列表
+    with open(filename, 'rb') as f:
+        magic, n, m, flags, names_bytes = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != BINARY_MAGIC:
+        raise ValueError(f'{filename} 不是二进制图文件')
+
+    offset = _HEADER_SIZE
+
+    def mapped(dtype, count):
+        nonlocal offset
+        dtype = np.dtype(dtype)
+        data = np.memmap(filename, dtype=dtype, mode='r', offset=offset, shape=(count,)) if count else \
+            np.empty(0, dtype=dtype)
+        offset = _align(offset + dtype.itemsize * count)
+        return data
+
+    if flags & FLAG_INT_NODES:
+        nodes = mapped('<i8', n).tolist()
+    else:
+        name_offsets = mapped('<i8', n + 1).tolist()
+        blob = bytes(mapped('u1', names_bytes))
+        nodes = [blob[name_offsets[i]:name_offsets[i + 1]].decode('utf-8') for i in range(n)]
+    id_dtype = '<i8' if flags & FLAG_WIDE_IDS else '<i4'
+    sources = mapped(id_dtype, m)
+    targets = mapped(id_dtype, m)
+    weights = mapped('<f8', m) if flags & FLAG_WEIGHTED else None
+    return GraphArrays(nodes, sources, targets, weights, bool(flags & FLAG_DIRECTED), bool(flags & FLAG_MULTIGRAPH),
+                       int_weights=bool(flags & FLAG_INT_WEIGHTS))
+
+
+def is_binary(filename):
+    return os.path.splitext(filename)[1].lower() == BINARY_SUFFIX
+
+
+def read_graph_arrays(filename):
+    return read_binary(filename) if is_binary(filename) else read_node_link_arrays(filename)
+
+
+def load_graph_file(filename, multigraph=None, directed=None, progress=None):
+    # 按扩展名读取 .gbin 或 node-link JSON 文件，返回 networkx 图；无向图直接由数组建立图存储（StoreGraph），不构建嵌套字典。
+    # multigraph、directed 为 None 时按文件中的标志，否则强制使用；directed=False 时有向图的每条边都作为一条无向边读入
+    report(progress, 0.0, '正在读取图文件')
+    arrays = read_graph_arrays(filename)
+    if directed is not None:
+        arrays.directed = directed
+    report(progress, 0.5, '正在构建图')
+    if arrays.directed:
+        return arrays.to_networkx(multigraph)
+    from graph_core.graph_store import GraphStore
+
+    graph = GraphStore.from_arrays(arrays, multigraph).networkx()
+    graph.graph.update(arrays.graph_attrs)
+    return graph
+
+
+def save_graph_file(graph, filename, progress=None):
+    report(progress, 0.0, '正在保存图文件')
+    if is_binary(filename):
+        write_binary(GraphArrays.from_networkx(graph), filename)
+    else:
+        write_node_link(graph, filename)
+
+
+# 文件对话框使用的过滤器
+FILE_FILTER = 'JSON 文件 (*.json);;二进制图文件 (*.gbin)'
+
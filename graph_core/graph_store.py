@@ -0,0 +1,880 @@
+import copy
+import numbers
+from collections.abc import Mapping, MutableMapping
+from functools import cached_property
+from types import MappingProxyType
+
+import networkx as nx
+import numpy as np
+from networkx.classes import reportviews
+
+# 紧凑的只追加图存储，供三个软件共用，取代 networkx 的嵌套字典：
+#   节点名经 NodeTable 驻留，每个节点名只保存一份，其余地方只存 0..n-1 的整数编号；
+#   边按加入顺序存成两个 int32 端点数组，边编号即下标，允许平行边（多重图）和自环；
+#   边属性 weight、color 按列存成有类型的 NumPy 数组（权重 float64、颜色 int32），没有该属性的边存缺失值；
+#   其余边属性和节点属性只为确实带有属性的边、节点各存一个字典（大图通常一个也没有）；
+#   邻接关系用 CSR 索引（按节点排列的 邻居编号 + 边编号），之后追加的边先记在待合并列表中，积累到一定数量再重建。
+# StoreGraph / StoreMultiGraph 是 nx.Graph / nx.MultiGraph 的子类，把节点表和邻接表换成建立在存储上的映射，
+# 现有代码和 networkx 算法照常使用，也可以像 nx.Graph 一样由其他图或边列表构造（StoreGraph(nx_graph)）、
+# 复制（copy、to_undirected、subgraph(...).copy()、nx.relabel_nodes(G, mapping, copy=True)）、
+# 读写节点和边属性（nx.set_node_attributes 等）。与 networkx 图的区别：
+#   只追加：不能删除节点和边（remove_*、clear_edges、nx.relabel_nodes(G, mapping, copy=False) 抛出 NetworkXError），
+#   需要删除时先用 nx.Graph(G) / nx.MultiGraph(G) 复制为普通 networkx 图；
+#   weight 只能是实数、color 只能是整数，其他类型抛出 TypeError；整数权重按 float64 保存，读回时为浮点数；
+#   把 weight 或 color 设为 None 等同于删除该属性；
+#   多重图平行边的键由存储按加入顺序编号为 0, 1, …，给定的键被忽略；
+#   图属性（G.graph）属于 networkx 图对象而非存储，GraphStore.from_networkx(...).networkx() 不保留图属性；
+#   只支持无向图。
+
+# 边数组容量不足时按该倍数扩容
+GROWTH = 1.5
+# 邻接索引建立后追加的边超过该数时，下次访问邻接关系时整体重建索引
+PENDING_EDGES = 1 << 16
+# 一批边不超过该数时逐条在邻接索引中查找已有的边，否则对全部边的端点键排序后批量查找
+LOOKUP_BATCH = 64
+# 按 edges() 顺序逐块产出边时每块的边数，限制临时 Python 对象的数量
+CHUNK = 1 << 16
+# 支持的边属性列：名称 -> (类型, 缺失值)
+COLUMNS = {'weight': (np.float64, np.nan), 'color': (np.int32, -1)}
+
+# 没有属性的节点、边共用这个只读的空字典
+_EMPTY = MappingProxyType({})
+
+
+class NodeTable:
+    # 节点名驻留表：names[i] 为编号 i 的节点名，index 为其反查字典
+    def __init__(self, names=()):
+        self.names = []
+        self.index = {}
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name):
+        i = self.index.get(name)
+        if i is None:
+            i = self.index[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+
+class _Buffer:
+    # 只追加的 NumPy 数组，容量不足时按 GROWTH 倍扩容，未用的容量预先填为 fill。
+    # values 是当前内容的视图，扩容后旧视图不再随之更新
+    def __init__(self, dtype, fill=0):
+        self.fill = fill
+        self.data = np.empty(0, dtype=dtype)
+        self.size = 0
+
+    @property
+    def values(self):
+        return self.data[:self.size]
+
+    def reserve(self, count):
+        if self.size + count > len(self.data):
+            data = np.full(max(self.size + count, int(len(self.data) * GROWTH) + 16), self.fill, dtype=self.data.dtype)
+            data[:self.size] = self.values
+            self.data = data
+
+    def append(self, value):
+        self.reserve(1)
+        self.data[self.size] = value
+        self.size += 1
+
+    def extend(self, values):
+        self.reserve(len(values))
+        self.data[self.size:self.size + len(values)] = values
+        self.size += len(values)
+
+    def pad(self, count):
+        # 追加 count 个 fill
+        self.reserve(count)
+        self.size += count
+
+    def copy(self):
+        buffer = _Buffer(self.data.dtype, self.fill)
+        buffer.data = self.values.copy()
+        buffer.size = self.size
+        return buffer
+
+
+def _check_column(name):
+    if name not in COLUMNS:
+        raise KeyError(f'{name!r} 不是图存储的属性列，属性列只有 {"、".join(COLUMNS)}')
+
+
+def _checked(name, value):
+    # 属性列只能保存数值：整数列（color）要求整数，浮点列（weight）要求实数，不做字符串等类型的隐式转换
+    integral = np.issubdtype(COLUMNS[name][0], np.integer)
+    if isinstance(value, str) or not isinstance(value, numbers.Integral if integral else numbers.Real):
+        raise TypeError(f'图存储的边属性 {name!r} 只能是{"整数" if integral else "实数"}，不能是 {value!r}')
+    return value
+
+
+def _split(attrs):
+    # 把边属性字典拆成 (属性列中的属性, 其余属性)
+    columns, extra = {}, {}
+    for name, value in attrs.items():
+        (columns if name in COLUMNS else extra)[name] = value
+    return columns, extra
+
+
+def _no_removal(*args, **kwargs):
+    raise nx.NetworkXError('图存储只支持追加节点和边，不能删除；需要删除时先用 nx.Graph(G) 或 nx.MultiGraph(G) 复制为普通 networkx 图')
+
+
+def _present(name, values):
+    missing = COLUMNS[name][1]
+    return ~np.isnan(values) if missing != missing else values != missing
+
+
+class GraphStore:
+    def __init__(self, multigraph=False):
+        self.multigraph = multigraph
+        self.nodes = NodeTable()
+        self.sources = _Buffer(np.int32)
+        self.targets = _Buffer(np.int32)
+        self.degree = _Buffer(np.int32)  # 与 networkx 相同，自环计两次
+        self.columns = {}  # 边属性名 -> _Buffer，第一次写入该属性时创建
+        self.node_attrs = {}  # 节点编号 -> 属性字典，只保存有属性的节点
+        self.edge_attrs = {}  # 边编号 -> 不在 COLUMNS 中的属性字典，只保存有这类属性的边
+        self._adjacency = None  # (offsets, 邻居编号, 边编号)，覆盖前 _indexed 条边
+        self._indexed = 0
+        self._pending = {}  # 节点编号 -> [(邻居编号, 边编号)]，索引建立之后追加的边
+        self._order = None  # edge_order() 的缓存
+
+    @classmethod
+    def from_arrays(cls, arrays, multigraph=None):
+        # 由 GraphArrays（文件读取结果）直接建立，不经过 networkx。简单图中重复的边合并为一条，属性取最后一次。
+        # 图属性 arrays.graph_attrs 不属于存储，由调用方放到 networkx 图上
+        if arrays.directed:
+            raise ValueError('图存储只支持无向图')
+        store = cls(arrays.multigraph if multigraph is None else multigraph)
+        store.nodes = NodeTable(arrays.nodes)
+        store.degree.pad(len(store.nodes))
+        store.node_attrs = {i: dict(attrs) for i, attrs in arrays.node_attrs.items()}
+        values = {} if arrays.weights is None else {'weight': np.asarray(arrays.weights, dtype=np.float64)}
+        extra, color = [], []
+        for j, attrs in sorted(arrays.edge_attrs.items()):
+            columns, rest = _split(attrs)
+            if rest:
+                extra.append((j, rest))
+            if 'color' in columns:
+                color.append((j, _checked('color', columns['color'])))
+        ids = store._add_ids(np.asarray(arrays.sources, dtype=np.int64), np.asarray(arrays.targets, dtype=np.int64), values)
+        store._update_extra(ids, extra)
+        for j, c in color:
+            store.set_value('color', int(ids[j]), c)
+        return store
+
+    @classmethod
+    def from_networkx(cls, graph, multigraph=None):
+        # 复制 networkx 图的节点、边以及节点和边的属性（图属性 graph.graph 不属于存储）
+        if graph.is_directed():
+            raise ValueError('图存储只支持无向图')
+        store = cls(graph.is_multigraph() if multigraph is None else multigraph)
+        for node, attrs in graph.nodes(data=True):
+            i = store.add_node(node)
+            if attrs:
+                store.node_attrs[i] = dict(attrs)
+        index = store.nodes.index
+        m = graph.number_of_edges()
+        pairs = np.fromiter((index[x] for edge in graph.edges() for x in edge[:2]), dtype=np.int64, count=2 * m)
+        pairs = pairs.reshape(-1, 2)
+        values = {}
+        for name, (dtype, missing) in COLUMNS.items():
+            if any(name in d for _, _, d in graph.edges(data=True)):
+                values[name] = np.fromiter((_checked(name, d[name]) if name in d else missing
+                                            for _, _, d in graph.edges(data=True)), dtype=dtype, count=m)
+        extra = [(j, _split(d)[1]) for j, (_, _, d) in enumerate(graph.edges(data=True)) if d.keys() - COLUMNS.keys()]
+        ids = store._add_ids(pairs[:, 0], pairs[:, 1], values)
+        store._update_extra(ids, extra)
+        return store
+
+    def networkx(self):
+        # 建立在本存储上的 networkx 图
+        return StoreMultiGraph(store=self) if self.multigraph else StoreGraph(store=self)
+
+    def copy(self):
+        store = GraphStore(self.multigraph)
+        store.nodes = NodeTable(self.nodes.names)
+        store.sources, store.targets, store.degree = self.sources.copy(), self.targets.copy(), self.degree.copy()
+        store.columns = {name: column.copy() for name, column in self.columns.items()}
+        store.node_attrs = {i: dict(attrs) for i, attrs in self.node_attrs.items()}
+        store.edge_attrs = {e: dict(attrs) for e, attrs in self.edge_attrs.items()}
+        return store
+
+    @property
+    def num_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def num_edges(self):
+        return self.sources.size
+
+    def nbytes(self):
+        # 各数组实际占用的字节数（含预留容量和缓存的索引），不含节点名表
+        arrays = [self.sources.data, self.targets.data, self.degree.data]
+        arrays += [column.data for column in self.columns.values()]
+        arrays += list(self._adjacency or ())
+        arrays += list(self._order or ())
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    def add_node(self, name):
+        i = self.nodes.intern(name)
+        if i == self.degree.size:
+            self.degree.append(0)
+        return i
+
+    def add_edge(self, u, v, attrs=None):
+        # 加入边 (u, v) 并返回边编号。简单图中已有该边时只更新属性，与 nx.Graph.add_edge 相同
+        for name, value in (attrs or {}).items():
+            if name in COLUMNS:
+                _checked(name, value)
+        s, d = self.add_node(u), self.add_node(v)
+        e = -1 if self.multigraph else self._find(s, d)
+        if e < 0:
+            e = self.num_edges
+            self.sources.append(s)
+            self.targets.append(d)
+            self.degree.data[s] += 1
+            self.degree.data[d] += 1
+            for column in self.columns.values():
+                column.pad(1)
+            self._order = None
+            self._index_edge(e, s, d)
+        for name, value in (attrs or {}).items():
+            self.set_attr(e, name, value)
+        return e
+
+    def add_edges_from(self, edges):
+        # edges: [(u, v, 属性字典或 None)]，返回各边的编号数组
+        edges = list(edges)
+        if len(edges) <= LOOKUP_BATCH:
+            return np.array([self.add_edge(u, v, attrs) for u, v, attrs in edges], dtype=np.int64)
+        names = {name for _, _, attrs in edges for name in attrs or () if name in COLUMNS}
+        pairs = np.fromiter((self.add_node(x) for u, v, _ in edges for x in (u, v)), dtype=np.int64,
+                            count=2 * len(edges)).reshape(-1, 2)
+        values = {}
+        for name in names:
+            dtype, missing = COLUMNS[name]
+            values[name] = np.fromiter((_checked(name, attrs[name]) if attrs and name in attrs else missing
+                                        for _, _, attrs in edges), dtype=dtype, count=len(edges))
+        extra = [(j, _split(attrs)[1]) for j, (_, _, attrs) in enumerate(edges) if attrs and attrs.keys() - COLUMNS.keys()]
+        ids = self._add_ids(pairs[:, 0], pairs[:, 1], values)
+        self._update_extra(ids, extra)
+        return ids
+
+    def _update_extra(self, ids, extra):
+        # extra: [(批内序号, 非属性列的属性字典)]，按顺序合并到对应边上（简单图中重复的边依次覆盖）
+        for j, attrs in extra:
+            self.edge_attrs.setdefault(int(ids[j]), {}).update(attrs)
+
+    def _add_ids(self, s, d, values):
+        # 按节点编号批量加边，values 为 {属性名: 与边一一对应的数组}。
+        # 简单图中与已有边或本批中更早的边端点相同的边不再追加，属性按出现顺序覆盖（缺失值不覆盖）
+        m0 = self.num_edges
+        if self.multigraph:
+            ids = np.arange(m0, m0 + len(s))
+            new = np.ones(len(s), dtype=bool)
+            first = np.arange(len(s))
+        else:
+            keys = self._keys(s, d)
+            ids = self._lookup(keys)
+            new = ids < 0
+            # 本批内重复的端点对只追加第一次出现的边，新边按第一次出现的顺序编号
+            _, first, inverse = np.unique(keys[new], return_index=True, return_inverse=True)
+            rank = np.empty(len(first), dtype=np.int64)
+            rank[np.argsort(first, kind='stable')] = np.arange(len(first))
+            ids[new] = m0 + rank[inverse.reshape(-1)]
+            first = np.flatnonzero(new)[np.sort(first)]
+        added_s, added_d = s[first], d[first]
+        self.sources.extend(added_s)
+        self.targets.extend(added_d)
+        np.add.at(self.degree.data, added_s, 1)
+        np.add.at(self.degree.data, added_d, 1)
+        for column in self.columns.values():
+            column.pad(len(first))
+        self._order = None
+        if self._adjacency is not None:
+            if self.num_edges - self._indexed > PENDING_EDGES:
+                self._adjacency = None
+            else:
+                for e, a, b in zip(range(m0, self.num_edges), added_s.tolist(), added_d.tolist()):
+                    self._index_edge(e, a, b)
+        for name, column in values.items():
+            present = np.flatnonzero(_present(name, column))
+            # 同一条边出现多次时取最后一次的值
+            last = present[::-1][np.unique(ids[present[::-1]], return_index=True)[1]]
+            self.set_values(name, ids[last], column[last])
+        return ids
+
+    def _keys(self, s, d):
+        # 无序端点对的整数键
+        s, d = np.asarray(s, dtype=np.int64), np.asarray(d, dtype=np.int64)
+        return np.minimum(s, d) * max(self.num_nodes, 1) + np.maximum(s, d)
+
+    def _lookup(self, keys):
+        # 端点键对应的已有边编号（多重图中为第一条平行边），没有时为 -1
+        ids = np.full(len(keys), -1, dtype=np.int64)
+        if not self.num_edges or not len(keys):
+            return ids
+        existing = self._keys(self.sources.values, self.targets.values)
+        order = np.argsort(existing, kind='stable')
+        existing = existing[order]
+        at = np.minimum(np.searchsorted(existing, keys), len(existing) - 1)
+        found = existing[at] == keys
+        ids[found] = order[at[found]]
+        return ids
+
+    def _find(self, s, d):
+        # 在度数较小的一端的邻接关系中查找边 (s, d)，返回第一条的编号，没有时为 -1
+        if self.degree.data[s] > self.degree.data[d]:
+            s, d = d, s
+        nbrs, ids = self.neighbors(s)
+        hit = ids[nbrs == d]
+        return int(hit[0]) if len(hit) else -1
+
+    def edge_ids(self, edges):
+        # 一组 (u, v) 节点名对应的边编号数组（多重图中为第一条平行边），不存在的边为 -1
+        index = self.nodes.index
+        pairs = np.array([(index.get(u, -1), index.get(v, -1)) for u, v in edges], dtype=np.int64).reshape(-1, 2)
+        known = (pairs >= 0).all(axis=1)
+        ids = np.full(len(pairs), -1, dtype=np.int64)
+        if known.sum() <= LOOKUP_BATCH:
+            ids[known] = [self._find(s, d) for s, d in pairs[known].tolist()]
+        else:
+            ids[known] = self._lookup(self._keys(pairs[known, 0], pairs[known, 1]))
+        return ids
+
+    def _index_edge(self, e, s, d):
+        if self._adjacency is None:
+            return
+        if e - self._indexed >= PENDING_EDGES:
+            self._adjacency = None
+            return
+        self._pending.setdefault(s, []).append((d, e))
+        if s != d:
+            self._pending.setdefault(d, []).append((s, e))
+
+    def _index(self):
+        # 按节点排列的邻接索引，同一节点的邻居按边编号排序，自环只出现一次
+        if self._adjacency is None:
+            src, dst = self.sources.values, self.targets.values
+            ids = np.arange(self.num_edges, dtype=np.int32)
+            other = src != dst
+            ends = np.concatenate([src, dst[other]])
+            order = np.lexsort((np.concatenate([ids, ids[other]]), ends))
+            offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(ends, minlength=self.num_nodes), out=offsets[1:])
+            nbrs = np.concatenate([dst, src[other]])[order]
+            self._adjacency = (offsets, nbrs, np.concatenate([ids, ids[other]])[order])
+            self._indexed = self.num_edges
+            self._pending = {}
+        return self._adjacency
+
+    def neighbors(self, x):
+        # 节点 x 的 (邻居编号数组, 边编号数组)，按边编号排序
+        offsets, nbrs, ids = self._index()
+        if x + 1 < len(offsets):
+            nbrs, ids = nbrs[offsets[x]:offsets[x + 1]], ids[offsets[x]:offsets[x + 1]]
+        else:
+            nbrs, ids = nbrs[:0], ids[:0]
+        pending = self._pending.get(x)
+        if pending:
+            nbrs = np.concatenate([nbrs, np.array([y for y, _ in pending], dtype=nbrs.dtype)])
+            ids = np.concatenate([ids, np.array([e for _, e in pending], dtype=ids.dtype)])
+        return nbrs, ids
+
+    def column(self, name):
+        # 属性列的当前值（按边编号，缺失值见 COLUMNS），没有任何边有该属性时为 None。返回视图，追加边后失效
+        column = self.columns.get(name)
+        return None if column is None else column.values
+
+    def _column(self, name):
+        column = self.columns.get(name)
+        if column is None:
+            _check_column(name)
+            dtype, missing = COLUMNS[name]
+            column = self.columns[name] = _Buffer(dtype, missing)
+            column.pad(self.num_edges)
+        return column
+
+    def get_value(self, name, e):
+        # 边 e 的属性值（Python 标量），没有该属性时为 None
+        column = self.columns.get(name)
+        if column is None:
+            return None
+        value = column.data[e]
+        return value.item() if _present(name, value) else None
+
+    def set_value(self, name, e, value):
+        # value 为 None 时删除该属性
+        column = self._column(name)
+        column.data[e] = COLUMNS[name][1] if value is None else _checked(name, value)
+
+    def set_attr(self, e, name, value):
+        # 设置边 e 的任意属性：COLUMNS 中的写入属性列，其余写入该边的属性字典
+        if name in COLUMNS:
+            self.set_value(name, e, value)
+        else:
+            self.edge_attrs.setdefault(e, {})[name] = value
+
+    def del_attr(self, e, name):
+        if name in COLUMNS:
+            if self.get_value(name, e) is None:
+                raise KeyError(name)
+            self.set_value(name, e, None)
+            return
+        attrs = self.edge_attrs.get(e, _EMPTY)
+        if name not in attrs:
+            raise KeyError(name)
+        del attrs[name]
+        if not attrs:
+            del self.edge_attrs[e]
+
+    def set_values(self, name, ids, values):
+        ids = np.asarray(ids, dtype=np.int64)
+        if (ids < 0).any():
+            raise KeyError('图中没有其中的部分边')
+        self._column(name).data[ids] = values
+
+    def edge_order(self):
+        # 返回 (边编号数组, 平行边的键数组)，顺序与 StoreGraph.edges() 相同：按编号较小的端点，
+        # 同一端点的边按边编号（多重图中同一端点对的平行边排在该对第一条边的位置，键依次为 0, 1, …）
+        if self._order is None:
+            src, dst = self.sources.values, self.targets.values
+            ids = np.arange(self.num_edges)
+            low = np.minimum(src, dst)
+            keys = np.zeros(self.num_edges, dtype=np.int32)
+            if self.multigraph and self.num_edges:
+                by_pair = np.lexsort((ids, np.maximum(src, dst), low))
+                pair = self._keys(src, dst)[by_pair]
+                starts = np.flatnonzero(np.concatenate([[True], pair[1:] != pair[:-1]]))
+                counts = np.diff(np.append(starts, self.num_edges))
+                group = np.empty(self.num_edges, dtype=np.int64)
+                group[by_pair] = np.repeat(by_pair[starts], counts)
+                keys[by_pair] = np.arange(self.num_edges) - np.repeat(starts, counts)
+                order = np.lexsort((ids, group, low))
+            else:
+                order = np.lexsort((ids, low))
+            self._order = (order.astype(np.int32), keys[order])
+        return self._order
+
+    def values(self, name, default):
+        # 按边编号给出属性值，缺失的值换成 default；没有任何边有该属性时为 None
+        column = self.column(name)
+        return None if column is None else np.where(_present(name, column), column, default)
+
+    def edge_values(self, name, default):
+        # 按 edges() 的顺序给出属性值，缺失的值换成 default
+        values = self.values(name, default)
+        if values is None:
+            return np.full(self.num_edges, default, dtype=COLUMNS[name][0])
+        return values[self.edge_order()[0]]
+
+    def iter_edges(self):
+        # 按 edges() 的顺序逐块产出 (u, v, 键, 边编号)，u 为编号较小的端点
+        names = self.nodes.names
+        order, keys = self.edge_order()
+        for start in range(0, len(order), CHUNK):
+            ids = order[start:start + CHUNK]
+            src, dst = self.sources.values[ids], self.targets.values[ids]
+            low, high = np.minimum(src, dst).tolist(), np.maximum(src, dst).tolist()
+            yield from zip(map(names.__getitem__, low), map(names.__getitem__, high), keys[start:start + CHUNK].tolist(),
+                           ids.tolist())
+
+    def iter_pairs(self):
+        return ((u, v) for u, v, _, _ in self.iter_edges())
+
+
+def store_of(graph):
+    # graph 直接建立在 GraphStore 上时返回该存储，普通 networkx 图和子图视图返回 None
+    adj = getattr(graph, '_adj', None)
+    return adj.store if type(adj) is _AdjMap else None
+
+
+class _AttrsView(MutableMapping):
+    # 存储中一个节点或一条边的属性字典。复制（copy、copy.copy、copy.deepcopy）得到普通字典，
+    # 这样 to_undirected 等深拷贝属性的 networkx 函数不会连同整个存储一起复制
+    __slots__ = ()
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def copy(self):
+        return dict(self)
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self), memo)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _EdgeAttrs(_AttrsView):
+    # 一条边的属性字典，weight、color 读写存储的属性列，其余属性读写该边的属性字典
+    __slots__ = ('store', 'edge')
+
+    def __init__(self, store, edge):
+        self.store = store
+        self.edge = edge
+
+    def __getitem__(self, name):
+        if name not in COLUMNS:
+            return self.store.edge_attrs.get(self.edge, _EMPTY)[name]
+        value = self.store.get_value(name, self.edge)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name, value):
+        self.store.set_attr(self.edge, name, value)
+
+    def __delitem__(self, name):
+        self.store.del_attr(self.edge, name)
+
+    def __iter__(self):
+        store = self.store
+        names = [name for name in store.columns if store.get_value(name, self.edge) is not None]
+        return iter(names + list(store.edge_attrs.get(self.edge, ())))
+
+
+class _NodeAttrs(_AttrsView):
+    # 一个节点的属性字典，第一次写入属性时才在存储中为该节点建立字典
+    __slots__ = ('store', 'node')
+
+    def __init__(self, store, node):
+        self.store = store
+        self.node = node
+
+    def __getitem__(self, name):
+        return self.store.node_attrs.get(self.node, _EMPTY)[name]
+
+    def __setitem__(self, name, value):
+        self.store.node_attrs.setdefault(self.node, {})[name] = value
+
+    def __delitem__(self, name):
+        attrs = self.store.node_attrs.get(self.node, _EMPTY)
+        if name not in attrs:
+            raise KeyError(name)
+        del attrs[name]
+        if not attrs:
+            del self.store.node_attrs[self.node]
+
+    def __iter__(self):
+        return iter(list(self.store.node_attrs.get(self.node, ())))
+
+
+class _NodeMap(MutableMapping):
+    # 节点名 -> 节点属性字典。赋值（networkx 构造、复制图时的 G._node.update(...)）加入节点并整体替换其属性
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, name):
+        i = self.store.nodes.index.get(name)
+        if i is None:
+            raise KeyError(name)
+        return _NodeAttrs(self.store, i)
+
+    def __setitem__(self, name, attrs):
+        i = self.store.add_node(name)
+        self.store.node_attrs.pop(i, None)
+        if attrs:
+            self.store.node_attrs[i] = dict(attrs)
+
+    __delitem__ = _no_removal
+
+    def __contains__(self, name):
+        return name in self.store.nodes.index
+
+    def __iter__(self):
+        return iter(self.store.nodes.names)
+
+    def __len__(self):
+        return len(self.store.nodes)
+
+
+class _AdjMap(Mapping):
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, name):
+        return _Neighbors(self.store, self.store.nodes.index[name])
+
+    def __contains__(self, name):
+        return name in self.store.nodes.index
+
+    def __iter__(self):
+        return iter(self.store.nodes.names)
+
+    def __len__(self):
+        return len(self.store.nodes)
+
+
+class _Neighbors(Mapping):
+    # 一个节点的邻居映射：简单图为 {邻居: 边属性}，多重图为 {邻居: {键: 边属性}}，邻居按第一条相连边的编号排序
+    def __init__(self, store, x):
+        self.store = store
+        self.nbrs, self.ids = store.neighbors(x)
+        self._by_nbr = None
+
+    def _edges_to(self, name):
+        j = self.store.nodes.index.get(name)
+        if j is None:
+            return self.ids[:0]
+        if len(self.nbrs) <= LOOKUP_BATCH:
+            return self.ids[self.nbrs == j]
+        # 邻居较多时（如逐个邻居取边属性）建一次 邻居 -> 边编号 的字典，之后每次查找 O(1)
+        if self._by_nbr is None:
+            self._by_nbr = {}
+            for y, e in zip(self.nbrs.tolist(), self.ids.tolist()):
+                self._by_nbr.setdefault(y, []).append(e)
+        return np.array(self._by_nbr.get(j, ()), dtype=self.ids.dtype)
+
+    def __getitem__(self, name):
+        ids = self._edges_to(name)
+        if not len(ids):
+            raise KeyError(name)
+        if not self.store.multigraph:
+            return _EdgeAttrs(self.store, int(ids[0]))
+        return {k: _EdgeAttrs(self.store, e) for k, e in enumerate(ids.tolist())}
+
+    def __contains__(self, name):
+        return len(self._edges_to(name)) > 0
+
+    def _unique(self):
+        if not self.store.multigraph:
+            return self.nbrs
+        _, first = np.unique(self.nbrs, return_index=True)
+        return self.nbrs[np.sort(first)]
+
+    def __iter__(self):
+        names = self.store.nodes.names
+        return iter([names[j] for j in self._unique().tolist()])
+
+    def __len__(self):
+        return len(self._unique())
+
+    def items(self):
+        # 一次遍历得到全部邻居及其边，不逐个邻居查找
+        store, names = self.store, self.store.nodes.names
+        if not store.multigraph:
+            return [(names[j], _EdgeAttrs(store, e)) for j, e in zip(self.nbrs.tolist(), self.ids.tolist())]
+        groups = {}
+        for j, e in zip(self.nbrs.tolist(), self.ids.tolist()):
+            groups.setdefault(j, []).append(e)
+        return [(names[j], {k: _EdgeAttrs(store, e) for k, e in enumerate(ids)}) for j, ids in groups.items()]
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+
+def _whole_store(view):
+    # 视图覆盖整个存储（未限定 nbunch）时返回存储，可以按数组顺序快速遍历
+    adj = view._adjdict
+    if type(adj) is _AdjMap and getattr(view, '_nbunch', None) is None:
+        return adj.store
+    return None
+
+
+class _EdgeDataView(reportviews.EdgeDataView):
+    def __iter__(self):
+        store = _whole_store(self)
+        if store is None:
+            return super().__iter__()
+        if self._data is False:
+            return store.iter_pairs()
+        report = self._report
+        return (report(u, v, _EdgeAttrs(store, e)) for u, v, _, e in store.iter_edges())
+
+    def __len__(self):
+        store = _whole_store(self)
+        return super().__len__() if store is None else store.num_edges
+
+
+class _EdgeView(reportviews.EdgeView):
+    dataview = _EdgeDataView
+
+    def __iter__(self):
+        store = _whole_store(self)
+        return super().__iter__() if store is None else store.iter_pairs()
+
+    def __len__(self):
+        store = _whole_store(self)
+        return super().__len__() if store is None else store.num_edges
+
+
+class _MultiEdgeDataView(reportviews.MultiEdgeDataView):
+    def __iter__(self):
+        store = _whole_store(self)
+        if store is None:
+            return super().__iter__()
+        if self._data is False and not self.keys:
+            return store.iter_pairs()
+        report, data = self._report, self._data is not False
+        return (report(u, v, k, _EdgeAttrs(store, e) if data else None) for u, v, k, e in store.iter_edges())
+
+    def __len__(self):
+        store = _whole_store(self)
+        return super().__len__() if store is None else store.num_edges
+
+
+class _MultiEdgeView(reportviews.MultiEdgeView):
+    dataview = _MultiEdgeDataView
+
+    def __iter__(self):
+        store = _whole_store(self)
+        if store is None:
+            return super().__iter__()
+        return ((u, v, k) for u, v, k, _ in store.iter_edges())
+
+    def __len__(self):
+        store = _whole_store(self)
+        return super().__len__() if store is None else store.num_edges
+
+
+def _degree_store(view):
+    adj = view._succ
+    if type(adj) is _AdjMap and view._nodes is adj and view._weight is None:
+        return adj.store
+    return None
+
+
+class _DegreeView(reportviews.DegreeView):
+    def __iter__(self):
+        store = _degree_store(self)
+        if store is None:
+            return super().__iter__()
+        return zip(list(store.nodes.names), store.degree.values.tolist())
+
+    def __getitem__(self, n):
+        store = _degree_store(self)
+        if store is None:
+            return super().__getitem__(n)
+        return int(store.degree.data[store.nodes.index[n]])
+
+
+class _MultiDegreeView(reportviews.MultiDegreeView):
+    def __iter__(self):
+        store = _degree_store(self)
+        if store is None:
+            return super().__iter__()
+        return zip(list(store.nodes.names), store.degree.values.tolist())
+
+    def __getitem__(self, n):
+        store = _degree_store(self)
+        if store is None:
+            return super().__getitem__(n)
+        return int(store.degree.data[store.nodes.index[n]])
+
+
+class _StoreMixin:
+    # 把 networkx 图的节点表和邻接表换成建立在 GraphStore 上的映射。
+    # 读操作（包括 networkx 算法）照常工作；加节点、加边及其属性写入存储，与 networkx 的区别见模块开头
+    def __init__(self, incoming_graph_data=None, store=None, **attr):
+        self.store = GraphStore(self.is_multigraph()) if store is None else store
+        super().__init__(**attr)
+        self._bind()
+        if incoming_graph_data is not None:
+            nx.convert.to_networkx_graph(incoming_graph_data, create_using=self)
+
+    def _bind(self):
+        self._node = _NodeMap(self.store)
+        self._adj = _AdjMap(self.store)
+
+    @cached_property
+    def edges(self):
+        return _MultiEdgeView(self) if self.is_multigraph() else _EdgeView(self)
+
+    @cached_property
+    def degree(self):
+        return _MultiDegreeView(self) if self.is_multigraph() else _DegreeView(self)
+
+    def add_node(self, node_for_adding, **attr):
+        if node_for_adding is None:
+            raise ValueError('None cannot be a node')
+        i = self.store.add_node(node_for_adding)
+        if attr:
+            self.store.node_attrs.setdefault(i, {}).update(attr)
+
+    def add_nodes_from(self, nodes_for_adding, **attr):
+        for node in nodes_for_adding:
+            try:
+                hash(node)
+                data = attr
+            except TypeError:
+                # (节点, 属性字典)
+                node, node_attr = node
+                data = {**attr, **node_attr}
+            self.add_node(node, **data)
+
+    def _edge_tuples(self, ebunch_to_add, attr):
+        for edge in ebunch_to_add:
+            if len(edge) == 4:
+                u, v, _, data = edge
+            elif len(edge) == 3:
+                u, v, data = edge
+                if not isinstance(data, Mapping):
+                    data = {}
+            elif len(edge) == 2:
+                (u, v), data = edge, {}
+            else:
+                raise nx.NetworkXError(f'Edge tuple {edge} must be a 2-tuple or 3-tuple.')
+            if u is None or v is None:
+                raise ValueError('None cannot be a node')
+            yield u, v, {**attr, **data} if attr or data else None
+
+    def clear(self):
+        self.store = GraphStore(self.is_multigraph())
+        self.graph.clear()
+        self._bind()
+
+    remove_node = remove_nodes_from = remove_edge = remove_edges_from = clear_edges = _no_removal
+
+    def number_of_edges(self, u=None, v=None):
+        store = store_of(self)
+        if u is None and store is not None:
+            return store.num_edges
+        return super().number_of_edges(u, v)
+
+    def copy(self, as_view=False):
+        store = store_of(self)
+        if as_view or store is None:
+            return super().copy(as_view)
+        graph = self.__class__(store=store.copy())
+        graph.graph.update(self.graph)
+        return graph
+
+
+class StoreGraph(_StoreMixin, nx.Graph):
+    def add_edge(self, u_of_edge, v_of_edge, **attr):
+        if u_of_edge is None or v_of_edge is None:
+            raise ValueError('None cannot be a node')
+        self.store.add_edge(u_of_edge, v_of_edge, attr)
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        self.store.add_edges_from(self._edge_tuples(ebunch_to_add, attr))
+
+
+class StoreMultiGraph(_StoreMixin, nx.MultiGraph):
+    def add_edge(self, u_for_edge, v_for_edge, key=None, **attr):
+        # 返回新边的键（该端点对之前已有的平行边数）
+        if u_for_edge is None or v_for_edge is None:
+            raise ValueError('None cannot be a node')
+        self.store.add_edge(u_for_edge, v_for_edge, attr)
+        return len(self._adj[u_for_edge][v_for_edge]) - 1
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        ids = self.store.add_edges_from(self._edge_tuples(ebunch_to_add, attr))
+        order, keys = self.store.edge_order()
+        by_edge = np.empty(len(order), dtype=np.int64)
+        by_edge[order] = keys
+        return by_edge[ids].tolist()
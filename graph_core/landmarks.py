@@ -0,0 +1,169 @@
+import hashlib
+import heapq
+import math
+import random
+import time
+
+import numpy as np
+
+from graph_core.progress import report
+from graph_core.shortest_path import dijkstra
+
+
+def graph_fingerprint(csr):
+    # 图内容的摘要，用于判断持久化的索引是否仍与图一致
+    h = hashlib.blake2b(digest_size=16)
+    h.update('\0'.join(map(str, csr.nodes)).encode('utf-8'))
+    for array in (csr.offsets, csr.targets, csr.weights):
+        h.update(np.ascontiguousarray(array).tobytes())
+    return h.hexdigest()
+
+
+def _lower_bound(diff):
+    # 各地标给出的下界取最大值；与地标不连通的分量（inf - inf = nan）不参与
+    bound = np.fmax.reduce(np.abs(diff))
+    return bound if bound >= 0 else 0.0
+
+
+class LandmarkIndex:
+    # ALT 预处理索引（A*, Landmarks, Triangle inequality）：
+    # 预先计算若干地标到所有节点的距离表，查询时由三角不等式得到到终点距离的下界，
+    # 作为双向 A* 的势函数，搜索范围远小于普通 Dijkstra。只适用于无向、非负权图，图一旦修改索引即失效。
+
+    def __init__(self, landmarks, table, fingerprint, build_seconds=0.0):
+        self.landmarks = landmarks  # 地标节点编号
+        self.table = table  # (节点数, 地标数) 的距离表
+        self.fingerprint = fingerprint
+        self.build_seconds = build_seconds
+
+    @classmethod
+    def build(cls, csr, num_landmarks=8, seed=0, progress=None):
+        if csr.directed:
+            raise ValueError('地标索引只支持无向图。')
+        started = time.perf_counter()
+        n = csr.num_nodes
+        k = min(num_landmarks, n)
+        table = np.empty((n, k), dtype=np.float64)
+        landmarks = []
+        # 最远点选取：每次选择到已有地标最小距离最大的节点，不连通的分量会被自然覆盖
+        nearest = np.full(n, math.inf)
+        current = random.Random(seed).randrange(n) if n else 0
+        for i in range(k):
+            report(progress, i / k, f'正在计算第 {i + 1}/{k} 个地标')
+            dist = np.array(dijkstra(csr, current)[0])
+            if i == 0:
+                # 第一个随机点只用来找到图的“边缘”，不作为地标
+                finite = np.where(np.isfinite(dist), dist, -1)
+                current = int(finite.argmax())
+                dist = np.array(dijkstra(csr, current)[0])
+            landmarks.append(current)
+            table[:, i] = dist
+            np.minimum(nearest, dist, out=nearest)
+            nearest[landmarks] = -1
+            current = int(nearest.argmax())
+        return cls(np.array(landmarks, dtype=np.int64), table, graph_fingerprint(csr),
+                   time.perf_counter() - started)
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes + self.landmarks.nbytes
+
+    def save(self, filename):
+        with open(filename, 'wb') as f:
+            np.savez(f, landmarks=self.landmarks, table=self.table, fingerprint=np.array(self.fingerprint),
+                     build_seconds=np.array(self.build_seconds))
+
+    @classmethod
+    def load(cls, filename, csr=None):
+        # 给定 csr 时校验摘要，不一致（图已被修改）返回 None
+        with np.load(filename) as data:
+            fingerprint = str(data['fingerprint'])
+            if csr is not None and (fingerprint != graph_fingerprint(csr) or data['table'].shape[0] != csr.num_nodes):
+                return None
+            return cls(data['landmarks'], data['table'], fingerprint, float(data['build_seconds']))
+
+    def query(self, csr, s, t):
+        # 双向 A*，势函数取前向、后向下界之差的一半，使两个方向的约化边权一致且非负。
+        # 返回 (整数编号路径, 距离)，不可达时返回 (None, inf)
+        if s == t:
+            return [s], 0.0
+        table = self.table
+        ts, tt = table[s], table[t]
+        with np.errstate(invalid='ignore'):
+            if np.any(np.isfinite(ts) != np.isfinite(tt)):
+                return None, math.inf  # 某个地标只能到达其中一个端点：s 与 t 不连通
+            potentials = {}
+
+            def potential(v):
+                p = potentials.get(v)
+                if p is None:
+                    tv = table[v]
+                    p = potentials[v] = (_lower_bound(tt - tv) - _lower_bound(ts - tv)) / 2
+                return p
+
+            ps, pt = potential(s), potential(t)
+            dist = ({s: 0.0}, {t: 0.0})
+            pred = ({s: -1}, {t: -1})
+            done = (set(), set())
+            heaps = ([(0.0, s)], [(0.0, t)])
+            signs = (1, -1)
+            offsets = (-ps, pt)
+            best, meet = math.inf, -1
+            offsets_arr, targets, weights = csr.offsets, csr.targets, csr.weights
+            while heaps[0] and heaps[1]:
+                if heaps[0][0][0] + heaps[1][0][0] >= best + pt - ps:
+                    break
+                side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+                _, u = heapq.heappop(heaps[side])
+                if u in done[side]:
+                    continue
+                done[side].add(u)
+                d_here, d_other = dist[side], dist[1 - side]
+                du = d_here[u]
+                lo, hi = offsets_arr[u], offsets_arr[u + 1]
+                for v, w in zip(targets[lo:hi].tolist(), weights[lo:hi].tolist()):
+                    nd = du + w
+                    if nd < d_here.get(v, math.inf):
+                        d_here[v] = nd
+                        pred[side][v] = u
+                        heapq.heappush(heaps[side], (nd + signs[side] * potential(v) + offsets[side], v))
+                        if v in d_other and nd + d_other[v] < best:
+                            best, meet = nd + d_other[v], v
+        if meet < 0:
+            return None, math.inf
+
+        path = [meet]
+        while pred[0][path[-1]] != -1:
+            path.append(pred[0][path[-1]])
+        path.reverse()
+        v = meet
+        while pred[1][v] != -1:
+            v = pred[1][v]
+            path.append(v)
+        return path, best
+
+
+def compare_with_networkx(graph, csr, index, samples=20, seed=0):
+    # 在随机起终点对上对比地标索引与 nx.dijkstra_path 的查询用时
+    import networkx as nx
+
+    rng = random.Random(seed)
+    pairs = [(rng.randrange(csr.num_nodes), rng.randrange(csr.num_nodes)) for _ in range(samples)]
+    started = time.perf_counter()
+    for s, t in pairs:
+        index.query(csr, s, t)
+    index_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    for s, t in pairs:
+        try:
+            nx.dijkstra_path(graph, csr.nodes[s], csr.nodes[t], weight='weight')
+        except nx.NetworkXNoPath:
+            pass
+    nx_seconds = time.perf_counter() - started
+    return {
+        'build_seconds': index.build_seconds,
+        'index_bytes': index.nbytes,
+        'index_seconds': index_seconds / samples,
+        'networkx_seconds': nx_seconds / samples,
+        'speedup': nx_seconds / index_seconds if index_seconds else math.inf,
+    }
@@ -0,0 +1,113 @@
+import math
+
+import networkx as nx
+import numpy as np
+
+from graph_core.force_layout import multilevel_layout
+from graph_core.progress import report
+
+# 整图布局超过该节点数时改用多层网格力导向布局（graph_core.force_layout），nx.spring_layout 在几千个节点以上就难以使用
+SPRING_LIMIT = 1000
+
+
+class LayoutCache:
+    # 以图的版本号为键缓存节点坐标。
+    # 图发生增量修改（如添加一条边）后，以上一次的坐标作为初始值，
+    # 只在变化节点附近的局部子图上补充迭代，其余节点保持不动，避免整图重新布局导致位置跳动。
+
+    def __init__(self, iterations=50, local_iterations=30, radius=1, seed=42):
+        self.iterations = iterations  # 首次（整图）布局的迭代次数
+        self.local_iterations = local_iterations  # 局部调整的迭代次数
+        self.radius = radius  # 局部调整覆盖的邻域跳数
+        self.seed = seed
+        self.version = None
+        self.pos = {}
+        self._dirty = set()
+        self._full = True
+        self._rng = np.random.default_rng(seed)
+
+    def invalidate(self, nodes=None):
+        # nodes 为 None 表示整图被替换（如加载文件），下次需要完整布局；
+        # 否则记录受影响的节点，下次只在其附近局部调整
+        if nodes is None:
+            self.pos = {}
+            self._dirty.clear()
+            self._full = True
+        else:
+            self._dirty.update(nodes)
+
+    def positions(self, graph, version, progress=None, partial=None):
+        # partial 仅用于大图的整图布局：计算过程中用中间坐标 {节点: 坐标} 调用，用于显示收敛过程
+        if version == self.version and len(self.pos) == len(graph):
+            return self.pos
+
+        report(progress, 0.0, '正在计算布局')
+        # 布局在后台线程计算时界面线程仍可能记录新的变化节点，只处理并移除开始时已记录的这些
+        taken = set(self._dirty)
+        # 删除已不在图中的节点
+        pos = {n: p for n, p in self.pos.items() if n in graph}
+        if self._full or not pos:
+            if len(graph) > SPRING_LIMIT:
+                pos = multilevel_layout(graph, seed=self.seed, progress=progress, partial=partial)
+            else:
+                pos = nx.spring_layout(graph, iterations=self.iterations, seed=self.seed) if len(graph) else {}
+        else:
+            dirty = {n for n in taken if n in graph}
+            dirty.update(n for n in graph if n not in pos)
+            if dirty:
+                pos = self._refine(graph, pos, dirty)
+
+        self.pos = pos
+        self.version = version
+        self._dirty -= taken
+        self._full = False
+        return self.pos
+
+    def _refine(self, graph, pos, dirty):
+        # 与 spring_layout 缩放到 [-1, 1] 后的节点间距保持一致
+        k = 2.0 / math.sqrt(len(graph))
+
+        # 受影响区域：变化节点及其 radius 跳邻域
+        region = set(dirty)
+        frontier = set(dirty)
+        for _ in range(self.radius):
+            frontier = {m for n in frontier for m in graph.neighbors(n)} - region
+            region |= frontier
+        # 区域外一圈的邻居作为固定锚点，使局部结果与整体衔接
+        boundary = {m for n in region for m in graph.neighbors(n)} - region
+        boundary = {n for n in boundary if n in pos}
+        # 已有坐标但处于区域内的非变化节点也可以移动，新节点需要初始坐标
+        init = {}
+        for n in region:
+            if n in pos:
+                init[n] = pos[n]
+                continue
+            placed = [pos[m] for m in graph.neighbors(n) if m in pos]
+            if placed:
+                init[n] = np.mean(placed, axis=0) + self._rng.normal(scale=k / 2, size=2)
+            else:
+                init[n] = None
+        anchor = np.mean(list(pos.values()), axis=0) if pos else np.zeros(2)
+        for n in region:
+            if init[n] is None:
+                init[n] = anchor + self._rng.uniform(-1, 1, size=2)
+        for n in boundary:
+            init[n] = pos[n]
+
+        sub = graph.subgraph(region | boundary)
+        if boundary:
+            new_pos = nx.spring_layout(
+                sub, k=k, pos=init, fixed=boundary, iterations=self.local_iterations, seed=self.seed
+            )
+        else:
+            # 新出现的孤立连通分量：在画面内找一处放置，尺寸按节点数缩放
+            center = self._rng.uniform(-1, 1, size=2)
+            scale = min(1.0, k * math.sqrt(len(region)))
+            new_pos = nx.spring_layout(
+                sub, k=k, pos=init, iterations=self.local_iterations, seed=self.seed, scale=scale, center=center
+            )
+
+        pos = dict(pos)
+        for n in region:
+            pos[n] = np.asarray(new_pos[n])
+        return pos
@@ -0,0 +1,248 @@
+import heapq
+import math
+import time
+from array import array
+
+import numpy as np
+
+from graph_core.euler import EulerTour, half_edges, hierholzer
+from graph_core.progress import PROGRESS_INTERVAL, report
+
+# 中国邮路（路线检查）问题：求经过每条边至少一次、总长度最短的闭合路线。
+# 做法是在奇度点之间重复若干条最短路使所有节点变为偶度，再求欧拉环路；重复哪些路由奇度点之间的最小权完美匹配决定。
+
+# 奇度点较少时逐个从奇度点出发求出两两之间的精确距离（搜索工作量约为 奇度点数 × 节点数），
+# 并在完全图上做带花树匹配，结果是最优解；否则只做一次从全部奇度点同时出发的多源搜索，
+# 相邻“势力范围”的奇度点之间得到候选路径，在稀疏的候选图上匹配
+EXACT_WORK = 4_000_000
+# networkx 带花树匹配的用时约为 该系数 × 奇度点数 × 候选对数（秒），估计值超过时间预算时改用贪心匹配
+BLOSSOM_SECONDS = 2e-6
+# 默认时间预算（秒），贪心匹配之后在剩余时间内做局部改进
+TIME_BUDGET = 10.0
+
+
+class PostmanTour(EulerTour):
+    # 中国邮路结果：一条闭合路线，补上的边在 edge_ids 中重复出现。
+    # cost 为路线总长度，extra_cost 为重复经过部分的长度；exact 为 False 时匹配是近似的
+    def __init__(self, names, node_ids, edge_ids, num_edges, cost, extra_cost, exact):
+        super().__init__(names, node_ids, edge_ids, num_edges)
+        self.cost = cost
+        self.extra_cost = extra_cost
+        self.exact = exact
+
+
+def _search(offsets, adj_node, adj_edge, weights, roots, stop=None, progress=None):
+    # 从 roots 中全部节点同时出发的 Dijkstra。owner[v] 为离 v 最近的出发点，pred[v] 为最短路上到达 v 的边。
+    # 给定 stop（节点集合）时在其全部出堆后结束
+    n = len(offsets) - 1
+    dist = array('d', [math.inf]) * n
+    owner = array('q', [-1]) * n
+    pred = array('q', [-1]) * n
+    done = bytearray(n)
+    for r in roots:
+        dist[r] = 0.0
+        owner[r] = r
+    heap = [(0.0, r) for r in roots]
+    heapq.heapify(heap)
+    remaining = len(stop) if stop is not None else -1
+    settled = 0
+    while heap:
+        d, v = heapq.heappop(heap)
+        if done[v]:
+            continue
+        done[v] = 1
+        settled += 1
+        if not settled % PROGRESS_INTERVAL:
+            report(progress, settled / n, '正在搜索奇度点之间的最短路')
+        if stop is not None and v in stop:
+            remaining -= 1
+            if not remaining:
+                break
+        o = owner[v]
+        for i in range(offsets[v], offsets[v + 1]):
+            e = adj_edge[i]
+            nd = d + weights[e]
+            u = adj_node[i]
+            if nd < dist[u]:
+                dist[u] = nd
+                owner[u] = o
+                pred[u] = e
+                heapq.heappush(heap, (nd, u))
+    return dist, owner, pred
+
+
+def _trace(pred, sources, targets, v):
+    # 沿 pred 从 v 回溯到搜索起点，返回经过的边编号
+    edges = []
+    e = pred[v]
+    while e >= 0:
+        edges.append(e)
+        v = sources[e] if targets[e] == v else targets[e]
+        e = pred[v]
+    return edges
+
+
+# 两个候选图构造函数都返回 ({(a, b): 距离}, path)，a < b，path(a, b) 给出对应路径的边编号列表，只对选中的奇度点对回溯
+
+
+def _exact_candidates(adjacency, weights, sources, targets, odd, progress):
+    # 每个奇度点出发一次，搜到其余奇度点全部出堆为止，得到全部奇度点对之间的最短路
+    candidates, preds = {}, {}
+    stop = set(odd)
+    for k, a in enumerate(odd):
+        report(progress, k / len(odd), '正在求奇度点之间的最短路')
+        dist, _, preds[a] = _search(*adjacency, weights, [a], stop)
+        for b in odd[k + 1:]:
+            if dist[b] < math.inf:
+                candidates[a, b] = dist[b]
+
+    def path(a, b):
+        return _trace(preds[a], sources, targets, b)
+    return candidates, path
+
+
+def _boundary_candidates(adjacency, weights, sources, targets, odd, progress):
+    # 一次多源搜索把节点划分给最近的奇度点，两端归属不同的边连接的两个奇度点成为候选对，
+    # 距离为 边两端各自到出发点的距离 + 边长（取所有这样的边中最短的一条）。
+    # 这是一条真实的路径，但不一定是两点间的最短路，因此在候选图上的匹配是近似的
+    dist, owner, pred = _search(*adjacency, weights, odd, progress=progress)
+    dist = np.frombuffer(dist, dtype=np.float64)
+    owner = np.frombuffer(owner, dtype=np.int64)
+    src, dst = np.asarray(sources), np.asarray(targets)
+    a, b = owner[src], owner[dst]
+    cross = np.flatnonzero((a != b) & (a >= 0) & (b >= 0))
+    cost = dist[src[cross]] + np.asarray(weights)[cross] + dist[dst[cross]]
+    lo, hi = np.minimum(a[cross], b[cross]), np.maximum(a[cross], b[cross])
+    order = np.lexsort((cost, hi, lo))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (lo[order][1:] != lo[order][:-1]) | (hi[order][1:] != hi[order][:-1])
+    keys = zip(lo[order][first].tolist(), hi[order][first].tolist())
+    candidates = dict(zip(keys, cost[order][first].tolist()))
+    via = dict(zip(candidates, cross[order][first].tolist()))
+
+    def path(a, b):
+        e = via[a, b]
+        return _trace(pred, sources, targets, sources[e]) + [e] + _trace(pred, sources, targets, targets[e])
+    return candidates, path
+
+
+def _greedy_matching(candidates, deadline):
+    # 按距离从小到大贪心配对，然后在时间预算内做 2-opt 交换：
+    # 对每个候选对 (a, c)，若 a、c 分别配给了 b、d，而改配为 (a, c)、(b, d) 更短（候选对 (b, d) 存在）就交换
+    mate = {}
+    for a, b in sorted(candidates, key=candidates.get):
+        if a not in mate and b not in mate:
+            mate[a], mate[b] = b, a
+
+    def cost(x, y):
+        return candidates.get((x, y) if x < y else (y, x), math.inf)
+
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for a, c in candidates:
+            b, d = mate.get(a), mate.get(c)
+            if b is None or d is None or b == c:
+                continue
+            if cost(a, c) + cost(b, d) < cost(a, b) + cost(c, d) - 1e-12:
+                mate[a], mate[c], mate[b], mate[d] = c, a, d, b
+                improved = True
+            if time.perf_counter() >= deadline:
+                break
+    return {(a, b) for a, b in mate.items() if a < b}
+
+
+def _match_leftovers(candidates, unmatched):
+    # 候选图上没能配对的奇度点，两两沿候选图中的最短路连接：路径上的中间奇度点被经过两次，奇偶性不变。
+    # 返回 [(a, b)] 候选对列表，有奇度点无法连接时返回 None
+    graph = {}
+    for (a, b), c in candidates.items():
+        graph.setdefault(a, []).append((b, c))
+        graph.setdefault(b, []).append((a, c))
+    unmatched = set(unmatched)
+    pairs = []
+    while unmatched:
+        a = unmatched.pop()
+        dist, pred, heap = {a: 0.0}, {}, [(0.0, a)]
+        found = None
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d > dist[v]:
+                continue
+            if v in unmatched:
+                found = v
+                break
+            for u, c in graph.get(v, ()):
+                if d + c < dist.get(u, math.inf):
+                    dist[u] = d + c
+                    pred[u] = v
+                    heapq.heappush(heap, (d + c, u))
+        if found is None:
+            # 与其余奇度点都不连通，图不可能有闭合路线
+            return None
+        unmatched.discard(found)
+        v = found
+        while v != a:
+            u = pred[v]
+            pairs.append((u, v) if u < v else (v, u))
+            v = u
+    return pairs
+
+
+def route_inspection(graph, weight='weight', time_budget=TIME_BUDGET, progress=None):
+    # 求无向（多重）图的中国邮路，边权取 weight 属性（缺省为 1）。有边的节点不连通时返回 None，否则返回 PostmanTour
+    started = time.perf_counter()
+    names = list(graph.nodes)
+    index = {node: i for i, node in enumerate(names)}
+    n, m = len(names), graph.number_of_edges()
+    if m == 0:
+        return None
+    pairs = np.fromiter((x for u, v in graph.edges() for x in (index[u], index[v])), dtype=np.int64, count=2 * m)
+    pairs = pairs.reshape(-1, 2)
+    weights = np.fromiter((d.get(weight, 1) for u, v, d in graph.edges(data=True)), dtype=np.float64, count=m)
+    if weights.min() < 0:
+        raise ValueError('图中存在负权边，无法求中国邮路。')
+
+    degree = np.bincount(pairs.ravel(), minlength=n)
+    odd = np.flatnonzero(degree & 1).tolist()
+    exact = True
+    duplicated = np.zeros(0, dtype=np.int64)
+    if odd:
+        sources, targets = pairs[:, 0].tolist(), pairs[:, 1].tolist()
+        adjacency = half_edges(n, pairs[:, 0], pairs[:, 1])
+        weight_list = array('d', weights.tobytes())
+        k = len(odd)
+        if k * n <= EXACT_WORK and BLOSSOM_SECONDS * k * k * (k - 1) / 2 <= time_budget:
+            candidates, path = _exact_candidates(adjacency, weight_list, sources, targets, odd, progress)
+        else:
+            candidates, path = _boundary_candidates(adjacency, weight_list, sources, targets, odd, progress)
+            exact = False
+
+        report(progress, 1.0, '正在匹配奇度点')
+        if BLOSSOM_SECONDS * k * len(candidates) <= time_budget - (time.perf_counter() - started):
+            import networkx as nx
+
+            matching_graph = nx.Graph()
+            matching_graph.add_weighted_edges_from((a, b, c) for (a, b), c in candidates.items())
+            matching = [(a, b) if a < b else (b, a) for a, b in nx.min_weight_matching(matching_graph)]
+        else:
+            matching = list(_greedy_matching(candidates, started + time_budget))
+            exact = False
+        matched = {x for pair in matching for x in pair}
+        leftovers = _match_leftovers(candidates, [v for v in odd if v not in matched])
+        if leftovers is None:
+            return None
+        if leftovers:
+            exact = False
+
+        # 同一条边被重复偶数次时全部去掉，奇偶性不变，路线更短
+        edges = [e for a, b in matching + leftovers for e in path(a, b)]
+        duplicated = np.flatnonzero(np.bincount(edges, minlength=m) & 1)
+
+    base = np.concatenate([np.arange(m), duplicated])
+    result = hierholzer(n, pairs[base, 0], pairs[base, 1], progress)
+    if result is None:
+        return None
+    node_ids, edge_ids = result
+    extra_cost = float(weights[duplicated].sum())
+    return PostmanTour(names, node_ids, base[edge_ids], m, float(weights.sum()) + extra_cost, extra_cost, exact)
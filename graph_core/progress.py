@@ -0,0 +1,14 @@
+class JobCancelled(Exception):
+    # 由进度回调抛出，表示后台任务已被取消或被更新的任务取代
+    pass
+
+
+# 耗时循环中每隔多少步调用一次进度回调
+PROGRESS_INTERVAL = 1 << 14
+
+
+def report(progress, fraction, message=''):
+    # 返回进度回调的返回值：为 True 表示用户请求提前结束，支持提前结束的计算应尽快收尾并返回当前结果
+    if progress is not None:
+        return progress(fraction, message)
+    return False
@@ -0,0 +1,398 @@
+import heapq
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from graph_core.progress import PROGRESS_INTERVAL, report
+
+
+class CSRGraph:
+    # 压缩稀疏行（CSR）形式的只读邻接表：节点映射为 0..n-1 的整数编号，
+    # 第 i 个节点的出边为 targets[offsets[i]:offsets[i + 1]]，对应权重在 weights 中。
+    # 无向图的每条边在两个方向上各存一次。
+
+    def __init__(self, nodes, offsets, targets, weights, directed=False):
+        self.nodes = nodes
+        self.index = {node: i for i, node in enumerate(nodes)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.directed = directed
+
+    @classmethod
+    def from_arrays(cls, nodes, sources, targets, weights, directed=False):
+        n = len(nodes)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        if len(weights) and weights.min() < 0:
+            raise ValueError('图中存在负权边，无法使用 Dijkstra 算法。')
+        if not directed:
+            sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+            weights = np.concatenate([weights, weights])
+
+        order = np.argsort(sources, kind='stable')
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+        index_dtype = np.int32 if n < 2 ** 31 else np.int64
+        return cls(nodes, offsets, targets[order].astype(index_dtype), weights[order], directed)
+
+    @classmethod
+    def from_networkx(cls, graph, weight='weight', nodes=None):
+        # nodes 可指定节点编号顺序（需覆盖图中全部节点），默认按图中节点的插入顺序。
+        # 边数组由 GraphArrays.from_networkx 得到，图存储（StoreGraph）直接取用其数组，不逐条遍历边
+        from graph_core.graph_io import GraphArrays
+
+        arrays = GraphArrays.from_networkx(graph, weight)
+        sources, targets = arrays.sources, arrays.targets
+        weights = arrays.edge_weights()
+        if nodes is None:
+            nodes = arrays.nodes
+        elif nodes != arrays.nodes:
+            index = {node: i for i, node in enumerate(nodes)}
+            remap = np.fromiter((index[node] for node in arrays.nodes), dtype=np.int64, count=len(arrays.nodes))
+            sources, targets = remap[sources], remap[targets]
+        return cls.from_arrays(nodes, sources, targets, weights, directed=graph.is_directed())
+
+    @property
+    def num_nodes(self):
+        return len(self.nodes)
+
+    def neighbors(self, i):
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return zip(self.targets[lo:hi].tolist(), self.weights[lo:hi].tolist())
+
+
+def dijkstra(csr, source, target=None, targets=None, progress=None):
+    # 基于二叉堆的单源 Dijkstra，source/target 为整数编号。
+    # 给定 target 时在其出堆后提前结束；给定 targets（编号集合）时在其全部出堆后结束。
+    # progress 为可选的进度回调 progress(比例, 说明)。
+    # 返回 (dist, pred) 两个列表，不可达节点距离为 inf、前驱为 -1。
+    remaining = set(targets) if targets is not None else None
+    n = csr.num_nodes
+    dist = [math.inf] * n
+    pred = [-1] * n
+    done = bytearray(n)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    settled = 0
+    offsets, targets, weights = csr.offsets, csr.targets, csr.weights
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = 1
+        settled += 1
+        if progress is not None and not settled % PROGRESS_INTERVAL:
+            progress(settled / n, '正在搜索最短路径')
+        if u == target:
+            break
+        if remaining is not None:
+            remaining.discard(u)
+            if not remaining:
+                break
+        lo, hi = offsets[u], offsets[u + 1]
+        for v, w in zip(targets[lo:hi].tolist(), weights[lo:hi].tolist()):
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+    return dist, pred
+
+
+def _no_path(source, target):
+    # 与 nx.dijkstra_path 抛出相同的异常，便于调用方统一处理；networkx 只在此时导入
+    import networkx as nx
+    return nx.NetworkXNoPath(f'Node {target} not reachable from {source}')
+
+
+def path_from_pred(pred, source, target):
+    # 沿前驱数组回溯出 source -> target 的整数编号路径
+    path = [target]
+    while path[-1] != source:
+        path.append(pred[path[-1]])
+    path.reverse()
+    return path
+
+
+class ManyPaths:
+    # 一对多查询的结果：只保存各终点的距离和最短路径树的前驱数组，路径在取用时才沿前驱回溯，
+    # 百万个终点也只占几个数组。names 为编号对应的节点名；
+    # 按终点顺序迭代得到 (终点, 距离, 路径)，不可达的终点距离为 inf、路径为 None
+    def __init__(self, names, source, targets, distances, pred):
+        self.names = names
+        self.source = source  # 源点编号
+        self.targets = targets  # 各终点的编号
+        self.distances = distances  # 各终点的距离
+        self.pred = pred
+
+    def __len__(self):
+        return len(self.targets)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.target(i), self.distance(i), self.path(i)
+
+    @property
+    def reachable(self):
+        return int(np.count_nonzero(self.distances != math.inf))
+
+    def target(self, i):
+        return self.names[self.targets[i]]
+
+    def distance(self, i):
+        return float(self.distances[i])
+
+    def path(self, i):
+        if self.distances[i] == math.inf:
+            return None
+        names = self.names
+        return [names[v] for v in path_from_pred(self.pred, self.source, int(self.targets[i]))]
+
+
+class ShortestPathEngine:
+    # 按需把 networkx 图冻结为 CSRGraph，图版本号变化（add_edge / load_graph）后才重建。
+    # 一次搜索同时得到最短路径和距离，不再像 nx.dijkstra_path + nx.dijkstra_path_length 那样搜索两遍。
+    # 每个源点的完整最短路径树按 LRU 缓存（总内存受 max_tree_bytes 限制），同一源点的重复查询只需沿前驱回溯。
+    # 通过 edge_inserted 通知加边后，只修复新边确实能缩短距离的那些树，其余树原样保留。
+
+    def __init__(self, weight='weight', max_tree_bytes=256 * 2 ** 20):
+        self.weight = weight
+        self.max_tree_bytes = max_tree_bytes
+        self.csr = None
+        self.version = None
+        # 节点编号表，只追加不重排，保证缓存的树在图增长后仍然有效
+        self.nodes = []
+        self.index = {}
+        self.trees = OrderedDict()  # 源点编号 -> (dist, pred)
+        self.tree_bytes = 0
+        self.tree_version = None
+        # 可选的地标预处理索引，仅在图版本与构建时一致时使用，图被修改后自动退回 Dijkstra
+        self.landmarks = None
+        self.landmarks_version = None
+
+    def _sync_nodes(self, graph):
+        if any(n not in graph for n in self.nodes):
+            # 有节点被删除（或整图被替换），编号表作废
+            self.nodes, self.index = [], {}
+            self._clear_trees()
+        for n in graph.nodes:
+            if n not in self.index:
+                self.index[n] = len(self.nodes)
+                self.nodes.append(n)
+
+    def _clear_trees(self):
+        self.trees.clear()
+        self.tree_bytes = 0
+
+    def frozen(self, graph, version):
+        if self.csr is None or self.version != version:
+            self._sync_nodes(graph)
+            self.csr = CSRGraph.from_networkx(graph, weight=self.weight, nodes=self.nodes)
+            self.version = version
+        return self.csr
+
+    def tree(self, graph, version, source, progress=None):
+        # 返回 source 的最短路径树 (dist, pred)，均为按节点编号索引的 NumPy 数组
+        if self.tree_version != version:
+            # 图在没有 edge_inserted 通知的情况下发生了变化（如 load_graph），缓存全部作废
+            self._clear_trees()
+            self.tree_version = version
+        s = self.index.get(source)
+        if s is not None and s in self.trees:
+            self.trees.move_to_end(s)
+            return self.trees[s]
+
+        report(progress, 0.0, '正在构建图的数组表示')
+        csr = self.frozen(graph, version)
+        s = csr.index[source]
+        dist, pred = dijkstra(csr, s, progress=progress)
+        tree = (np.array(dist, dtype=np.float64), np.array(pred, dtype=csr.targets.dtype))
+        self.trees[s] = tree
+        self.tree_bytes += tree[0].nbytes + tree[1].nbytes
+        while self.tree_bytes > self.max_tree_bytes and len(self.trees) > 1:
+            _, (d, p) = self.trees.popitem(last=False)
+            self.tree_bytes -= d.nbytes + p.nbytes
+        return tree
+
+    def attach_landmarks(self, index, version):
+        self.landmarks = index
+        self.landmarks_version = version
+
+    def landmarks_fresh(self, version):
+        return self.landmarks is not None and self.landmarks_version == version
+
+    def shortest_path(self, graph, version, source, target, progress=None):
+        s = self.index.get(source)
+        if self.tree_version != version or s not in self.trees:
+            if self.landmarks_fresh(version):
+                csr = self.frozen(graph, version)
+                path, distance = self.landmarks.query(csr, csr.index[source], csr.index[target])
+                if path is None:
+                    raise _no_path(source, target)
+                return [csr.nodes[i] for i in path], distance
+
+        dist, pred = self.tree(graph, version, source, progress)
+        s, t = self.index[source], self.index[target]
+        if dist[t] == math.inf:
+            raise _no_path(source, target)
+        return [self.nodes[i] for i in path_from_pred(pred, s, t)], float(dist[t])
+
+    def edge_inserted(self, graph, version, u, v, previous=None):
+        # 图中刚加入（或改写了权重的）边 (u, v)，previous 为改写前的权重。
+        # 调用时 graph 已包含新边，version 为加边后的版本号。
+        if self.tree_version != version - 1 or graph.is_multigraph() or graph.is_directed():
+            self._clear_trees()
+            self.tree_version = version
+            return
+        self.tree_version = version
+        if not self.trees:
+            return
+        if graph[u][v].get(self.weight, 1) < 0:
+            # 负权边（无向图中即负环）无法增量修复，丢弃全部缓存，之后的查询由 Dijkstra 报错
+            self._clear_trees()
+            return
+
+        new_nodes = [n for n in dict.fromkeys((u, v)) if n not in self.index]
+        for n in new_nodes:
+            self.index[n] = len(self.nodes)
+            self.nodes.append(n)
+        w = graph[u][v].get(self.weight, 1)
+        a, b = self.index[u], self.index[v]
+
+        for s in list(self.trees):
+            dist, pred = self.trees[s]
+            if new_nodes:
+                extra = len(self.nodes) - len(dist)
+                dist = np.concatenate([dist, np.full(extra, math.inf)])
+                pred = np.concatenate([pred, np.full(extra, -1, dtype=pred.dtype)])
+                self.trees[s] = (dist, pred)
+                self.tree_bytes += extra * (dist.itemsize + pred.itemsize)
+            if previous is not None and w > previous:
+                # 权重变大：只有把这条边用作树边的树会受影响，直接丢弃
+                if pred[b] == a or pred[a] == b:
+                    del self.trees[s]
+                    self.tree_bytes -= dist.nbytes + pred.nbytes
+                continue
+            self._repair(graph, dist, pred, a, b, w)
+
+    def _repair(self, graph, dist, pred, a, b, w):
+        # 新边只可能从较近的一端缩短另一端的距离，由此向外做一次只覆盖“距离变短”节点的 Dijkstra
+        if dist[a] + w < dist[b]:
+            start, via = b, a
+        elif dist[b] + w < dist[a]:
+            start, via = a, b
+        else:
+            return
+        dist[start] = dist[via] + w
+        pred[start] = via
+        heap = [(float(dist[start]), start)]
+        nodes, index, weight = self.nodes, self.index, self.weight
+        while heap:
+            d, x = heapq.heappop(heap)
+            if d > dist[x]:
+                continue
+            for nbr, attrs in graph[nodes[x]].items():
+                y = index[nbr]
+                nd = d + attrs.get(weight, 1)
+                if nd < dist[y]:
+                    dist[y] = nd
+                    pred[y] = x
+                    heapq.heappush(heap, (nd, y))
+
+    def one_to_many(self, graph, version, source, targets=None, progress=None):
+        # 一次单源搜索（或直接使用缓存的树）回答多个终点，targets 为 None 时为图中全部节点。
+        # 返回 ManyPaths，路径在取用时才回溯；缓存的树之后可能被原地修复，这里复制出结果用到的数组
+        dist, pred = self.tree(graph, version, source, progress)
+        if targets is None:
+            ids = np.arange(len(dist))
+        else:
+            ids = np.fromiter((self.index[target] for target in targets), dtype=np.int64, count=len(targets))
+        return ManyPaths(self.nodes, self.index[source], ids, dist[ids], pred.copy())
+
+    def k_shortest_paths(self, graph, version, source, target, k, progress=None):
+        # Yen 算法求 source 到 target 的前 k 条最短简单路径，返回 [(路径, 距离)]，按距离从小到大。
+        # 以 target 为根的最短路径树（同样走 LRU 缓存）给出各节点到 target 的精确距离：
+        # 偏离点沿树走到 target 的路径若未被屏蔽，直接作为偏离路径，无需搜索；否则以该距离为启发函数做 A* 搜索。
+        # 另按 Lawler 的改进，每条新路径只从它相对父路径的偏离位置开始生成候选，之前位置的候选已在堆中
+        if graph.is_directed():
+            import networkx as nx
+            raise nx.NetworkXNotImplemented('前 k 条最短路径目前只支持无向图')
+        to_target, next_hop = self.tree(graph, version, target, progress)
+        csr = self.frozen(graph, version)
+        s, t = self.index[source], self.index[target]
+        if to_target[s] == math.inf:
+            raise _no_path(source, target)
+
+        def tree_path(x):
+            # 沿以 target 为根的树从 x 走到 target，返回路径和各节点的累计距离
+            path = [x]
+            while path[-1] != t:
+                path.append(int(next_hop[path[-1]]))
+            return path, [float(to_target[x] - to_target[y]) for y in path]
+
+        path, costs = tree_path(s)
+        found = [(path, costs)]
+        candidates = []
+        seen = {tuple(path)}
+        deviation = [0]
+        while len(found) < k:
+            report(progress, len(found) / k, '正在搜索备选路径')
+            path, costs = found[-1]
+            for i in range(deviation[-1], len(path) - 1):
+                spur, root = path[i], path[:i + 1]
+                blocked_nodes = set(root[:-1])
+                blocked_edges = {p[i + 1] for p, _ in found if len(p) > i + 1 and p[:i + 1] == root}
+                spur_path, spur_costs = tree_path(spur)
+                if spur_path[1] in blocked_edges or not blocked_nodes.isdisjoint(spur_path):
+                    spur_path, spur_costs = _astar(csr, spur, t, to_target, blocked_nodes, blocked_edges)
+                    if spur_path is None:
+                        continue
+                candidate = root[:-1] + spur_path
+                key = tuple(candidate)
+                if key in seen:
+                    continue
+                seen.add(key)
+                candidate_costs = costs[:i] + [costs[i] + c for c in spur_costs]
+                heapq.heappush(candidates, (candidate_costs[-1], len(seen), candidate, candidate_costs, i))
+            if not candidates:
+                break
+            _, _, path, costs, i = heapq.heappop(candidates)
+            found.append((path, costs))
+            deviation.append(i)
+        return [([self.nodes[x] for x in path], costs[-1]) for path, costs in found]
+
+
+def _astar(csr, source, target, potential, blocked_nodes, blocked_first):
+    # 在屏蔽了 blocked_nodes 中的节点以及从 source 出发到 blocked_first 中节点的边后，
+    # 以 potential（到 target 的原图距离，屏蔽后依然是下界）为启发函数搜索 source -> target。
+    # 返回路径和各节点的累计距离，不可达时返回 (None, None)
+    dist = {source: 0.0}
+    pred = {source: -1}
+    done = set()
+    heap = [(float(potential[source]), source)]
+    offsets, targets, weights = csr.offsets, csr.targets, csr.weights
+    while heap:
+        _, u = heapq.heappop(heap)
+        if u in done:
+            continue
+        done.add(u)
+        if u == target:
+            path = [u]
+            while pred[path[-1]] != -1:
+                path.append(pred[path[-1]])
+            path.reverse()
+            return path, [dist[x] for x in path]
+        d = dist[u]
+        lo, hi = offsets[u], offsets[u + 1]
+        for v, w in zip(targets[lo:hi].tolist(), weights[lo:hi].tolist()):
+            if v in blocked_nodes or (u == source and v in blocked_first) or v in done:
+                continue
+            nd = d + w
+            if nd < dist.get(v, math.inf):
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd + potential[v], v))
+    return None, None
@@ -0,0 +1,125 @@
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+
+class Action:
+    # 一次用户操作（点击“寻找最短路径”等），其后台任务、结果回调和画布重绘都记在它名下
+
+    def __init__(self, name, ident):
+        self.name = name
+        self.id = ident
+        self.profile = None
+        self.profile_file = None
+
+
+class Tracer:
+    # 记录每次用户操作中各阶段（span）的墙钟时间、所在线程的 CPU 时间和（可选的）内存分配峰值，
+    # 可导出为 Chrome 跟踪格式（chrome://tracing、Perfetto 可直接打开）。
+    # profile_dir 设置后，下一次操作的所有阶段会在 cProfile 下运行，统计结果写入该目录的 .prof 文件（可用 pstats、snakeviz 查看）。
+    # 内存峰值由 tracemalloc 统计，开启后程序明显变慢，因此默认关闭；多个线程同时运行时各阶段的峰值会互相影响，仅供参考。
+
+    def __init__(self, max_events=10000):
+        self.events = deque(maxlen=max_events)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.origin = time.perf_counter()
+        self.current = None
+        self.next_id = 0
+        self.profile_dir = None
+        # 每记录一个阶段就以事件字典调用一次，可能在工作线程中调用
+        self.listeners = []
+
+    @property
+    def memory(self):
+        return tracemalloc.is_tracing()
+
+    def set_memory(self, enabled):
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def action(self, name):
+        # 开始一次新的用户操作（在界面线程中调用），之后提交的任务和重绘都归入这次操作
+        self.next_id += 1
+        action = Action(name, self.next_id)
+        if self.profile_dir is not None:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            stamp = time.strftime('%Y%m%d-%H%M%S')
+            safe = re.sub(r'[\\/:*?"<>|\s]+', '_', name)
+            action.profile = cProfile.Profile()
+            action.profile_file = os.path.join(self.profile_dir, f'{safe}-{stamp}.prof')
+            self.profile_dir = None
+        self.current = action
+        return action
+
+    @contextmanager
+    def span(self, name, action=None):
+        # 计时一个阶段。同一线程中嵌套的阶段各自记录，但剖析和内存峰值只由最外层阶段开启和重置
+        action = action if action is not None else self.current
+        depth = getattr(self.local, 'depth', 0)
+        self.local.depth = depth + 1
+        outermost = depth == 0
+        memory = outermost and tracemalloc.is_tracing()
+        if memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        profile = action.profile if action is not None and outermost else None
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                # 每个阶段结束都重写一次，文件始终包含这次操作到目前为止的全部统计
+                profile.dump_stats(action.profile_file)
+            wall, cpu = time.perf_counter() - started, time.thread_time() - cpu_started
+            self.local.depth = depth
+            event = {
+                'name': name,
+                'action': action.name if action is not None else None,
+                'action_id': action.id if action is not None else None,
+                'start': started - self.origin,
+                'wall': wall,
+                'cpu': cpu,
+                'peak': tracemalloc.get_traced_memory()[1] - baseline if memory else None,
+                'thread': threading.current_thread().name,
+                'tid': threading.get_ident(),
+                'profile': action.profile_file if profile is not None else None,
+            }
+            with self.lock:
+                self.events.append(event)
+            for listener in self.listeners:
+                listener(event)
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.events)
+
+    def export_chrome(self, filename):
+        # 写出 Chrome 跟踪格式（Trace Event Format）的 JSON 文件，时间单位为微秒
+        events = self.snapshot()
+        pid = os.getpid()
+        trace = []
+        for tid, thread in {e['tid']: e['thread'] for e in events}.items():
+            trace.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread}})
+        for e in events:
+            args = {'action': e['action'], 'action_id': e['action_id'], 'cpu_ms': round(e['cpu'] * 1000, 3)}
+            if e['peak'] is not None:
+                args['peak_kb'] = round(e['peak'] / 1024, 1)
+            trace.append({
+                'name': e['name'], 'cat': e['action'] or 'idle', 'ph': 'X', 'pid': pid, 'tid': e['tid'],
+                'ts': round(e['start'] * 1e6, 1), 'dur': round(e['wall'] * 1e6, 1), 'args': args,
+            })
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return len(events)
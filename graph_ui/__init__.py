@@ -0,0 +1,32 @@
+# 三个图论软件共用的 Qt 界面组件。
+# 下列名称在首次访问时才导入所在的子模块，import graph_ui 本身不会加载 PyQt5、Matplotlib
+import importlib
+
+_EXPORTS = {
+    'Debouncer': 'graph_ui.redraw',
+    'GraphView': 'graph_ui.graph_view',
+    'JobCancelled': 'graph_ui.jobs',
+    'JobRunner': 'graph_ui.jobs',
+    'JobStatusBar': 'graph_ui.jobs',
+    'PathList': 'graph_ui.result_table',
+    'PathTable': 'graph_ui.result_table',
+    'TextLabels': 'graph_ui.edge_render',
+    'TourTable': 'graph_ui.result_table',
+    'TracePanel': 'graph_ui.tracing',
+    'TracedCanvas': 'graph_ui.tracing',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
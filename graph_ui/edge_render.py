@@ -0,0 +1,136 @@
+import numpy as np
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath, text_to_path
+from matplotlib.transforms import Affine2D
+
+# 每条弧线的采样点数
+ARC_SAMPLES = 16
+# 相邻平行边之间的弯曲度差，与原先 arc3,rad=0.2 * (idx - (k - 1) / 2) 的画法一致
+ARC_SPACING = 0.2
+
+
+def edge_bundles(graph, nodes):
+    # 把（多重）图的边按无序端点对去重成“边束”，返回每条平行边的端点编号、在束内的序号和束的大小。
+    # MultiGraph.edges() 对每条平行边都会产出一次 (u, v)，逐条绘制会把同一束画 k² 次，这里每条平行边只出现一次
+    index = {node: i for i, node in enumerate(nodes)}
+    m = graph.number_of_edges()
+    pairs = np.fromiter((x for u, v in graph.edges() for x in (index[u], index[v])), dtype=np.int64, count=2 * m)
+    pairs = np.sort(pairs.reshape(-1, 2), axis=1)
+    bundles, inverse, counts = np.unique(pairs, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+    order = np.argsort(inverse, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    slot = np.empty(m, dtype=np.int64)
+    slot[order] = np.arange(m) - np.repeat(starts, counts)
+    return pairs, slot, counts[inverse]
+
+
+def arc_geometry(p0, p1, rad, samples=ARC_SAMPLES):
+    # 与 matplotlib 的 arc3 连接样式相同的二次贝塞尔曲线：控制点位于中点沿法向偏移 rad 倍弦长。
+    # 返回 (边数, samples, 2) 的折线顶点和每条弧线的中点
+    delta = p1 - p0
+    control = (p0 + p1) / 2 + rad[:, None] * np.stack([delta[:, 1], -delta[:, 0]], axis=1)
+    t = np.linspace(0, 1, samples)[None, :, None]
+    points = (1 - t) ** 2 * p0[:, None, :] + 2 * (1 - t) * t * control[:, None, :] + t ** 2 * p1[:, None, :]
+    midpoints = 0.25 * p0 + 0.5 * control + 0.25 * p1
+    return points, midpoints
+
+
+def loop_geometry(center, slot, size, samples=ARC_SAMPLES * 2):
+    # 自环画成节点上方的圆，同一节点的多个自环半径依次增大
+    radius = size * (1 + 0.5 * slot)
+    theta = np.linspace(-np.pi / 2, 3 * np.pi / 2, samples)[None, :]
+    x = center[:, 0:1] + radius[:, None] * np.cos(theta)
+    y = center[:, 1:2] + radius[:, None] * (1 + np.sin(theta))
+    return np.stack([x, y], axis=2), center + np.stack([np.zeros_like(radius), 2 * radius], axis=1)
+
+
+def multigraph_edge_geometry(graph, pos):
+    # 计算每条边（含平行边、自环）的折线和标签位置，返回 (端点编号对, 折线顶点, 标签位置)
+    nodes = list(graph.nodes)
+    if graph.number_of_edges() == 0:
+        return np.empty((0, 2), dtype=np.int64), np.empty((0, ARC_SAMPLES, 2)), np.empty((0, 2))
+    xy = np.array([pos[node] for node in nodes], dtype=np.float64)
+    pairs, slot, counts = edge_bundles(graph, nodes)
+    rad = ARC_SPACING * (slot - (counts - 1) / 2)
+    points, midpoints = arc_geometry(xy[pairs[:, 0]], xy[pairs[:, 1]], rad)
+
+    loops = pairs[:, 0] == pairs[:, 1]
+    if loops.any():
+        span = np.ptp(xy, axis=0).max() if len(xy) > 1 else 1.0
+        loop_points, loop_mid = loop_geometry(xy[pairs[loops, 0]], slot[loops], 0.04 * (span or 1.0))
+        points = list(points)
+        for i, line, mid in zip(np.flatnonzero(loops).tolist(), loop_points, loop_mid):
+            points[i] = line
+            midpoints[i] = mid
+    return pairs, points, midpoints
+
+
+def draw_multigraph_edges(ax, graph, pos, color='gray', width=1.0):
+    # 所有边（包括平行边）合并为一个 LineCollection，只创建一个 Matplotlib 对象
+    pairs, points, midpoints = multigraph_edge_geometry(graph, pos)
+    collection = LineCollection(points, colors=color, linewidths=width, zorder=1)
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    return pairs, points, midpoints
+
+
+class TextLabels:
+    # 用一个 PathCollection 批量绘制大量文字标签（节点名、顺序号等），避免为每个标签创建一个 Text 对象。
+    # 每个字符的字形路径只生成一次，标签路径由字形顶点平移拼接而成并按文字缓存；
+    # 路径以点为单位，标签位置为数据坐标偏移，缩放视图时文字大小保持不变
+
+    def __init__(self, fontsize=10, weight='bold', max_cached=200000):
+        self.prop = FontProperties(size=fontsize, weight=weight)
+        _, self.height, _ = text_to_path.get_text_width_height_descent('0', self.prop, ismath=False)
+        self.max_cached = max_cached
+        self.chars = {}
+        self.paths = {}
+
+    def _char(self, ch):
+        glyph = self.chars.get(ch)
+        if glyph is None:
+            path = TextPath((0, 0), ch, prop=self.prop)
+            width, _, _ = text_to_path.get_text_width_height_descent(ch, self.prop, ismath=False)
+            glyph = self.chars[ch] = (path.vertices, path.codes, width)
+        return glyph
+
+    def path(self, text):
+        # 以原点为中心的标签路径
+        path = self.paths.get(text)
+        if path is not None:
+            return path
+        vertices, codes = [], []
+        x = 0.0
+        for ch in text:
+            v, c, width = self._char(ch)
+            if len(v):
+                vertices.append(v + (x, 0.0))
+                codes.append(c)
+            x += width
+        if vertices:
+            path = Path(np.concatenate(vertices) - (x / 2, self.height / 2), np.concatenate(codes))
+        else:
+            path = Path(np.zeros((1, 2)), [Path.MOVETO])
+        if len(self.paths) >= self.max_cached:
+            self.paths.clear()
+        self.paths[text] = path
+        return path
+
+    def draw(self, ax, positions, labels, color='black', zorder=3):
+        paths = [self.path(str(label)) for label in labels]
+        offsets = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        collection = PathCollection(
+            paths, offsets=offsets, offset_transform=ax.transData, facecolors=color, edgecolors='none',
+            zorder=zorder,
+        )
+        # 路径以点为单位，换算为像素
+        collection.set_transform(Affine2D().scale(1 / 72) + ax.figure.dpi_scale_trans)
+        ax.add_collection(collection, autolim=False)
+        return collection
+
+    def draw_node_labels(self, ax, graph, pos, color='black'):
+        nodes = list(graph.nodes)
+        return self.draw(ax, [pos[node] for node in nodes], nodes, color=color)
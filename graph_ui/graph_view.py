@@ -0,0 +1,300 @@
+import networkx as nx
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba_array
+
+from graph_ui.redraw import Debouncer
+
+# 视口内节点不超过 LABEL_LIMIT 个时按原样绘制节点名和边标签
+LABEL_LIMIT = 200
+# 视口内节点不超过 DETAIL_LIMIT 个时逐个绘制节点和边（不带标签），超过则按网格聚合
+DETAIL_LIMIT = 5000
+# 聚合时视口较长一边划分的格数
+GRID_CELLS = 64
+# 滚轮每格的缩放倍数
+ZOOM_STEP = 1.25
+
+NODE_COLOR = 'lightblue'
+EDGE_COLOR = 'black'
+
+
+class GraphView:
+    # 在一个 Axes 上按细节层次 (LOD) 绘制图：节点坐标和边端点保存为数组，平移、缩放时只按当前视口重新筛选和绘制，
+    # 不重新计算布局。视口内节点较少时与 nx.draw 的效果相同；较多时不画标签；再多时把相近节点聚合成网格中的一个点。
+    # 查询结果（高亮路径、边的着色）画在单独的覆盖层上：底图绘制一次后缓存为背景，更新结果时只恢复背景并重画覆盖层 (blitting)
+
+    def __init__(self, ax, canvas, label_limit=LABEL_LIMIT, detail_limit=DETAIL_LIMIT, grid_cells=GRID_CELLS):
+        self.ax = ax
+        self.canvas = canvas
+        self.label_limit = label_limit
+        self.detail_limit = detail_limit
+        self.grid_cells = grid_cells
+        self.artists = []
+        self.graph = None
+        self.version = None
+        self.overlay = {}
+        self.overlay_artists = []
+        self.patch = {}
+        self.detail = False
+        self.background = None
+        # 拖动平移时视口连续变化，停下后再按新视口重绘
+        self.refresh_later = Debouncer(self.refresh, interval=60, parent=canvas)
+        canvas.mpl_connect('scroll_event', self.on_scroll)
+        canvas.mpl_connect('draw_event', self.on_draw)
+
+    def clear(self):
+        self.refresh_later.timer.stop()
+        self.graph = None
+        self.version = None
+        self.artists = []
+        self.overlay = {}
+        self.overlay_artists = []
+        self.patch = {}
+        self.detail = False
+        self.background = None
+        self.ax.clear()
+        self.ax.set_axis_off()
+
+    def set_graph(self, graph, pos, edge_labels=None, version=None):
+        # 绘制底图。edge_labels: {边: 标签}；version: 图的版本号，调用方据此判断底图是否需要重画
+        self.clear()
+        self.graph = graph
+        self.version = version
+        self.pos = pos
+        self.nodes = list(graph.nodes)
+        self.edges = list(graph.edges())
+        self.edge_labels = edge_labels or {}
+
+        index = {node: i for i, node in enumerate(self.nodes)}
+        self.xy = np.array([pos[node] for node in self.nodes], dtype=np.float64).reshape(-1, 2)
+        self.pairs = np.fromiter((index[x] for edge in self.edges for x in edge[:2]), dtype=np.int64,
+                                 count=2 * len(self.edges)).reshape(-1, 2)
+
+        # 初始视口覆盖整个图，之后只由用户平移、缩放改变
+        if len(self.xy):
+            lo, hi = self.xy.min(axis=0), self.xy.max(axis=0)
+            margin = np.maximum((hi - lo) * 0.05, 0.1)
+            self.ax.set_xlim(lo[0] - margin[0], hi[0] + margin[0])
+            self.ax.set_ylim(lo[1] - margin[1], hi[1] + margin[1])
+        self.ax.set_autoscale_on(False)
+        # Axes.clear() 会重建回调表，每次都需重新连接
+        self.ax.callbacks.connect('xlim_changed', self.on_view_changed)
+        self.ax.callbacks.connect('ylim_changed', self.on_view_changed)
+        self.refresh()
+
+    def update_positions(self, pos):
+        # 节点和边不变、只有坐标变化（如布局收敛过程中）时更新绘制，保留当前视口
+        self.pos = pos
+        self.xy = np.array([pos[node] for node in self.nodes], dtype=np.float64).reshape(-1, 2)
+        self.refresh()
+
+    def on_view_changed(self, ax):
+        self.refresh_later.request()
+
+    def on_scroll(self, event):
+        # 以鼠标位置为中心滚轮缩放
+        if event.inaxes is not self.ax or self.graph is None:
+            return
+        scale = 1 / ZOOM_STEP if event.button == 'up' else ZOOM_STEP
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        x, y = event.xdata, event.ydata
+        self.ax.set_xlim(x - (x - x0) * scale, x + (x1 - x) * scale)
+        self.ax.set_ylim(y - (y - y0) * scale, y + (y1 - y) * scale)
+        self.canvas.draw_idle()
+
+    def visible(self):
+        # 返回视口内的节点掩码和与视口相交的边掩码（按线段外接矩形判断）
+        (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        x, y = self.xy[:, 0], self.xy[:, 1]
+        node_mask = (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+        ex, ey = x[self.pairs], y[self.pairs]
+        edge_mask = ((ex.min(axis=1) <= x1) & (ex.max(axis=1) >= x0) &
+                     (ey.min(axis=1) <= y1) & (ey.max(axis=1) >= y0))
+        return node_mask, edge_mask
+
+    def refresh(self):
+        if self.graph is None:
+            return
+        for artist in self.artists:
+            artist.remove()
+        self.artists = []
+
+        node_mask, edge_mask = self.visible()
+        count = int(node_mask.sum())
+        if count <= self.label_limit:
+            self.draw_detail(node_mask, edge_mask)
+        elif count <= self.detail_limit:
+            self.draw_plain(node_mask, edge_mask)
+        else:
+            self.draw_aggregated(node_mask, edge_mask)
+        self.build_overlay()
+        self.background = None
+        self.canvas.draw_idle()
+
+    def add(self, artist):
+        if artist is None:
+            return
+        if isinstance(artist, dict):
+            self.artists.extend(artist.values())
+        elif isinstance(artist, list):
+            self.artists.extend(artist)
+        else:
+            if artist.axes is None:
+                self.ax.add_collection(artist, autolim=False)
+            self.artists.append(artist)
+
+    def draw_detail(self, node_mask, edge_mask):
+        # 与原先的 nx.draw 效果一致，只是仅绘制视口内的部分
+        nodelist = [self.nodes[i] for i in np.flatnonzero(node_mask)]
+        edgelist = [self.edges[i] for i in np.flatnonzero(edge_mask)]
+        ax = self.ax
+        self.add(nx.draw_networkx_nodes(self.graph, self.pos, nodelist=nodelist, node_size=500,
+                                        node_color=NODE_COLOR, ax=ax))
+        if edgelist:
+            self.add(nx.draw_networkx_edges(self.graph, self.pos, edgelist=edgelist, edge_color=EDGE_COLOR, ax=ax))
+        self.add(nx.draw_networkx_labels(self.graph, self.pos, labels={node: node for node in nodelist},
+                                         font_size=10, ax=ax))
+        labels = {edge: self.edge_labels[edge] for edge in edgelist if edge in self.edge_labels}
+        if labels and len(labels) <= self.label_limit:
+            self.add(nx.draw_networkx_edge_labels(self.graph, self.pos, edge_labels=labels, font_size=10, ax=ax))
+
+    def draw_plain(self, node_mask, edge_mask):
+        # 节点和边各合并为一个集合对象，不画标签
+        segments = self.xy[self.pairs[edge_mask]]
+        self.add(LineCollection(segments, colors=EDGE_COLOR, linewidths=0.5, zorder=1))
+        xy = self.xy[node_mask]
+        self.add(self.ax.scatter(xy[:, 0], xy[:, 1], s=12, c=NODE_COLOR, edgecolors='steelblue', linewidths=0.3,
+                                 zorder=2))
+
+    def draw_aggregated(self, node_mask, edge_mask):
+        # 把视口划分为网格，同一格内的节点画成一个点（面积随节点数增大），格与格之间的边合并为一条线（线宽随边数增大）
+        (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        size = max(x1 - x0, y1 - y0) / self.grid_cells
+        involved = node_mask.copy()
+        involved[self.pairs[edge_mask].ravel()] = True
+        ids = np.flatnonzero(involved)
+        cells = np.floor((self.xy[ids] - (x0, y0)) / size).astype(np.int64)
+        keys, cell_of, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+        cell_of = cell_of.reshape(-1)
+        centers = np.stack([np.bincount(cell_of, self.xy[ids, k], minlength=len(keys)) / counts for k in (0, 1)],
+                           axis=1)
+
+        node_cell = np.full(len(self.nodes), -1, dtype=np.int64)
+        node_cell[ids] = cell_of
+        links = np.sort(node_cell[self.pairs[edge_mask]], axis=1)
+        links = links[links[:, 0] != links[:, 1]]
+        if len(links):
+            links, weights = np.unique(links, axis=0, return_counts=True)
+            self.add(LineCollection(centers[links], colors='gray', linewidths=0.3 + 0.4 * np.log1p(weights),
+                                    alpha=0.6, zorder=1))
+
+        # 只画含视口内节点的格
+        shown = np.bincount(cell_of, node_mask[ids], minlength=len(keys)) > 0
+        self.add(self.ax.scatter(centers[shown, 0], centers[shown, 1], s=8 + 6 * np.sqrt(counts[shown]),
+                                 c=NODE_COLOR, edgecolors='steelblue', linewidths=0.3, zorder=2))
+
+    def set_overlay(self, highlight=None, edge_colors=None, edge_labels=None, highlight_colors=None):
+        # 更新覆盖层。highlight: 需要突出显示的边，highlight_colors 为与之对应的颜色（默认红色）；
+        # edge_colors: 与 graph.edges 顺序一致的颜色列表；edge_labels: {边: 标签}。
+        # 只有高亮边时代价与结果大小成正比，与图的规模无关
+        self.overlay = {
+            'highlight': list(highlight or []),
+            'highlight_colors': highlight_colors if highlight_colors is not None else 'red',
+            'edge_colors': to_rgba_array(edge_colors) if edge_colors is not None else None,
+            'edge_labels': edge_labels or {},
+        }
+        self.patch = {}
+        self.build_overlay()
+        self.blit()
+
+    def patch_overlay(self, edge_colors, edge_labels=None):
+        # 只更新部分边的着色（如加边后的局部重新着色）。edge_colors: {边: 颜色}，端点顺序不限，可以是底图中还没有的新边；
+        # edge_labels: {边: 标签}。这些边画在覆盖层最上方，只绘制它们并 blit，代价与变化的边数成正比，与图的规模无关；
+        # 显示边标签时（视口内节点较少）整体重建覆盖层以更新标签
+        if self.graph is None or not self.overlay:
+            return
+        self.patch.update(edge_colors)
+        labels = self.overlay['edge_labels']
+        for (u, v), label in (edge_labels or {}).items():
+            labels[(v, u) if (v, u) in labels else (u, v)] = label
+        if self.detail:
+            self.build_overlay()
+            self.blit()
+            return
+        artist = self.patch_artist(edge_colors)
+        if artist is None:
+            return
+        self.add_overlay(artist)
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        # 新的线段直接画在当前画面上，不必恢复背景重画整个覆盖层
+        self.ax.draw_artist(artist)
+        self.canvas.blit(self.ax.bbox)
+
+    def patch_artist(self, edge_colors):
+        # 两端都已有坐标的边，新节点要等下一次布局后才显示
+        pos = self.pos
+        edges = [edge for edge in edge_colors if edge[0] in pos and edge[1] in pos]
+        if not edges:
+            return None
+        return LineCollection([(pos[u], pos[v]) for u, v in edges], colors=[edge_colors[edge] for edge in edges],
+                              linewidths=1.0 if self.detail else 0.5, zorder=1.6)
+
+    def build_overlay(self):
+        for artist in self.overlay_artists:
+            artist.remove()
+        self.overlay_artists = []
+        if self.graph is None or not self.overlay:
+            return
+
+        edge_colors, edge_labels = self.overlay['edge_colors'], self.overlay['edge_labels']
+        if edge_colors is not None or edge_labels:
+            node_mask, edge_mask = self.visible()
+            detail = self.detail = node_mask.sum() <= self.label_limit
+            if edge_colors is not None:
+                width = 1.0 if detail else 0.5
+                self.add_overlay(LineCollection(self.xy[self.pairs[edge_mask]], colors=edge_colors[edge_mask],
+                                                linewidths=width, zorder=1.5))
+            labels = {self.edges[i]: edge_labels[self.edges[i]] for i in np.flatnonzero(edge_mask)
+                      if self.edges[i] in edge_labels}
+            if detail and labels and len(labels) <= self.label_limit:
+                for text in nx.draw_networkx_edge_labels(self.graph, self.pos, edge_labels=labels, font_size=10,
+                                                         ax=self.ax).values():
+                    self.add_overlay(text)
+        patch = self.patch_artist(self.patch)
+        if patch is not None:
+            self.add_overlay(patch)
+
+        highlight = self.overlay['highlight']
+        if highlight:
+            self.add_overlay(LineCollection([(self.pos[u], self.pos[v]) for u, v in highlight],
+                                            colors=self.overlay['highlight_colors'], linewidths=2, zorder=2))
+
+    def add_overlay(self, artist):
+        # 覆盖层对象设为 animated，不参与整图绘制，由 draw_overlay 单独绘制
+        artist.set_animated(True)
+        if artist.axes is None:
+            self.ax.add_collection(artist, autolim=False)
+        self.overlay_artists.append(artist)
+
+    def draw_overlay(self):
+        for artist in self.overlay_artists:
+            self.ax.draw_artist(artist)
+
+    def on_draw(self, event):
+        # 整图重绘（底图变化、平移缩放、窗口大小变化）后缓存本 Axes 的背景，并补画覆盖层
+        if self.graph is None:
+            self.background = None
+            return
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.draw_overlay()
+
+    def blit(self):
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_overlay()
+        self.canvas.blit(self.ax.bbox)
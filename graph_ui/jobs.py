@@ -0,0 +1,237 @@
+import traceback
+from contextlib import nullcontext
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QHBoxLayout, QLabel, QMessageBox, QProgressBar, QPushButton, QWidget
+
+from graph_core.progress import JobCancelled
+
+
+class _JobSignals(QObject):
+    # 在界面线程中创建，工作线程发出的信号会排队回到界面线程处理
+    progress = pyqtSignal(object, float, str)
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(object, object)
+    partial = pyqtSignal(object, object)
+
+
+class Job(QRunnable):
+    # 在线程池中执行 fn(*args, progress=job.report, **kwargs)。
+    # fn 通过 progress(比例, 说明) 汇报进度，任务被取消后下一次汇报会抛出 JobCancelled 使其尽快结束。
+    # 给定 on_partial 时还以 partial=job.publish 调用 fn，fn 可随时发布中间结果；
+    # 用户请求提前结束后 progress 返回 True，fn 应尽快收尾并返回当前结果。
+
+    def __init__(self, key, fn, args, kwargs, on_result=None, on_error=None, tracer=None, on_partial=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_result = on_result
+        self.on_error = on_error
+        self.on_partial = on_partial
+        self.cancelled = False
+        self.stopping = False
+        self.signals = _JobSignals()
+        # 提交时所属的用户操作，任务本身和结果回调都记在这次操作名下
+        self.tracer = tracer
+        self.action = tracer.current if tracer is not None else None
+
+    def span(self, name):
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, self.action)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def finish_early(self):
+        self.stopping = True
+
+    def report(self, fraction, message=''):
+        if self.cancelled:
+            raise JobCancelled()
+        self.signals.progress.emit(self, fraction, message)
+        return self.stopping
+
+    def publish(self, value):
+        if self.cancelled:
+            raise JobCancelled()
+        self.signals.partial.emit(self, value)
+
+    def run(self):
+        try:
+            if self.cancelled:
+                raise JobCancelled()
+            with self.span(self.key):
+                if self.on_partial is not None:
+                    self.kwargs['partial'] = self.publish
+                result = self.fn(*self.args, progress=self.report, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(self, e)
+        else:
+            self.signals.finished.emit(self, result)
+
+
+class JobRunner(QObject):
+    # 每个窗口一个任务执行器。同一 key 的新任务会取代（取消）尚未完成的旧任务，
+    # 旧任务即使已经算完，其结果也会被丢弃。默认单线程顺序执行，任务之间不会并发访问同一个图。
+    # 给定 tracer 时记录每个任务及其结果回调的耗时。
+    # 读取图、结果会因修改图而失效的任务（默认）运行期间发出 locked_changed(True)，界面据此禁止修改图；
+    # 以 locks=False 提交的任务（如在图副本上计算的布局）不锁定，修改图后重新提交即可取代它。
+    busy_changed = pyqtSignal(bool)
+    locked_changed = pyqtSignal(bool)
+    progress = pyqtSignal(float, str)
+
+    def __init__(self, parent=None, max_threads=1, tracer=None):
+        super().__init__(parent)
+        self.tracer = tracer
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.current = {}  # key -> 最新提交的任务
+        self.active = set()  # 已提交但尚未结束的任务（保持引用）
+        self.locking = set()  # 其中锁定图修改的任务
+
+    @property
+    def busy(self):
+        return bool(self.active)
+
+    @property
+    def locked(self):
+        return bool(self.locking)
+
+    def submit(self, key, fn, *args, on_result=None, on_error=None, on_partial=None, locks=True, **kwargs):
+        old = self.current.get(key)
+        if old is not None:
+            old.cancel()
+        job = Job(key, fn, args, kwargs, on_result, on_error, self.tracer, on_partial)
+        job.signals.progress.connect(self._on_progress)
+        job.signals.partial.connect(self._on_partial)
+        job.signals.finished.connect(self._on_finished)
+        job.signals.failed.connect(self._on_failed)
+        was_busy, was_locked = self.busy, self.locked
+        self.current[key] = job
+        self.active.add(job)
+        if locks:
+            self.locking.add(job)
+        self.pool.start(job)
+        if not was_busy:
+            self.busy_changed.emit(True)
+        if locks and not was_locked:
+            self.locked_changed.emit(True)
+        return job
+
+    def cancel(self, key=None):
+        for job in list(self.active):
+            if key is None or job.key == key:
+                job.cancel()
+
+    @property
+    def can_finish_early(self):
+        return any(job.on_partial is not None and not job.stopping for job in self.active)
+
+    def finish_early(self):
+        # 让支持提前结束的任务停止迭代，以当前的中间结果作为最终结果
+        for job in list(self.active):
+            if job.on_partial is not None:
+                job.finish_early()
+
+    def wait(self):
+        # 阻塞直到所有任务结束并处理完回调（用于脚本和测试）
+        while self.active:
+            self.pool.waitForDone()
+            QApplication.processEvents()
+
+    def _is_current(self, job):
+        return self.current.get(job.key) is job and not job.cancelled
+
+    def _on_progress(self, job, fraction, message):
+        if self._is_current(job):
+            self.progress.emit(fraction, message)
+
+    def _on_partial(self, job, value):
+        if self._is_current(job):
+            job.on_partial(value)
+
+    def _on_finished(self, job, result):
+        current = self._is_current(job)
+        self._retire(job)
+        if current and job.on_result is not None:
+            name = getattr(job.on_result, '__name__', '<lambda>')
+            with job.span(name if name != '<lambda>' else f'{job.key}.result'):
+                job.on_result(result)
+
+    def _on_failed(self, job, error):
+        current = self._is_current(job)
+        self._retire(job)
+        if current and not isinstance(error, JobCancelled):
+            if job.on_error is None:
+                self._report_error(job, error)
+            else:
+                job.on_error(error)
+
+    def _report_error(self, job, error):
+        # 没有指定 on_error 的任务出错时弹窗提示。不能在槽函数中重新抛出，PyQt5 会因此终止整个程序
+        traceback.print_exception(type(error), error, error.__traceback__)
+        parent = self.parent()
+        QMessageBox.warning(parent if isinstance(parent, QWidget) else None, '错误', f'后台任务“{job.key}”出错：{error}')
+
+    def _retire(self, job):
+        self.active.discard(job)
+        if self.current.get(job.key) is job:
+            del self.current[job.key]
+        if job in self.locking:
+            self.locking.discard(job)
+            if not self.locking:
+                self.locked_changed.emit(False)
+        if not self.active:
+            self.busy_changed.emit(False)
+
+
+class JobStatusBar(QWidget):
+    # 进度条 + 说明 + 提前结束、取消按钮，空闲时隐藏；提前结束按钮只在有任务支持提前结束时显示
+
+    def __init__(self, runner, parent=None):
+        super().__init__(parent)
+        self.runner = runner
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.message_label = QLabel('', self)
+        layout.addWidget(self.message_label)
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 1000)
+        layout.addWidget(self.progress_bar)
+        self.finish_button = QPushButton('提前结束', self)
+        self.finish_button.clicked.connect(self.finish_early)
+        layout.addWidget(self.finish_button)
+        self.cancel_button = QPushButton('取消', self)
+        self.cancel_button.clicked.connect(lambda: self.runner.cancel())
+        layout.addWidget(self.cancel_button)
+        self.setLayout(layout)
+
+        runner.progress.connect(self.show_progress)
+        runner.busy_changed.connect(self.show_busy)
+        # 隐藏时仍保留所占空间，避免每个任务开始、结束时窗口布局变化引起画布整图重绘
+        policy = self.sizePolicy()
+        policy.setRetainSizeWhenHidden(True)
+        self.setSizePolicy(policy)
+        self.hide()
+
+    def show_progress(self, fraction, message):
+        self.progress_bar.setValue(int(fraction * 1000))
+        if message:
+            self.message_label.setText(message)
+        self.finish_button.setVisible(self.runner.can_finish_early)
+
+    def finish_early(self):
+        self.runner.finish_early()
+        self.finish_button.hide()
+
+    def show_busy(self, busy):
+        if busy:
+            self.progress_bar.setValue(0)
+            self.message_label.setText('正在计算…')
+        self.finish_button.setVisible(busy and self.runner.can_finish_early)
+        self.setVisible(busy)
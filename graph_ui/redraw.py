@@ -0,0 +1,26 @@
+from PyQt5.QtCore import QObject, QTimer
+
+
+class Debouncer(QObject):
+    # 把短时间内的多次请求合并为一次调用：每次 request 都会重新计时，停止请求 interval 毫秒后才执行
+
+    def __init__(self, callback, interval=150, parent=None):
+        super().__init__(parent)
+        self.callback = callback
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(callback)
+
+    @property
+    def pending(self):
+        return self.timer.isActive()
+
+    def request(self):
+        self.timer.start()
+
+    def flush(self):
+        # 如有尚未执行的请求则立即执行
+        if self.timer.isActive():
+            self.timer.stop()
+            self.callback()
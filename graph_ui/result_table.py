@@ -0,0 +1,238 @@
+import math
+
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+from PyQt5.QtWidgets import QAbstractItemView, QHeaderView, QTableView
+
+
+class PathList:
+    # 已给出全部路径的结果（如前 k 条最短路径）：rows 为 [(终点, 距离, 路径)]，接口与 ManyPaths 相同
+    def __init__(self, rows):
+        self.rows = rows
+        self.distances = np.array([distance for _, distance, _ in rows], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def target(self, i):
+        return self.rows[i][0]
+
+    def distance(self, i):
+        return self.rows[i][1]
+
+    def path(self, i):
+        return self.rows[i][2]
+
+
+class PathModel(QAbstractTableModel):
+    # 多条路径查询结果（ManyPaths 或 PathList）的惰性表格模型：序号、终点、距离、边数、路径。
+    # 行按距离排列，序号即名次；边数和路径只在视图请求可见行时才回溯，并缓存最近用到的一页。
+    # 行按页加入，滚动到底部时视图通过 canFetchMore / fetchMore 取下一页
+    HEADERS = ['序号', '终点', '距离', '边数', '路径']
+    PAGE = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.result = None
+        self.by_distance = np.empty(0, dtype=np.int64)  # 按距离从小到大排列的各项编号
+        self.rank = np.empty(0, dtype=np.int64)  # 各项按距离排列的名次
+        self.order = self.by_distance  # 显示的第 r 行对应结果中的第 order[r] 项
+        self.loaded = 0
+        self.paths = {}
+
+    def set_result(self, result):
+        self.beginResetModel()
+        self.result = result
+        if result is not None:
+            self.by_distance = np.argsort(result.distances, kind='stable')
+        else:
+            self.by_distance = np.empty(0, dtype=np.int64)
+        self.rank = np.empty_like(self.by_distance)
+        self.rank[self.by_distance] = np.arange(len(self.by_distance))
+        self.order = self.by_distance
+        self.loaded = min(self.PAGE, len(self.order))
+        self.paths = {}
+        self.endResetModel()
+
+    def path(self, row):
+        i = int(self.order[row])
+        if i not in self.paths:
+            if len(self.paths) >= self.PAGE:
+                self.paths.clear()
+            self.paths[i] = self.result.path(i)
+        return self.paths[i]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        i = int(self.order[row])
+        if column == 0:
+            return str(self.rank[i] + 1)
+        if column == 1:
+            return str(self.result.target(i))
+        if column == 2:
+            distance = self.result.distance(i)
+            return f'{distance:g}' if distance != math.inf else '不可达'
+        path = self.path(row)
+        if not path:
+            return ''
+        return str(len(path) - 1) if column == 3 else ' -> '.join(map(str, path))
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # 按序号（即距离）或终点排序；边数、路径列需要回溯全部路径，不参与排序
+        if self.result is None or column > 2:
+            return
+        self.layoutAboutToBeChanged.emit()
+        if column == 1:
+            targets = [str(self.result.target(i)) for i in range(len(self.result))]
+            ranked = np.array(sorted(range(len(targets)), key=targets.__getitem__), dtype=np.int64)
+        else:
+            ranked = self.by_distance
+        self.order = ranked[::-1].copy() if order == Qt.DescendingOrder else ranked
+        self.paths = {}
+        self.layoutChanged.emit()
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.loaded < len(self.order)
+
+    def fetchMore(self, parent):
+        count = min(len(self.order), self.loaded + self.PAGE)
+        self.beginInsertRows(QModelIndex(), self.loaded, count - 1)
+        self.loaded = count
+        self.endInsertRows()
+
+
+class PathTable(QTableView):
+    # 多条路径查询结果表，点击序号、终点、距离的表头排序；选中行时发出对应路径列表。
+    # 百万个终点也只绘制可见的几十行，路径只为可见和选中的行回溯
+    paths_selected = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.path_model = PathModel(self)
+        self.setModel(self.path_model)
+        self.horizontalHeader().setSectionResizeMode(len(PathModel.HEADERS) - 1, QHeaderView.Stretch)
+        self.verticalHeader().setVisible(False)
+        # 固定行高，视图不必逐行测量内容
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setSortingEnabled(True)
+        self.sortByColumn(0, Qt.AscendingOrder)
+        self.selectionModel().selectionChanged.connect(self.emit_selection)
+
+    def set_result(self, result):
+        # result 为 ManyPaths 或 PathList，按距离从小到大显示
+        self.path_model.set_result(result)
+        self.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
+
+    def top_paths(self, count):
+        # 距离最小的 count 条可达路径
+        model = self.path_model
+        paths = (model.result.path(int(i)) for i in model.by_distance[:count])
+        return [path for path in paths if path]
+
+    def emit_selection(self):
+        rows = sorted({index.row() for index in self.selectionModel().selectedRows()})
+        paths = [self.path_model.path(r) for r in rows]
+        self.paths_selected.emit([path for path in paths if path])
+
+
+class TourModel(QAbstractTableModel):
+    # 一笔画（EulerTour）的惰性表格模型：步、从、到。只在视图请求某个单元格时才把节点编号转换为节点名；
+    # 行按页加入，滚动到底部时视图通过 canFetchMore / fetchMore 取下一页
+    HEADERS = ['步', '从', '到']
+    PAGE = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tour = None
+        self.loaded = 0
+
+    def set_tour(self, tour):
+        self.beginResetModel()
+        self.tour = tour
+        self.loaded = min(self.PAGE, len(tour)) if tour is not None else 0
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if column == 0:
+            return str(row + 1)
+        return str(self.tour.names[self.tour.node_ids[row + column - 1]])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.tour is not None and self.loaded < len(self.tour)
+
+    def fetchMore(self, parent):
+        self.load_until(self.loaded)
+
+    def load_until(self, row):
+        # 保证第 row 行已加入模型（按整页加入）
+        if self.tour is None or row < self.loaded:
+            return
+        count = min(len(self.tour), (row // self.PAGE + 1) * self.PAGE)
+        self.beginInsertRows(QModelIndex(), self.loaded, count - 1)
+        self.loaded = count
+        self.endInsertRows()
+
+
+class TourTable(QTableView):
+    # 一笔画的逐步列表，百万步也只绘制可见的几十行；当前行变化时发出步号（从 0 开始）
+    step_selected = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tour_model = TourModel(self)
+        self.setModel(self.tour_model)
+        self.verticalHeader().setVisible(False)
+        # 固定行高，视图不必逐行测量内容
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.selectionModel().currentRowChanged.connect(self.emit_step)
+
+    def set_tour(self, tour):
+        self.tour_model.set_tour(tour)
+
+    def current_step(self):
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def select_step(self, row):
+        tour = self.tour_model.tour
+        if tour is None or not 0 <= row < len(tour):
+            return
+        self.tour_model.load_until(row)
+        index = self.tour_model.index(row, 0)
+        self.setCurrentIndex(index)
+        self.scrollTo(index)
+
+    def emit_step(self, current, previous):
+        if current.isValid():
+            self.step_selected.emit(current.row())
@@ -0,0 +1,97 @@
+import os
+import tempfile
+
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QCheckBox, QFileDialog, QHBoxLayout, QLabel, QPushButton, QSizePolicy, QWidget
+
+# 剖析结果默认保存的目录
+PROFILE_DIR = os.path.join(tempfile.gettempdir(), 'graph_profiles')
+
+
+class TracedCanvas(FigureCanvas):
+    # 记录每次整图重绘 (canvas.draw) 耗时的画布
+
+    def __init__(self, figure, tracer):
+        super().__init__(figure)
+        self.tracer = tracer
+
+    def draw(self):
+        with self.tracer.span('canvas.draw'):
+            super().draw()
+
+
+class _TraceSignals(QObject):
+    # 跟踪事件可能在工作线程中产生，经信号排队回到界面线程显示
+    event = pyqtSignal(object)
+
+
+class TracePanel(QWidget):
+    # 可选的性能统计栏：勾选后显示最近一次操作各阶段的耗时，并可开启内存统计、剖析下一次操作、导出跟踪文件
+
+    def __init__(self, tracer, parent=None):
+        super().__init__(parent)
+        self.tracer = tracer
+        self.action_id = None
+        self.stages = []
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.enable_box = QCheckBox('性能统计', self)
+        self.enable_box.toggled.connect(self.set_details_visible)
+        layout.addWidget(self.enable_box)
+        self.summary_label = QLabel('', self)
+        # 单行显示且宽度不随文字变化，否则每次更新都会改变窗口布局、引起画布整图重绘（又产生新的统计）
+        self.summary_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Preferred)
+        layout.addWidget(self.summary_label, 1)
+        self.memory_box = QCheckBox('内存峰值', self)
+        self.memory_box.toggled.connect(tracer.set_memory)
+        layout.addWidget(self.memory_box)
+        self.profile_button = QPushButton('剖析下一次操作', self)
+        self.profile_button.setCheckable(True)
+        self.profile_button.toggled.connect(self.arm_profiler)
+        layout.addWidget(self.profile_button)
+        self.export_button = QPushButton('导出跟踪', self)
+        self.export_button.clicked.connect(self.export_trace)
+        layout.addWidget(self.export_button)
+        self.setLayout(layout)
+        self.set_details_visible(False)
+
+        self.signals = _TraceSignals(self)
+        self.signals.event.connect(self.show_event)
+        tracer.listeners.append(self.signals.event.emit)
+
+    def set_details_visible(self, visible):
+        for widget in (self.summary_label, self.memory_box, self.profile_button, self.export_button):
+            widget.setVisible(visible)
+
+    def arm_profiler(self, armed):
+        self.tracer.profile_dir = PROFILE_DIR if armed else None
+        if armed:
+            self.summary_label.setText('下一次操作将在 cProfile 下运行')
+
+    def show_event(self, event):
+        if event['profile'] and self.profile_button.isChecked():
+            self.profile_button.setChecked(False)
+        if event['action_id'] != self.action_id:
+            self.action_id = event['action_id']
+            self.stages = []
+        self.stages.append(event)
+
+        parts = []
+        for e in self.stages:
+            text = f'{e["name"]} {e["wall"] * 1000:.1f} ms（CPU {e["cpu"] * 1000:.1f}'
+            if e['peak'] is not None:
+                text += f'，峰值 {e["peak"] / 2 ** 20:.1f} MB'
+            parts.append(text + '）')
+        summary = f'{event["action"] or "界面"}：' + ' | '.join(parts)
+        if event['profile']:
+            summary = f'剖析结果：{event["profile"]} | ' + summary
+        self.summary_label.setText(summary)
+        self.summary_label.setToolTip(summary.replace(' | ', '\n'))
+
+    def export_trace(self):
+        filename, _ = QFileDialog.getSaveFileName(self, '导出跟踪', 'trace.json', 'Chrome 跟踪文件 (*.json)')
+        if filename:
+            count = self.tracer.export_chrome(filename)
+            self.summary_label.setText(f'已导出 {count} 个阶段至 {filename}（可在 chrome://tracing 中打开）')
@@ -0,0 +1,130 @@
+import itertools
+import random
+
+import networkx as nx
+import pytest
+
+from graph_core.chromatic_index import chromatic_index
+from graph_core.edge_coloring import (EdgeColoring, greedy_edge_coloring, max_degree, minimize_edge_colors,
+                                      misra_gries_edge_coloring)
+from graph_core.graph_store import StoreGraph
+
+SEEDS = range(10)
+
+
+def random_graph(seed, n=12, p=0.35, cls=nx.Graph):
+    graph = cls()
+    graph.add_nodes_from(range(n))
+    graph.add_edges_from(nx.gnp_random_graph(n, p, seed=seed).edges())
+    return graph
+
+
+def check_proper(graph, edge_colors, num_colors):
+    # 每条边恰有一种颜色，颜色在范围内，相邻边颜色不同
+    assert {frozenset(edge) for edge in edge_colors} == {frozenset(edge) for edge in graph.edges()}
+    assert all(0 <= c < num_colors for c in edge_colors.values())
+    for v in graph:
+        colors = [c for edge, c in edge_colors.items() if v in edge]
+        assert len(colors) == len(set(colors))
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('cls', [nx.Graph, StoreGraph])
+def test_misra_gries_uses_at_most_delta_plus_one(seed, cls):
+    graph = random_graph(seed, cls=cls)
+    coloring = misra_gries_edge_coloring(graph)
+    delta = max_degree(graph)
+    assert coloring.num_colors <= delta + 1
+    check_proper(graph, coloring.edge_colors(graph), delta + 1)
+
+
+def test_self_loop_rejected():
+    graph = nx.Graph()
+    graph.add_edge('a', 'a')
+    with pytest.raises(ValueError):
+        misra_gries_edge_coloring(graph)
+
+
+def test_empty_graph():
+    graph = StoreGraph()
+    graph.add_nodes_from('ab')
+    assert misra_gries_edge_coloring(graph).num_colors == 0
+    assert greedy_edge_coloring(graph, 1) == {}
+
+
+def has_coloring(graph, k):
+    # 参考解：回溯判断能否用 k 种颜色着色（只用于很小的图）
+    edges = list(graph.edges())
+    color = {}
+
+    def place(i):
+        if i == len(edges):
+            return True
+        u, v = edges[i]
+        taken = {c for edge, c in color.items() if u in edge or v in edge}
+        for c in range(k):
+            if c not in taken:
+                color[edges[i]] = c
+                if place(i + 1):
+                    return True
+                del color[edges[i]]
+        return False
+    return place(0)
+
+
+def small_graphs():
+    yield nx.complete_graph(4)
+    yield nx.complete_graph(5)
+    yield nx.petersen_graph()
+    yield nx.cycle_graph(5)
+    yield nx.complete_bipartite_graph(3, 4)
+    for seed in SEEDS:
+        yield random_graph(seed, n=7, p=0.5)
+
+
+@pytest.mark.parametrize('graph', list(small_graphs()), ids=itertools.count())
+def test_chromatic_index_matches_brute_force(graph):
+    result = chromatic_index(graph, time_budget=30.0, workers=1)
+    assert result.exact
+    delta = max_degree(graph)
+    expected = delta if has_coloring(graph, delta) else delta + 1
+    assert result.num_colors == expected
+    check_proper(graph, result.edge_colors, result.num_colors)
+
+
+def test_chromatic_index_trivial_cases():
+    graph = StoreGraph()
+    graph.add_nodes_from('ab')
+    result = chromatic_index(graph)
+    assert result.exact and result.num_colors == 0
+    graph.add_edge('a', 'a')
+    with pytest.raises(ValueError):
+        chromatic_index(graph)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_minimize_edge_colors_stays_proper(seed):
+    graph = random_graph(seed)
+    coloring, steps = minimize_edge_colors(graph, time_budget=2.0)
+    delta = max_degree(graph)
+    assert delta <= coloring.num_colors <= delta + 1
+    check_proper(graph, coloring.edge_colors(graph), coloring.num_colors)
+    assert steps[0][2]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_incremental_insert_stays_proper(seed):
+    rng = random.Random(seed)
+    graph = random_graph(seed)
+    coloring = EdgeColoring.from_graph(graph)
+    for _ in range(15):
+        u, v = rng.sample(range(14), 2)
+        if graph.has_edge(u, v):
+            continue
+        graph.add_edge(u, v)
+        coloring.add_edge(u, v)
+        coloring.max_degree = max(coloring.max_degree, max_degree(graph))
+        check_proper(graph, coloring.edge_colors(graph), max_degree(graph) + 1)
+        # take_changed 报告的颜色与当前方案一致
+        for a, b, c in coloring.take_changed():
+            assert coloring.edge_colors(graph).get((a, b), coloring.edge_colors(graph).get((b, a))) == c
@@ -0,0 +1,34 @@
+import pytest
+
+from graph_core.edge_import import EdgeListError, parse_edge_list, read_edge_list_file
+
+
+def test_parse_rejects_bad_rows_together():
+    text = '起点,终点,权重\na,b,1\nc,,2\nd,e,x\nf,g\n'
+    with pytest.raises(EdgeListError) as info:
+        parse_edge_list(text, weighted=True)
+    assert [line for line, _ in info.value.errors] == [3, 4, 5]
+
+
+def test_parse_whitespace_and_comments():
+    heads, tails, weights = parse_edge_list('# 注释\n\na b 1.5\nb  c -2\n', weighted=True)
+    assert heads == ['a', 'b'] and tails == ['b', 'c']
+    assert weights.tolist() == [1.5, -2.0]
+    with pytest.raises(EdgeListError):
+        parse_edge_list('a b -2', weighted=True, allow_negative=False)
+
+
+def test_read_file(tmp_path):
+    path = tmp_path / 'edges.csv'
+    path.write_text('甲,乙\n', encoding='utf-8')
+    assert read_edge_list_file(str(path)) == '甲,乙\n'
+
+
+def test_read_errors_become_edge_list_errors(tmp_path):
+    # 非 UTF-8 文件、不存在的文件和目录都以 EdgeListError 报告
+    path = tmp_path / 'gbk.csv'
+    path.write_bytes('甲,乙\n'.encode('gbk'))
+    for filename in (path, tmp_path / 'missing.csv', tmp_path):
+        with pytest.raises(EdgeListError) as info:
+            read_edge_list_file(str(filename))
+        assert info.value.errors == [] and str(info.value)
@@ -0,0 +1,144 @@
+import random
+
+import networkx as nx
+import pytest
+
+from graph_core.euler import EulerReadiness, eulerian_tour
+from graph_core.graph_store import StoreMultiGraph
+from graph_core.postman import route_inspection
+
+SEEDS = range(12)
+
+
+def random_multigraph(seed, n=8, m=14, cls=nx.MultiGraph):
+    # 带平行边和自环的随机多重图，部分节点孤立
+    rng = random.Random(seed)
+    graph = cls()
+    graph.add_nodes_from(range(n))
+    for _ in range(m):
+        graph.add_edge(rng.randrange(n - 2), rng.randrange(n - 2), weight=rng.randint(1, 9))
+    return graph
+
+
+def check_walk(graph, tour, repeats=False):
+    # 相邻两步首尾相接、每一步沿着它所标的那条边；不允许重复时每条边恰好经过一次
+    edges = list(graph.edges())
+    nodes = tour.nodes()
+    assert len(nodes) == len(tour) + 1
+    for k in range(len(tour)):
+        u, v, e = tour.step(k)
+        assert {u, v} == set(edges[e])
+    if repeats:
+        assert set(tour.edge_ids.tolist()) == set(range(len(edges)))
+    else:
+        assert sorted(tour.edge_ids.tolist()) == list(range(len(edges)))
+
+
+def has_euler_walk(graph):
+    if graph.number_of_edges() == 0:
+        return False
+    core = graph.subgraph([v for v in graph if graph.degree(v)])
+    return nx.is_connected(core) and sum(d % 2 for _, d in graph.degree()) in (0, 2)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('cls', [nx.MultiGraph, StoreMultiGraph])
+def test_eulerian_tour_matches_networkx(seed, cls):
+    graph = random_multigraph(seed, cls=cls)
+    tour = eulerian_tour(graph)
+    assert (tour is not None) == has_euler_walk(graph)
+    if tour is not None:
+        check_walk(graph, tour)
+        assert tour.closed == nx.is_eulerian(graph)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_eulerian_circuit_on_eulerian_graphs(seed):
+    # 随机欧拉图：若干条闭合路线叠加，必然有欧拉环路
+    rng = random.Random(seed)
+    graph = StoreMultiGraph()
+    for _ in range(4):
+        walk = [rng.randrange(10) for _ in range(rng.randint(1, 8))]
+        for u, v in zip(walk, walk[1:] + walk[:1]):
+            graph.add_edge(u, v)
+    if not nx.is_connected(graph.subgraph([v for v in graph if graph.degree(v)])):
+        return
+    tour = eulerian_tour(graph)
+    check_walk(graph, tour)
+    assert tour.closed
+
+
+def test_empty_graph_has_no_tour():
+    for graph in (nx.MultiGraph(), StoreMultiGraph()):
+        graph.add_nodes_from('ab')
+        assert eulerian_tour(graph) is None
+
+
+def optimal_postman_cost(graph):
+    # 参考解：奇度点两两之间的最短距离上求最小权完美匹配
+    odd = [v for v, d in graph.degree() if d % 2]
+    total = sum(w for _, _, w in graph.edges(data='weight', default=1))
+    if not odd:
+        return total
+    simple = nx.Graph()
+    for u, v, w in graph.edges(data='weight', default=1):
+        if u != v and (not simple.has_edge(u, v) or simple[u][v]['weight'] > w):
+            simple.add_edge(u, v, weight=w)
+    dist = {v: nx.single_source_dijkstra_path_length(simple, v) for v in odd}
+    matching_graph = nx.Graph()
+    matching_graph.add_weighted_edges_from((a, b, dist[a][b]) for i, a in enumerate(odd) for b in odd[i + 1:])
+    matching = nx.min_weight_matching(matching_graph)
+    return total + sum(dist[a][b] for a, b in matching)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('cls', [nx.MultiGraph, StoreMultiGraph])
+def test_postman_matches_reference(seed, cls):
+    graph = random_multigraph(seed, cls=cls)
+    route = route_inspection(graph)
+    core = graph.subgraph([v for v in graph if graph.degree(v)])
+    if not nx.is_connected(core):
+        assert route is None
+        return
+    check_walk(graph, route, repeats=True)
+    assert route.closed
+    weights = [w for _, _, w in graph.edges(data='weight')]
+    assert route.cost == pytest.approx(sum(weights[e] for e in route.edge_ids.tolist()))
+    assert route.exact
+    assert route.cost == pytest.approx(optimal_postman_cost(graph))
+
+
+def test_postman_on_empty_graph():
+    for graph in (nx.MultiGraph(), StoreMultiGraph()):
+        graph.add_nodes_from('ab')
+        assert route_inspection(graph) is None
+
+
+def test_postman_rejects_negative_weights():
+    graph = nx.MultiGraph()
+    graph.add_edge('a', 'b', weight=-1)
+    with pytest.raises(ValueError):
+        route_inspection(graph)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_readiness_matches_networkx(seed):
+    graph = random_multigraph(seed)
+    state = EulerReadiness()
+    built = nx.MultiGraph()
+    for u, v in graph.edges():
+        state.add_edge(u, v)
+        built.add_edge(u, v)
+        assert state.odd == {x for x, d in built.degree() if d % 2}
+        assert state.components == nx.number_connected_components(built)
+        expected = None
+        if has_euler_walk(built):
+            expected = 'circuit' if nx.is_eulerian(built) else 'path'
+        assert state.kind == expected
+
+
+def test_readiness_on_empty_graph():
+    for graph in (nx.MultiGraph(), StoreMultiGraph()):
+        graph.add_nodes_from('ab')
+        state = EulerReadiness.from_graph(graph)
+        assert state.kind is None and state.components == 0
@@ -0,0 +1,112 @@
+import json
+
+import networkx as nx
+import pytest
+
+from graph_core.graph_io import GraphArrays, load_graph_file, save_graph_file
+from graph_core.graph_store import GraphStore
+
+
+def _write(graph, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(nx.node_link_data(graph, edges='links'), f)
+
+
+def _attributed(cls=nx.Graph):
+    graph = cls(name='demo')
+    graph.add_node('a', color='red', size=3)
+    graph.add_node('lonely')
+    graph.add_edge('a', 'b', weight=2.5, label='x')
+    graph.add_edge('b', 'c', weight=1.0)
+    return graph
+
+
+@pytest.mark.parametrize('cls', [nx.Graph, nx.MultiGraph, nx.DiGraph])
+def test_json_round_trip_keeps_attributes(tmp_path, cls):
+    original = _attributed(cls)
+    _write(original, tmp_path / 'in.json')
+    loaded = load_graph_file(str(tmp_path / 'in.json'))
+    save_graph_file(loaded, str(tmp_path / 'out.json'))
+    again = load_graph_file(str(tmp_path / 'out.json'))
+    for graph in (loaded, again):
+        assert graph.graph == {'name': 'demo'}
+        assert dict(graph.nodes(data=True)) == dict(original.nodes(data=True))
+        assert sorted(graph.edges(data=True)) == sorted(original.edges(data=True))
+
+
+def test_json_without_edges(tmp_path):
+    graph = nx.Graph()
+    graph.add_nodes_from([1, 2])
+    _write(graph, tmp_path / 'nodes.json')
+    for multigraph in (None, True):
+        loaded = load_graph_file(str(tmp_path / 'nodes.json'), multigraph=multigraph)
+        assert list(loaded.nodes) == [1, 2] and list(loaded.edges()) == []
+        save_graph_file(loaded, str(tmp_path / 'saved.json'))
+
+
+def test_json_rejects_non_numeric_weight(tmp_path):
+    graph = nx.Graph()
+    graph.add_edge('a', 'b', weight='heavy')
+    _write(graph, tmp_path / 'bad.json')
+    with pytest.raises(ValueError):
+        load_graph_file(str(tmp_path / 'bad.json'))
+
+
+@pytest.mark.parametrize('suffix', ['json', 'gbin'])
+def test_force_undirected_multigraph(tmp_path, suffix):
+    # 欧拉软件强制读为无向多重图：与原来逐条 add_edge 读入一样，每条有向边成为一条无向边，反向的边也保留
+    directed = nx.DiGraph()
+    directed.add_weighted_edges_from([('a', 'b', 1.0), ('b', 'a', 2.0), ('b', 'c', 3.0)])
+    filename = str(tmp_path / f'directed.{suffix}')
+    save_graph_file(directed, filename)
+    loaded = load_graph_file(filename, multigraph=True, directed=False)
+    expected = nx.MultiGraph()
+    expected.add_edges_from(directed.edges(data=True))
+    assert not loaded.is_directed() and loaded.is_multigraph()
+    assert sorted(loaded.edges(data='weight')) == sorted(expected.edges(data='weight'))
+    assert load_graph_file(filename).is_directed()
+
+
+def _weighted(cls, kind):
+    graph = cls()
+    graph.add_nodes_from('abcd')
+    if kind == 'int':
+        graph.add_weighted_edges_from([('a', 'b', 2), ('b', 'c', 3)])
+    elif kind == 'float':
+        graph.add_weighted_edges_from([('a', 'b', 2.5), ('b', 'c', 3.0)])
+    elif kind == 'partial':
+        graph.add_edge('a', 'b', weight=2)
+        graph.add_edge('b', 'c')
+    else:
+        graph.add_edges_from([('a', 'b'), ('b', 'c')])
+    return graph
+
+
+@pytest.mark.parametrize('kind', ['none', 'int', 'float', 'partial'])
+@pytest.mark.parametrize('cls', [nx.DiGraph, nx.MultiDiGraph, nx.Graph])
+def test_binary_and_json_keep_weights_alike(tmp_path, cls, kind):
+    # 两种格式都只为原来有权重的边恢复权重，整数权重恢复为 int；
+    # 无向图读入图存储，权重列为浮点数（见 graph_store），两种格式结果相同
+    original = _weighted(cls, kind)
+    sources = [original]
+    if not original.is_directed():
+        sources.append(GraphStore.from_networkx(original).networkx())
+    for graph in sources:
+        loaded = []
+        for suffix in ('json', 'gbin'):
+            filename = str(tmp_path / f'graph.{suffix}')
+            save_graph_file(graph, filename)
+            loaded.append(load_graph_file(filename))
+        edges = [sorted(g.edges(data='weight')) for g in loaded]
+        assert edges[0] == edges[1] == sorted(original.edges(data='weight'))
+        types = [[type(w) for _, _, w in e] for e in edges]
+        assert types[0] == types[1]
+        if original.is_directed():
+            assert types[0] == [type(w) for _, _, w in sorted(original.edges(data='weight'))]
+
+
+def test_missing_weights_count_as_one_for_shortest_paths():
+    arrays = GraphArrays.from_networkx(_weighted(nx.Graph, 'partial'))
+    assert arrays.edge_weights().tolist() == [2.0, 1.0]
+    csr = arrays.to_csr()
+    assert sorted(csr.weights.tolist()) == [1.0, 1.0, 2.0, 2.0]
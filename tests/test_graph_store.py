@@ -0,0 +1,118 @@
+import random
+
+import networkx as nx
+import pytest
+
+from graph_core.graph_store import LOOKUP_BATCH, GraphStore, StoreGraph, StoreMultiGraph
+
+
+def test_empty_graphs():
+    for cls in (StoreGraph, StoreMultiGraph):
+        G = cls()
+        assert list(G.edges()) == []
+        G.add_nodes_from(['a', 'b'])
+        assert list(G.edges()) == []
+        assert list(G.edges(keys=True) if G.is_multigraph() else G.edges(data=True)) == []
+        assert dict(G.degree()) == {'a': 0, 'b': 0}
+        assert G.copy().number_of_nodes() == 2
+
+
+def test_empty_store_order():
+    for multigraph in (False, True):
+        order, keys = GraphStore(multigraph).edge_order()
+        assert len(order) == len(keys) == 0
+
+
+def test_matches_networkx_multigraph():
+    edges = [('a', 'b', 1.0), ('b', 'a', 2.0), ('c', 'c', 3.0), ('a', 'b', 4.0), ('b', 'c', 5.0)]
+    G, H = StoreMultiGraph(), nx.MultiGraph()
+    for u, v, w in edges:
+        assert G.add_edge(u, v, weight=w) == H.add_edge(u, v, weight=w)
+    assert sorted(G.edges(keys=True, data='weight')) == sorted(H.edges(keys=True, data='weight'))
+    assert dict(G.degree()) == dict(H.degree())
+
+
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('classes', [(StoreGraph, nx.Graph), (StoreMultiGraph, nx.MultiGraph)])
+def test_bulk_insert_matches_networkx(seed, classes):
+    # 批量加入超过 LOOKUP_BATCH 条边，含重复边、反向边和自环，与 networkx 的结果逐项一致
+    rng = random.Random(seed)
+    G, H = classes[0](), classes[1]()
+    for _ in range(3):
+        edges = [(rng.randrange(40), rng.randrange(40), {'weight': rng.randint(0, 9)})
+                 for _ in range(LOOKUP_BATCH * 2)]
+        G.add_edges_from(edges)
+        H.add_edges_from(edges)
+        G.add_edge(0, 1, weight=1.5)
+        H.add_edge(0, 1, weight=1.5)
+    assert list(G.nodes) == list(H.nodes)
+    assert dict(G.degree()) == dict(H.degree())
+    assert G.number_of_edges() == H.number_of_edges()
+    if G.is_multigraph():
+        assert sorted(G.edges(keys=True, data='weight')) == sorted(H.edges(keys=True, data='weight'))
+    else:
+        assert {frozenset((u, v)): w for u, v, w in G.edges(data='weight')} == \
+            {frozenset((u, v)): w for u, v, w in H.edges(data='weight')}
+    assert nx.number_of_selfloops(G) == nx.number_of_selfloops(H)
+
+
+def _attributed():
+    H = nx.Graph(name='g')
+    H.add_node('a', color='red')
+    H.add_edge('a', 'b', weight=3, label='x')
+    H.add_edge('b', 'c')
+    return H
+
+
+def test_construct_from_networkx_keeps_attributes():
+    H = _attributed()
+    for cls in (StoreGraph, StoreMultiGraph):
+        G = cls(H)
+        assert G.graph == {'name': 'g'}
+        assert dict(G.nodes(data=True)) == {'a': {'color': 'red'}, 'b': {}, 'c': {}}
+        assert G.get_edge_data('a', 'b', **({'key': 0} if G.is_multigraph() else {})) == {'weight': 3.0, 'label': 'x'}
+
+
+def test_copies_and_conversions():
+    G = StoreGraph(_attributed())
+    for H in (G.copy(), G.to_undirected(), nx.Graph(G), nx.relabel_nodes(G, {'a': 'z'}), G.subgraph(['a', 'b']).copy()):
+        assert H.graph == {'name': 'g'}
+        u = 'z' if 'z' in H else 'a'
+        assert H.nodes[u] == {'color': 'red'}
+        assert H[u]['b'] == {'weight': 3.0, 'label': 'x'}
+    directed = G.to_directed()
+    assert directed['b']['a']['label'] == 'x'
+    H = G.copy()
+    H.nodes['a']['color'] = 'blue'
+    H['a']['b']['label'] = 'y'
+    assert G.nodes['a']['color'] == 'red' and G['a']['b']['label'] == 'x'
+
+
+def test_attribute_helpers():
+    G = StoreGraph(_attributed())
+    nx.set_node_attributes(G, {'b': 2}, 'size')
+    nx.set_edge_attributes(G, {('b', 'c'): 'road'}, 'kind')
+    assert G.nodes['b'] == {'size': 2}
+    assert G['c']['b'] == {'kind': 'road'}
+    del G['a']['b']['weight']
+    del G.nodes['a']['color']
+    assert G['a']['b'] == {'label': 'x'} and G.nodes['a'] == {}
+    with pytest.raises(KeyError):
+        del G['a']['b']['weight']
+
+
+def test_unsupported_operations_raise_clearly():
+    G = StoreGraph(_attributed())
+    for remove in (lambda: G.remove_edge('a', 'b'), lambda: G.remove_node('a'),
+                   lambda: nx.relabel_nodes(G, {'a': 'z'}, copy=False)):
+        with pytest.raises(nx.NetworkXError):
+            remove()
+    with pytest.raises(TypeError):
+        G.add_edge('a', 'c', weight='3')
+    with pytest.raises(TypeError):
+        G['a']['b']['color'] = 1.5
+    assert G['a']['b']['weight'] == 3.0
+    # 可以先复制成普通 networkx 图再删除
+    H = nx.Graph(G)
+    H.remove_node('a')
+    assert list(H.edges()) == [('b', 'c')]
@@ -0,0 +1,227 @@
+import math
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from graph_core.batch import solve_batch
+from graph_core.graph_io import GraphArrays
+from graph_core.graph_store import StoreGraph
+from graph_core.landmarks import LandmarkIndex
+from graph_core.shortest_path import CSRGraph, ShortestPathEngine, dijkstra
+
+SEEDS = range(8)
+
+
+def random_graph(seed, n=30, m=60, cls=nx.Graph):
+    # 带自环、可能不连通的随机加权图，节点名为字符串
+    rng = random.Random(seed)
+    graph = cls()
+    graph.add_nodes_from(f'v{i}' for i in range(n))
+    for _ in range(m):
+        u, v = f'v{rng.randrange(n)}', f'v{rng.randrange(n)}'
+        graph.add_edge(u, v, weight=round(rng.uniform(0, 10), 1))
+    return graph
+
+
+def path_length(graph, path):
+    return sum(graph[u][v]['weight'] for u, v in zip(path, path[1:]))
+
+
+def expected(graph, source):
+    return nx.single_source_dijkstra_path_length(graph, source)
+
+
+def check_tree(graph, engine, version, source):
+    # 引擎给出的距离、路径与 networkx 一致，不可达的节点标为 inf
+    reference = expected(graph, source)
+    for target, distance, path in engine.one_to_many(graph, version, source, list(graph.nodes)):
+        if target in reference:
+            assert distance == pytest.approx(reference[target])
+            assert path[0] == source and path[-1] == target
+            assert path_length(graph, path) == pytest.approx(distance)
+        else:
+            assert distance == math.inf and path is None
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('cls', [nx.Graph, StoreGraph])
+def test_dijkstra_matches_networkx(seed, cls):
+    graph = random_graph(seed, cls=cls)
+    engine = ShortestPathEngine()
+    for source in ['v0', 'v1', 'v7']:
+        check_tree(graph, engine, 1, source)
+
+
+def test_empty_and_isolated_graphs():
+    graph = nx.Graph()
+    graph.add_node('a')
+    engine = ShortestPathEngine()
+    assert engine.shortest_path(graph, 1, 'a', 'a') == (['a'], 0.0)
+    graph.add_node('b')
+    with pytest.raises(nx.NetworkXNoPath):
+        engine.shortest_path(graph, 2, 'a', 'b')
+    csr = CSRGraph.from_networkx(nx.Graph())
+    assert csr.num_nodes == 0 and len(csr.targets) == 0
+
+
+def test_negative_weights_rejected():
+    graph = nx.Graph()
+    graph.add_edge('a', 'b', weight=-1.0)
+    with pytest.raises(ValueError):
+        ShortestPathEngine().shortest_path(graph, 1, 'a', 'b')
+
+
+def test_dijkstra_on_multigraph_uses_lightest_parallel_edge():
+    graph = nx.MultiGraph()
+    graph.add_edge('a', 'b', weight=5.0)
+    graph.add_edge('a', 'b', weight=2.0)
+    csr = CSRGraph.from_networkx(graph)
+    dist, _ = dijkstra(csr, csr.index['a'])
+    assert dist[csr.index['b']] == 2.0
+
+
+def test_negative_edge_drops_cached_trees():
+    G = nx.Graph()
+    G.add_weighted_edges_from([('a', 'b', 1.0), ('b', 'c', 2.0)])
+    engine = ShortestPathEngine()
+    assert engine.shortest_path(G, 1, 'a', 'c') == (['a', 'b', 'c'], 3.0)
+    G.add_edge('c', 'd', weight=-1.0)
+    engine.edge_inserted(G, 2, 'c', 'd')
+    assert not engine.trees
+    with pytest.raises(ValueError):
+        engine.shortest_path(G, 2, 'a', 'd')
+
+
+def test_new_self_loop_node_registered_once():
+    G = nx.Graph()
+    G.add_weighted_edges_from([('a', 'b', 1.0)])
+    engine = ShortestPathEngine()
+    engine.shortest_path(G, 1, 'a', 'b')
+    G.add_edge('z', 'z', weight=1.0)
+    engine.edge_inserted(G, 2, 'z', 'z')
+    assert engine.nodes == ['a', 'b', 'z']
+    assert all(len(dist) == 3 for dist, _ in engine.trees.values())
+    G.add_edge('b', 'z', weight=2.0)
+    engine.edge_inserted(G, 3, 'b', 'z')
+    assert engine.shortest_path(G, 3, 'a', 'z') == (['a', 'b', 'z'], 3.0)
+    assert engine.frozen(G, 3).num_nodes == 3
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_tree_repair_matches_networkx(seed):
+    rng = random.Random(seed)
+    graph = random_graph(seed, n=20, m=25)
+    engine = ShortestPathEngine()
+    version = 1
+    sources = ['v0', 'v3', 'v5']
+    for source in sources:
+        engine.tree(graph, version, source)
+    for _ in range(30):
+        # 新节点、自环、改写已有边（变小或变大）都要覆盖
+        u = f'v{rng.randrange(24)}'
+        v = u if rng.random() < 0.1 else f'v{rng.randrange(24)}'
+        previous = graph[u][v]['weight'] if graph.has_edge(u, v) else None
+        graph.add_edge(u, v, weight=round(rng.uniform(0, 10), 1))
+        version += 1
+        engine.edge_inserted(graph, version, u, v, previous)
+        assert len(engine.nodes) == len(set(engine.nodes))
+        for source in sources:
+            check_tree(graph, engine, version, source)
+    assert engine.frozen(graph, version).num_nodes == graph.number_of_nodes()
+
+
+@pytest.mark.parametrize('seed', SEEDS[:3])
+def test_batch_matches_networkx(seed):
+    rng = random.Random(seed)
+    graph = random_graph(seed)
+    arrays = GraphArrays.from_networkx(graph)
+    csr = arrays.to_csr()
+    sources = np.array([rng.randrange(csr.num_nodes) for _ in range(50)])
+    targets = np.array([rng.randrange(csr.num_nodes) for _ in range(50)])
+    seen = 0
+    for source, group, dists, paths in solve_batch(csr, sources, targets, workers=1, with_paths=True):
+        reference = expected(graph, csr.nodes[source])
+        for t, distance, path in zip(group.tolist(), dists, paths):
+            seen += 1
+            assert distance == pytest.approx(reference.get(csr.nodes[t], math.inf))
+            if path:
+                assert path_length(graph, [csr.nodes[i] for i in path]) == pytest.approx(distance)
+    assert seen == 50
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_landmarks_match_networkx(seed):
+    rng = random.Random(seed)
+    graph = random_graph(seed, n=40, m=70)
+    csr = CSRGraph.from_networkx(graph)
+    index = LandmarkIndex.build(csr, num_landmarks=4, seed=seed)
+    for _ in range(40):
+        s, t = rng.randrange(csr.num_nodes), rng.randrange(csr.num_nodes)
+        path, distance = index.query(csr, s, t)
+        try:
+            reference = nx.dijkstra_path_length(graph, csr.nodes[s], csr.nodes[t])
+        except nx.NetworkXNoPath:
+            assert path is None and distance == math.inf
+            continue
+        assert distance == pytest.approx(reference)
+        assert path_length(graph, [csr.nodes[i] for i in path]) == pytest.approx(reference)
+
+
+def test_landmarks_reject_negative_weights():
+    with pytest.raises(ValueError):
+        LandmarkIndex.build(CSRGraph.from_arrays(['a', 'b'], [0], [1], [-1.0]))
+
+
+def test_landmarks_after_self_loop_insert():
+    # 加入自环新节点后，引擎重建的 CSR 与地标表仍与图的节点一一对应
+    graph = random_graph(0, n=10, m=15)
+    engine = ShortestPathEngine()
+    engine.tree(graph, 1, 'v0')
+    graph.add_edge('new', 'new', weight=1.0)
+    engine.edge_inserted(graph, 2, 'new', 'new')
+    csr = engine.frozen(graph, 2)
+    assert csr.num_nodes == graph.number_of_nodes()
+    engine.attach_landmarks(LandmarkIndex.build(csr, num_landmarks=3), 2)
+    engine.trees.clear()
+    for target in graph.nodes:
+        if nx.has_path(graph, 'v1', target):
+            _, distance = engine.shortest_path(graph, 2, 'v1', target)
+            assert distance == pytest.approx(nx.dijkstra_path_length(graph, 'v1', target))
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_k_shortest_paths_match_networkx(seed):
+    graph = random_graph(seed, n=12, m=30)
+    graph.remove_edges_from(list(nx.selfloop_edges(graph)))
+    engine = ShortestPathEngine()
+    component = max(nx.connected_components(graph), key=len)
+    source, target = sorted(component)[:2]
+    k = 6
+    paths = engine.k_shortest_paths(graph, 1, source, target, k)
+    reference = []
+    for path in nx.shortest_simple_paths(graph, source, target, weight='weight'):
+        reference.append(path_length(graph, path))
+        if len(reference) == k:
+            break
+    assert [distance for _, distance in paths] == pytest.approx(reference)
+    for path, distance in paths:
+        assert len(set(path)) == len(path)
+        assert path_length(graph, path) == pytest.approx(distance)
+    assert len({tuple(path) for path, _ in paths}) == len(paths)
+
+
+def test_one_to_many_all_nodes_is_lazy_snapshot():
+    graph = random_graph(2, n=15, m=20)
+    engine = ShortestPathEngine()
+    result = engine.one_to_many(graph, 1, 'v0')
+    assert len(result) == graph.number_of_nodes()
+    assert result.reachable == len(expected(graph, 'v0'))
+    before = list(result)
+    assert {target for target, _, _ in before} == set(graph.nodes)
+    # 之后加边会原地修复缓存的树，已给出的结果不受影响
+    graph.add_edge('v0', 'v14', weight=0.0)
+    engine.edge_inserted(graph, 2, 'v0', 'v14')
+    assert list(result) == before
+    check_tree(graph, engine, 2, 'v0')
@@ -0,0 +1,233 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# 无显示环境下运行：Qt 使用 offscreen 平台，Matplotlib 使用 Agg 后端
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+import matplotlib
+
+matplotlib.use('Agg')
+
+import networkx as nx
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+
+from graph_core import generators
+from graph_core.graph_io import load_graph_file, save_graph_file
+from graph_core.graph_store import GraphStore
+from graph_core.layout import LayoutCache
+from graph_core.shortest_path import ShortestPathEngine
+
+# 各规模下合成图的参数
+PRESETS = {
+    'small': {'sparse': 500, 'grid': 20, 'dense': 100, 'euler': (200, 1000), 'bipartite': (100, 100, 0.05),
+              'regular': (300, 4)},
+    'medium': {'sparse': 3000, 'grid': 55, 'dense': 300, 'euler': (1000, 6000), 'bipartite': (400, 400, 0.02),
+               'regular': (2000, 6)},
+    'large': {'sparse': 20000, 'grid': 140, 'dense': 800, 'euler': (5000, 50000), 'bipartite': (2000, 2000, 0.004),
+              'regular': (10000, 8)},
+}
+STAGES = ['load', 'layout', 'algorithm', 'draw']
+# 每个最短路用例随机查询的 (起点, 终点) 对数
+QUERIES = 20
+# 默认回归阈值：当前最短用时超过基线的该倍数即视为性能回退
+TOLERANCE = 1.3
+# 低于该用时的阶段受计时噪声影响太大，不参与回归判断
+NOISE_FLOOR = 0.005
+
+
+def shortest_path_algorithm(app, graph, seed):
+    # 每次使用新的引擎（含 CSR 构建），依次回答 QUERIES 个不同起点的查询
+    rng = random.Random(seed)
+    nodes = list(graph.nodes)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(QUERIES)]
+
+    def run():
+        engine = ShortestPathEngine()
+        for source, target in pairs:
+            try:
+                engine.shortest_path(graph, 1, source, target)
+            except nx.NetworkXNoPath:
+                pass
+    return run
+
+
+def eulerian_algorithm(app, graph, seed):
+    def run():
+        outcome = app.compute_eulerian_circuit()
+        if outcome is None or len(outcome) != graph.number_of_edges():
+            raise RuntimeError('欧拉环游结果不正确')
+    return run
+
+
+def edge_coloring_algorithm(app, graph, seed):
+    # Misra–Gries 在 Δ + 1 种颜色下一定成功，即软件保证可以着色的颜色数
+    num_colors = max((d for _, d in graph.degree()), default=0) + 1
+
+    def run():
+        if app.edge_coloring(num_colors) is None:
+            raise RuntimeError('边着色失败')
+    return run
+
+
+APPS = {
+    'shortest_path': ('最短路查找', 'ShortestPathApp', shortest_path_algorithm, False),
+    'eulerian': ('Euler环游规划软件', 'EulerianPathApp', eulerian_algorithm, True),
+    'edge_coloring': ('边着色', 'EdgeColoringApp', edge_coloring_algorithm, False),
+}
+
+
+def make_cases(preset, seed):
+    # 返回 [(用例名, 所属软件, 生成函数)]，图在用到时才生成
+    sizes = PRESETS[preset]
+    return [
+        ('shortest_path/sparse', 'shortest_path', lambda: generators.random_sparse(sizes['sparse'], seed=seed)),
+        ('shortest_path/grid', 'shortest_path', lambda: generators.road_grid(sizes['grid'], seed=seed)),
+        ('shortest_path/dense', 'shortest_path', lambda: generators.dense(sizes['dense'], seed=seed)),
+        ('eulerian/multigraph', 'eulerian', lambda: generators.eulerian_multigraph(*sizes['euler'], seed=seed)[0]),
+        ('edge_coloring/bipartite', 'edge_coloring',
+         lambda: generators.bipartite(*sizes['bipartite'], seed=seed)[0]),
+        ('edge_coloring/regular', 'edge_coloring', lambda: generators.regular(*sizes['regular'], seed=seed)),
+    ]
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def run_case(app, algorithm, multigraph, graph, stages, repeat, seed, tmpdir):
+    # 依次计时各阶段，返回 {阶段: 各次用时}
+    timings = {}
+    if 'load' in stages:
+        filename = os.path.join(tmpdir, 'graph.json')
+        save_graph_file(graph, filename)
+        timings['load'] = measure(lambda: load_graph_file(filename, multigraph=multigraph), repeat)
+
+    # 与软件中一样使用建立在图存储上的图
+    graph = GraphStore.from_networkx(graph).networkx()
+    app.graph = graph
+    app.graph_version += 1
+    app.layout_cache.invalidate()
+    # 布局是后面绘制阶段的输入，不计时 layout 阶段时也要算出来
+    pos = None
+
+    def layout():
+        nonlocal pos
+        pos = LayoutCache().positions(graph, 1)
+    if 'layout' in stages:
+        timings['layout'] = measure(layout, repeat)
+    if 'algorithm' in stages:
+        timings['algorithm'] = measure(algorithm(app, graph, seed), repeat)
+    if 'draw' in stages:
+        if pos is None:
+            layout()
+
+        def draw():
+            # 同一图版本再次绘制只会移动节点，每次递增版本号以计时整图重画
+            app.graph_version += 1
+            app.draw_graph(pos)
+            app.canvas.draw()
+        timings['draw'] = measure(draw, repeat)
+    return timings
+
+
+def compare(results, baseline, tolerance):
+    # 按 (用例, 阶段) 对比最短用时，返回回退项列表 [(用例, 阶段, 基线, 当前, 阈值)]
+    previous = {(r['case'], r['stage']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        base = previous.get((r['case'], r['stage']))
+        if base is None or max(base['min'], r['min']) < NOISE_FLOOR:
+            continue
+        threshold = base.get('threshold', tolerance)
+        if r['min'] > base['min'] * threshold:
+            regressions.append((r['case'], r['stage'], base['min'], r['min'], threshold))
+    return regressions
+
+
+# 运行期间一直持有 QApplication 的引用：没有引用时它会被立即销毁，之后创建窗口会使进程中止
+_qt_app = None
+
+
+# 三个软件各阶段（JSON 加载、布局、算法、绘制）的性能基准：使用固定种子的合成图，
+# 在无显示环境下分阶段计时，结果写入 JSON 文件；给定基线文件时按阈值判断是否有性能回退（有则退出码为 1）
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='图论软件性能基准测试（无界面）')
+    parser.add_argument('-p', '--preset', choices=list(PRESETS), default='small', help='合成图规模，默认为 small')
+    parser.add_argument('-c', '--cases', nargs='*', help='只运行名称以这些前缀开头的用例，如 shortest_path eulerian/')
+    parser.add_argument('-s', '--stages', nargs='*', choices=STAGES, default=STAGES, help='要计时的阶段，默认全部')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='每个阶段重复次数，取最短用时，默认为 3')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子，默认为 0')
+    parser.add_argument('-o', '--output', default='benchmark.json', help='结果文件，默认为 benchmark.json')
+    parser.add_argument('-b', '--baseline', help='基线结果文件，用于判断性能回退')
+    parser.add_argument('-t', '--tolerance', type=float, default=TOLERANCE,
+                        help=f'基线中未给出阈值时使用的回退阈值（倍数），默认为 {TOLERANCE}')
+    args = parser.parse_args(argv)
+
+    global _qt_app
+    _qt_app = QApplication.instance() or QApplication(sys.argv)
+    windows = {}
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, kind, generate in make_cases(args.preset, args.seed):
+            if args.cases and not any(name.startswith(prefix) for prefix in args.cases):
+                continue
+            module_name, class_name, algorithm, multigraph = APPS[kind]
+            if kind not in windows:
+                windows[kind] = getattr(importlib.import_module(module_name), class_name)()
+            graph = generate()
+            timings = run_case(windows[kind], algorithm, multigraph, graph, args.stages, args.repeat, args.seed,
+                               tmpdir)
+            for stage in STAGES:
+                if stage not in timings:
+                    continue
+                times = timings[stage]
+                results.append({
+                    'case': name, 'stage': stage,
+                    'nodes': graph.number_of_nodes(), 'edges': graph.number_of_edges(),
+                    'min': min(times), 'median': statistics.median(times), 'times': times,
+                    'threshold': args.tolerance,
+                })
+                print(f'{name:<26}{stage:<10}{graph.number_of_nodes():>8} 节点 {graph.number_of_edges():>8} 边'
+                      f'{min(times) * 1000:>12.1f} ms', file=sys.stderr)
+
+    report = {
+        'meta': {
+            'preset': args.preset, 'seed': args.seed, 'repeat': args.repeat,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'networkx': nx.__version__, 'numpy': np.__version__, 'matplotlib': matplotlib.__version__,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'结果已写入 {args.output}', file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for case, stage, before, after, threshold in regressions:
+            print(f'性能回退：{case} {stage} {before * 1000:.1f} ms -> {after * 1000:.1f} ms'
+                  f'（{after / before:.2f} 倍，阈值 {threshold} 倍）', file=sys.stderr)
+        if regressions:
+            return 1
+        print('与基线相比没有性能回退', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
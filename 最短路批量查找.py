@@ -0,0 +1,45 @@
+import argparse
+import sys
+import time
+
+from graph_core.batch import read_queries, solve_batch, write_results
+from graph_core.graph_io import read_graph_arrays
+
+
+# 无界面的批量最短路径查询：读取与“加权图最短路径查找软件”相同的 node-link JSON 或 .gbin 图文件，
+# 以及每行一个 (起点, 终点) 的查询文件，按起点分组后分配到进程池计算，结果以 CSV 或 JSONL 流式写出。
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='批量最短路径查找（无界面）')
+    parser.add_argument('graph', help='node-link 格式的 JSON 图文件或 .gbin 二进制图文件')
+    parser.add_argument('queries', help='查询文件，每行 “起点,终点”')
+    parser.add_argument('-o', '--output', help='输出文件，默认写到标准输出')
+    parser.add_argument('-f', '--format', choices=['csv', 'jsonl'], default=None,
+                        help='输出格式，默认按输出文件扩展名判断，否则为 csv')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='进程数，默认为 CPU 核数')
+    parser.add_argument('-d', '--delimiter', default=',', help='查询文件的分隔符，默认为逗号')
+    parser.add_argument('--paths', action='store_true', help='同时输出完整路径')
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('jsonl' if args.output and args.output.endswith('.jsonl') else 'csv')
+
+    started = time.perf_counter()
+    # 直接由文件中的数组构建 CSR，不经过 networkx；.gbin 文件以内存映射方式打开
+    csr = read_graph_arrays(args.graph).to_csr()
+    # 查询文件中的节点名都是字符串，而 JSON 中的节点编号可能是数字
+    index = {str(node): i for i, node in enumerate(csr.nodes)}
+    sources, targets, unknown = read_queries(args.queries, index, args.delimiter)
+    if unknown:
+        print(f'警告：{len(unknown)} 条查询的节点不在图中', file=sys.stderr)
+
+    out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        results = solve_batch(csr, sources, targets, workers=args.workers, with_paths=args.paths)
+        count = write_results(results, csr.nodes, out, fmt, unknown)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f'完成 {count} 条查询，用时 {time.perf_counter() - started:.2f} 秒', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,26 @@
 import sys
 import networkx as nx
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QLabel, QFileDialog
+from matplotlib.figure import Figure
+from matplotlib import cm
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QLabel, QFileDialog, \
+    QSpinBox
 from PyQt5.QtGui import QColor
-import json
+import os
+
+from graph_core.edge_import import EdgeListError, parse_edge_list, read_edge_list_file
+from graph_core.graph_io import FILE_FILTER, load_graph_file, save_graph_file
+from graph_core.graph_store import StoreGraph
+from graph_core.landmarks import LandmarkIndex, compare_with_networkx
+from graph_core.layout import LayoutCache
+from graph_core.progress import report
+from graph_core.shortest_path import ShortestPathEngine
+from graph_core.tracing import Tracer
+from graph_ui.graph_view import GraphView
+from graph_ui.jobs import JobRunner, JobStatusBar
+from graph_ui.redraw import Debouncer
+from graph_ui.result_table import PathList, PathTable
+from graph_ui.tracing import TracePanel, TracedCanvas
 
 # Set up matplotlib to support Chinese
 import matplotlib
@@ -14,11 +30,29 @@ matplotlib.rcParams['axes.unicode_minus'] = False  # Ensure minus signs are show
 
 
 class ShortestPathApp(QWidget):
+    # 多条路径的查询结果中，在画布上用不同颜色叠加显示的前几条
+    TOP_PATHS = 5
+
     def __init__(self):
         super().__init__()
 
-        # Initialize the graph
-        self.graph = nx.Graph()
+        # Initialize the graph（建立在紧凑图存储上，节点名只存一份，边和权重存为数组）
+        self.graph = StoreGraph()
+        self.graph_version = 0  # 图每次变化时递增，用于判断缓存是否过期
+        self.layout_cache = LayoutCache()
+        # 布局任务最终给出的节点坐标及其图版本。LayoutCache 可能正被后台的布局任务使用，界面线程只读这里的坐标
+        self.pos = {}
+        self.pos_version = None
+        self.pending_paths = None  # 布局尚未完成时到达的查询结果，布局完成后再高亮
+        self.path_engine = ShortestPathEngine()
+        self.graph_filename = None  # 最近加载的图文件，加速索引保存在它旁边
+        # 布局与最短路计算放到后台线程，界面线程只负责绘制
+        # 记录每次操作各阶段的耗时，可在性能统计栏中查看或导出
+        self.tracer = Tracer()
+        self.jobs = JobRunner(self, tracer=self.tracer)
+        self.jobs.locked_changed.connect(self.set_editing_enabled)
+        # 连续加边时合并为一次重绘
+        self.redraw = Debouncer(self.update_graph_visualization, parent=self)
 
         # UI setup
         self.setWindowTitle('加权图最短路径查找软件')
@@ -46,6 +80,15 @@ class ShortestPathApp(QWidget):
         self.add_edge_button.clicked.connect(self.add_edge)
         input_layout.addWidget(self.add_edge_button)
 
+        # Bulk import (批量导入边，每行 “头节点,尾节点,权重”)
+        self.import_file_button = QPushButton('从文件导入边', self)
+        self.import_file_button.clicked.connect(self.import_edges_from_file)
+        input_layout.addWidget(self.import_file_button)
+
+        self.import_clipboard_button = QPushButton('从剪贴板导入边', self)
+        self.import_clipboard_button.clicked.connect(self.import_edges_from_clipboard)
+        input_layout.addWidget(self.import_clipboard_button)
+
         layout.addLayout(input_layout)
 
         # Load button to visualize graph
@@ -64,7 +107,7 @@ class ShortestPathApp(QWidget):
         layout.addWidget(self.start_node_input)
 
         self.end_node_input = QLineEdit(self)
-        self.end_node_input.setPlaceholderText('输入终点节点')
+        self.end_node_input.setPlaceholderText('输入终点节点（一对多查询时用逗号分隔多个，留空表示全部节点）')
         layout.addWidget(self.end_node_input)
 
         # Button to find shortest path
@@ -72,13 +115,53 @@ class ShortestPathApp(QWidget):
         self.find_path_button.clicked.connect(self.find_shortest_path)
         layout.addWidget(self.find_path_button)
 
+        # One-to-many distances and k alternative routes (一对多查询、前 k 条路径)
+        multi_layout = QHBoxLayout()
+        self.one_to_many_button = QPushButton('一对多查询', self)
+        self.one_to_many_button.clicked.connect(self.find_one_to_many)
+        multi_layout.addWidget(self.one_to_many_button)
+
+        self.k_paths_input = QSpinBox(self)
+        self.k_paths_input.setRange(1, 1000)
+        self.k_paths_input.setValue(5)
+        self.k_paths_input.setPrefix('k = ')
+        multi_layout.addWidget(self.k_paths_input)
+
+        self.k_paths_button = QPushButton('前 k 条路径', self)
+        self.k_paths_button.clicked.connect(self.find_k_shortest_paths)
+        multi_layout.addWidget(self.k_paths_button)
+        layout.addLayout(multi_layout)
+
+        # Button to build the landmark index (预处理加速索引)
+        self.build_index_button = QPushButton('构建加速索引', self)
+        self.build_index_button.clicked.connect(self.build_path_index)
+        layout.addWidget(self.build_index_button)
+
         # Result display
         self.result_label = QLabel('结果: ', self)
         layout.addWidget(self.result_label)
 
+        # Table of multi-path results (可排序，选中行时在画布上显示对应路径)
+        self.path_table = PathTable(self)
+        self.path_table.setMaximumHeight(180)
+        self.path_table.paths_selected.connect(self.highlight_paths)
+        self.path_table.hide()
+        layout.addWidget(self.path_table)
+
+        # Progress of background jobs (后台任务进度与取消)
+        self.job_status = JobStatusBar(self.jobs, self)
+        layout.addWidget(self.job_status)
+        self.trace_panel = TracePanel(self.tracer, self)
+        layout.addWidget(self.trace_panel)
+
         # Create Matplotlib figure and canvas for visualization
-        self.fig, self.axs = plt.subplots(1, 2, figsize=(12, 6))  # Create two subplots
-        self.canvas = FigureCanvas(self.fig)
+        # 直接创建 Figure 而不经过 pyplot，启动时不必加载 pyplot 及其全局图形管理
+        self.fig = Figure(figsize=(12, 6))
+        self.axs = self.fig.subplots(1, 2)  # Create two subplots
+        self.canvas = TracedCanvas(self.fig, self.tracer)
+        # 大图按视口分层次绘制，可用工具栏或滚轮平移、缩放
+        self.views = [GraphView(ax, self.canvas) for ax in self.axs]
+        self.toolbar = NavigationToolbar(self.canvas, self)
 
         # Create two labels for the titles
         self.title_label_1 = QLabel('原始图', self)
@@ -94,6 +177,9 @@ class ShortestPathApp(QWidget):
         self.title_label_2.setAutoFillBackground(True)
         self.title_label_2.setStyleSheet("background-color: lightblue; font-size: 16px;")
 
+        # Pan/zoom toolbar (平移、缩放)
+        layout.addWidget(self.toolbar)
+
         # Create layout for the two regions with some space between them
         graph_layout = QHBoxLayout()
         graph_layout.addWidget(self.canvas)
@@ -113,66 +199,174 @@ class ShortestPathApp(QWidget):
 
     def add_edge(self):
         # Add an edge to the graph
+        self.tracer.action('添加边')
         try:
             head_node = self.head_node_input.text()
             tail_node = self.tail_node_input.text()
             weight = float(self.weight_input.text())
 
-            if head_node and tail_node and isinstance(weight, (int, float)):
+            if weight < 0:
+                # 与批量导入一致：Dijkstra 及最短路径树的增量修复都要求权重非负
+                self.result_label.setText('权重不能为负数。')
+            elif head_node and tail_node and isinstance(weight, (int, float)):
+                previous = self.graph[head_node][tail_node].get('weight', 1) \
+                    if self.graph.has_edge(head_node, tail_node) else None
                 self.graph.add_edge(head_node, tail_node, weight=weight)
+                self.graph_version += 1
+                self.path_engine.edge_inserted(self.graph, self.graph_version, head_node, tail_node, previous)
+                self.invalidate_layout([head_node, tail_node])
                 self.head_node_input.clear()
                 self.tail_node_input.clear()
                 self.weight_input.clear()
-                self.update_graph_visualization()
+                self.redraw.request()
             else:
                 self.result_label.setText('请输入合法的头节点、尾节点和权重。')
         except ValueError:
             self.result_label.setText('权重格式无效，请输入有效的数字。')
 
+    def import_edges_from_file(self):
+        filename, _ = QFileDialog.getOpenFileName(self, '导入边列表', '', '边列表文件 (*.csv *.tsv *.txt);;所有文件 (*)')
+        if filename:
+            self.import_edges(filename=filename)
+
+    def import_edges_from_clipboard(self):
+        self.import_edges(QApplication.clipboard().text())
+
+    def import_edges(self, text=None, filename=None):
+        # 整体校验后一次性加入图中，只触发一次重绘；给出 filename 时从文件读取，读取失败与格式错误一样提示
+        self.tracer.action('导入边')
+        try:
+            if filename is not None:
+                text = read_edge_list_file(filename)
+            heads, tails, weights = parse_edge_list(text, weighted=True, allow_negative=False)
+        except EdgeListError as e:
+            self.result_label.setText(f'导入失败：{e}')
+            return
+        if not heads:
+            self.result_label.setText('没有可导入的边。')
+            return
+
+        self.graph.add_weighted_edges_from(zip(heads, tails, weights.tolist()))
+        # 批量加边后最短路径树缓存整体失效（版本号跳变）
+        self.graph_version += 1
+        self.invalidate_layout(set(heads) | set(tails))
+        self.result_label.setText(f'已导入 {len(heads)} 条边')
+        self.redraw.request()
+
     def load_graph(self):
-        # Load graph from JSON
-        filename, _ = QFileDialog.getOpenFileName(self, '打开图文件', '', 'JSON Files (*.json)')
+        # Load graph from JSON (流式解析) or .gbin (内存映射)
+        self.tracer.action('加载图')
+        filename, _ = QFileDialog.getOpenFileName(self, '打开图文件', '', FILE_FILTER)
 
         if filename:
-            with open(filename, 'r') as f:
-                data = json.load(f)
-                self.graph = nx.node_link_graph(data)
-                self.update_graph_visualization()
+            self.jobs.submit('file', load_graph_file, filename,
+                             on_result=lambda graph: self.set_graph(graph, filename),
+                             on_error=lambda e: self.result_label.setText(f'加载图失败：{e}'))
+
+    def set_graph(self, graph, filename):
+        self.graph = graph
+        self.graph_version += 1
+        self.layout_cache.invalidate()
+        self.pending_paths = None
+        self.graph_filename = filename
+        self.load_path_index()
+        self.update_graph_visualization()
 
     def save_graph(self):
-        # Save graph to JSON
-        filename, _ = QFileDialog.getSaveFileName(self, '保存图文件', '', 'JSON Files (*.json)')
+        # Save graph to JSON or .gbin
+        self.tracer.action('保存图')
+        filename, _ = QFileDialog.getSaveFileName(self, '保存图文件', '', FILE_FILTER)
 
         if filename:
-            data = nx.node_link_data(self.graph)
-            with open(filename, 'w') as f:
-                json.dump(data, f)
-            self.result_label.setText(f'图已保存至 {filename}')
-
-    def update_graph_visualization(self):
-        # Clear previous plot
-        for ax in self.axs:
-            ax.clear()
-
-        # Remove any borders, ticks, etc.
-        for ax in self.axs:
-            ax.set_axis_off()  # Hide axis and ticks
-
-        # Create a layout for nodes
-        pos = nx.spring_layout(self.graph)  # Use spring layout for node positioning
+            self.jobs.submit('file', save_graph_file, self.graph, filename,
+                             on_result=lambda _: self.result_label.setText(f'图已保存至 {filename}'),
+                             on_error=lambda e: self.result_label.setText(f'保存图失败：{e}'))
+
+    def set_editing_enabled(self, locked):
+        # 读取图的后台任务运行期间禁止修改图；布局任务在图的副本上计算，不影响修改
+        for button in (self.add_edge_button, self.import_file_button, self.import_clipboard_button, self.load_button,
+                       self.save_button, self.build_index_button):
+            button.setEnabled(not locked)
+
+    def path_index_filename(self):
+        return self.graph_filename + '.alt.npz' if self.graph_filename else None
+
+    def load_path_index(self):
+        # 若图文件旁有与之匹配的加速索引则直接使用
+        index_filename = self.path_index_filename()
+        if index_filename and os.path.exists(index_filename):
+            self.jobs.submit('index', self.read_path_index, index_filename, self.graph_version,
+                             on_result=self.show_index_loaded)
+
+    def read_path_index(self, index_filename, version, progress=None):
+        report(progress, 0.0, '正在加载加速索引')
+        csr = self.path_engine.frozen(self.graph, version)
+        index = LandmarkIndex.load(index_filename, csr)
+        if index is None:
+            return None
+        self.path_engine.attach_landmarks(index, version)
+        return index_filename
+
+    def show_index_loaded(self, index_filename):
+        if index_filename:
+            self.result_label.setText(f'已加载加速索引 {index_filename}')
+
+    def build_path_index(self):
+        self.tracer.action('构建加速索引')
+        if self.graph.number_of_nodes() == 0:
+            self.result_label.setText('图为空，无需构建索引。')
+            return
 
-        # Draw the graph in the first subplot (原始图)
-        nx.draw(self.graph, pos, with_labels=True, node_size=500, node_color='lightblue', font_size=10, ax=self.axs[0])
+        self.jobs.submit('index', self.compute_path_index, self.graph_version, on_result=self.show_index_report)
+
+    def compute_path_index(self, version, progress=None):
+        csr = self.path_engine.frozen(self.graph, version)
+        index = LandmarkIndex.build(csr, progress=progress)
+        self.path_engine.attach_landmarks(index, version)
+        index_filename = self.path_index_filename()
+        if index_filename:
+            index.save(index_filename)
+        report(progress, 1.0, '正在对比查询速度')
+        return compare_with_networkx(self.graph, csr, index)
+
+    def show_index_report(self, summary):
+        self.result_label.setText(
+            f'索引构建用时 {summary["build_seconds"]:.2f} 秒，大小 {summary["index_bytes"] / 2 ** 20:.1f} MB，'
+            f'单次查询 {summary["index_seconds"] * 1000:.2f} 毫秒，'
+            f'相比 nx.dijkstra_path 加速 {summary["speedup"]:.1f} 倍'
+        )
+
+    def invalidate_layout(self, nodes):
+        # 修改图后正在计算的布局对应旧图，直接作废，由合并后的重绘重新提交
+        self.layout_cache.invalidate(nodes)
+        self.jobs.cancel('layout')
 
-        # Draw edge labels (weights) in the first subplot
+    def update_graph_visualization(self):
+        # 布局在后台基于图的副本计算（期间仍可修改图），完成后回到界面线程绘制；大图布局的收敛过程也随时显示
+        self.jobs.submit('layout', self.layout_cache.positions, self.graph.copy(), self.graph_version, locks=False,
+                         on_result=lambda pos, version=self.graph_version: self.set_positions(pos, version),
+                         on_partial=self.draw_graph)
+
+    def set_positions(self, pos, version):
+        self.pos, self.pos_version = pos, version
+        self.draw_graph(pos)
+        if self.pending_paths is not None:
+            paths, self.pending_paths = self.pending_paths, None
+            self.highlight_paths(paths)
+
+    def draw_graph(self, pos):
+        # Draw the graph in the first subplot (原始图) with edge labels (weights)，清空搜索结果。
+        # 同一图版本已画过底图（布局的中间结果）时只移动节点，保留用户当前的视口
+        if self.views[0].version == self.graph_version:
+            self.views[0].update_positions(pos)
+            return
         edge_labels = nx.get_edge_attributes(self.graph, 'weight')
-        nx.draw_networkx_edge_labels(self.graph, pos, edge_labels=edge_labels, ax=self.axs[0])
-
-        # Refresh the canvas to display the new plot
-        self.canvas.draw()
+        self.views[0].set_graph(self.graph, pos, edge_labels=edge_labels, version=self.graph_version)
+        self.views[1].clear()
 
     def find_shortest_path(self):
         # Get start and end nodes
+        self.tracer.action('寻找最短路径')
         start_node = self.start_node_input.text()
         end_node = self.end_node_input.text()
 
@@ -180,41 +374,94 @@ class ShortestPathApp(QWidget):
             self.result_label.setText('起始节点或终点节点不在图中。')
             return
 
-        # Find the shortest path using Dijkstra's algorithm
-        try:
-            path = nx.dijkstra_path(self.graph, source=start_node, target=end_node, weight='weight')
-            distance = nx.dijkstra_path_length(self.graph, source=start_node, target=end_node, weight='weight')
+        # Find the shortest path using Dijkstra's algorithm (一次搜索同时得到路径和距离)，
+        # 在后台线程中进行；再次点击会取代尚未完成的查询
+        self.jobs.submit('query', self.path_engine.shortest_path, self.graph, self.graph_version, start_node,
+                         end_node, on_result=self.show_shortest_path,
+                         on_error=lambda e: self.show_query_error(e, start_node, end_node))
+
+    def show_shortest_path(self, result):
+        path, distance = result
+        self.result_label.setText(f'最短路径: {path}, 距离: {distance}')
 
-            self.result_label.setText(f'最短路径: {path}, 距离: {distance}')
+        # Highlight edges in the shortest path
+        self.highlight_paths([path])
+
+    def find_one_to_many(self):
+        self.tracer.action('一对多查询')
+        start_node = self.start_node_input.text()
+        if start_node not in self.graph:
+            self.result_label.setText('起始节点不在图中。')
+            return
 
-            # Clear the result graph before drawing the new one
-            self.axs[1].clear()
+        # 终点留空时查询全部节点，结果表只保存距离，路径在显示或选中时才回溯
+        text = self.end_node_input.text().replace('，', ',')
+        targets = [node.strip() for node in text.split(',') if node.strip()] or None
+        missing = [node for node in targets or () if node not in self.graph]
+        if missing:
+            self.result_label.setText(f'以下终点节点不在图中：{", ".join(missing[:10])}')
+            return
 
-            # Redraw the graph in the second subplot (搜索结果)
-            pos = nx.spring_layout(self.graph)
-            nx.draw(self.graph, pos, with_labels=True, node_size=500, node_color='lightblue', font_size=10,
-                    ax=self.axs[1])
+        # 一次单源搜索得到的最短路径树同时回答所有终点
+        self.jobs.submit('query', self.path_engine.one_to_many, self.graph, self.graph_version, start_node, targets,
+                         on_result=self.show_one_to_many,
+                         on_error=lambda e: self.show_query_error(e, start_node, '各终点'))
 
-            # Highlight edges in the shortest path
-            edges_to_highlight = [(path[i], path[i + 1]) for i in range(len(path) - 1)]
-            nx.draw_networkx_edges(self.graph, pos, edgelist=edges_to_highlight, edge_color='red', width=2,
-                                   ax=self.axs[1])
+    def show_one_to_many(self, results):
+        self.result_label.setText(f'一对多查询：{len(results)} 个终点中 {results.reachable} 个可达')
+        self.show_path_rows(results)
 
-            # Draw edge labels again to make sure they are visible
-            edge_labels = nx.get_edge_attributes(self.graph, 'weight')
-            nx.draw_networkx_edge_labels(self.graph, pos, edge_labels=edge_labels, ax=self.axs[1])
+    def find_k_shortest_paths(self):
+        self.tracer.action('前 k 条路径')
+        start_node = self.start_node_input.text()
+        end_node = self.end_node_input.text()
 
-            # Refresh the canvas to display the highlighted path
-            self.canvas.draw()
+        if start_node not in self.graph or end_node not in self.graph:
+            self.result_label.setText('起始节点或终点节点不在图中。')
+            return
 
-        except nx.NetworkXNoPath:
+        self.jobs.submit('query', self.path_engine.k_shortest_paths, self.graph, self.graph_version, start_node,
+                         end_node, self.k_paths_input.value(),
+                         on_result=lambda paths: self.show_k_shortest_paths(paths, end_node),
+                         on_error=lambda e: self.show_query_error(e, start_node, end_node))
+
+    def show_k_shortest_paths(self, paths, end_node):
+        self.result_label.setText(f'共找到 {len(paths)} 条路径，最短距离: {paths[0][1]}')
+        self.show_path_rows(PathList([(end_node, distance, path) for path, distance in paths]))
+
+    def show_path_rows(self, results):
+        self.path_table.set_result(results)
+        self.path_table.show()
+        self.highlight_paths(self.path_table.top_paths(self.TOP_PATHS))
+
+    def highlight_paths(self, paths):
+        # 搜索结果子图的底图（与原始图使用相同的节点坐标）每个图版本只画一次，之后的查询只更新高亮路径覆盖层。
+        # 单条路径画成红色，多条路径依次使用不同颜色
+        if self.pos_version != self.graph_version:
+            self.pending_paths = paths
+            return
+        if self.views[1].version != self.graph_version:
+            edge_labels = nx.get_edge_attributes(self.graph, 'weight')
+            self.views[1].set_graph(self.graph, self.pos, edge_labels=edge_labels, version=self.graph_version)
+
+        edges, colors = [], []
+        for i, path in enumerate(paths):
+            color = 'red' if len(paths) == 1 else cm.tab10(i % 10)
+            for u, v in zip(path, path[1:]):
+                edges.append((u, v))
+                colors.append(color)
+        self.views[1].set_overlay(highlight=edges, highlight_colors=colors)
+
+    def show_query_error(self, error, start_node, end_node):
+        if isinstance(error, nx.NetworkXNoPath):
             self.result_label.setText(f'从 {start_node} 到 {end_node} 没有路径。')
+        else:
+            self.result_label.setText(f'查找最短路径时出错：{error}')
 
     def clear_plots(self):
         # Initialize empty graphs (show only titles initially)
-        for ax in self.axs:
-            ax.clear()
-            ax.set_axis_off()  # Hide axis and ticks
+        for view in self.views:
+            view.clear()  # Hide axis and ticks
         self.canvas.draw()
 
 
@@ -1,13 +1,24 @@
 import sys
-import networkx as nx
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+from matplotlib import cm
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QLabel, \
-    QFileDialog, QMessageBox
+    QFileDialog, QMessageBox, QSpinBox
 from PyQt5.QtGui import QColor
-import json
 import matplotlib
 
+from graph_core.chromatic_index import TIME_BUDGET, chromatic_index
+from graph_core.edge_coloring import EdgeColoring, max_degree, minimize_edge_colors, misra_gries_edge_coloring
+from graph_core.edge_import import EdgeListError, parse_edge_list, read_edge_list_file
+from graph_core.graph_io import FILE_FILTER, load_graph_file, save_graph_file
+from graph_core.graph_store import GraphStore, StoreGraph, store_of
+from graph_core.layout import LayoutCache
+from graph_core.tracing import Tracer
+from graph_ui.graph_view import GraphView
+from graph_ui.jobs import JobRunner, JobStatusBar
+from graph_ui.redraw import Debouncer
+from graph_ui.tracing import TracePanel, TracedCanvas
+
 # Set up matplotlib to support Chinese
 matplotlib.rcParams['font.sans-serif'] = ['SimHei']  # Use SimHei font for Chinese characters
 matplotlib.rcParams['axes.unicode_minus'] = False  # Ensure minus signs are shown correctly
@@ -17,8 +28,22 @@ class EdgeColoringApp(QWidget):
     def __init__(self):
         super().__init__()
 
-        # Initialize the graph
-        self.graph = nx.Graph()
+        # Initialize the graph（建立在紧凑图存储上，着色结果存在其 color 列中）
+        self.graph = StoreGraph()
+        self.graph_version = 0  # 图每次变化时递增，用于判断缓存是否过期
+        self.layout_cache = LayoutCache()
+        # 布局任务最终给出的节点坐标及其图版本。LayoutCache 可能正被后台的布局任务使用，界面线程只读这里的坐标
+        self.pos = {}
+        self.pos_version = None
+        # 最近一次的着色结果，之后加边时在其上增量维护
+        self.coloring = None
+        # 布局与边着色计算放到后台线程，界面线程只负责绘制
+        # 记录每次操作各阶段的耗时，可在性能统计栏中查看或导出
+        self.tracer = Tracer()
+        self.jobs = JobRunner(self, tracer=self.tracer)
+        self.jobs.locked_changed.connect(self.set_editing_enabled)
+        # 连续加边时合并为一次重绘
+        self.redraw = Debouncer(self.update_graph_visualization, parent=self)
 
         # UI setup
         self.setWindowTitle('图边着色分析软件')
@@ -42,6 +67,15 @@ class EdgeColoringApp(QWidget):
         self.add_edge_button.clicked.connect(self.add_edge)
         input_layout.addWidget(self.add_edge_button)
 
+        # Bulk import (批量导入边，每行 “头节点,尾节点”)
+        self.import_file_button = QPushButton('从文件导入边', self)
+        self.import_file_button.clicked.connect(self.import_edges_from_file)
+        input_layout.addWidget(self.import_file_button)
+
+        self.import_clipboard_button = QPushButton('从剪贴板导入边', self)
+        self.import_clipboard_button.clicked.connect(self.import_edges_from_clipboard)
+        input_layout.addWidget(self.import_clipboard_button)
+
         layout.addLayout(input_layout)
 
         # Input for number of colors
@@ -64,9 +98,43 @@ class EdgeColoringApp(QWidget):
         self.apply_coloring_button.clicked.connect(self.apply_edge_coloring)
         layout.addWidget(self.apply_coloring_button)
 
+        # Exact chromatic index within a time budget (在时间预算内求边色数)
+        exact_layout = QHBoxLayout()
+        self.time_budget_input = QSpinBox(self)
+        self.time_budget_input.setRange(1, 3600)
+        self.time_budget_input.setValue(int(TIME_BUDGET))
+        self.time_budget_input.setPrefix('时间预算 ')
+        self.time_budget_input.setSuffix(' 秒')
+        exact_layout.addWidget(self.time_budget_input)
+
+        self.chromatic_index_button = QPushButton('求边色数', self)
+        self.chromatic_index_button.clicked.connect(self.find_chromatic_index)
+        exact_layout.addWidget(self.chromatic_index_button)
+
+        # 从 Δ + 1 色方案出发自动减少颜色数，不必手动猜测边色数
+        self.auto_coloring_button = QPushButton('自动着色', self)
+        self.auto_coloring_button.clicked.connect(self.auto_edge_coloring)
+        exact_layout.addWidget(self.auto_coloring_button)
+        layout.addLayout(exact_layout)
+
+        # Result display
+        self.result_label = QLabel('结果：', self)
+        layout.addWidget(self.result_label)
+
+        # Progress of background jobs (后台任务进度与取消)
+        self.job_status = JobStatusBar(self.jobs, self)
+        layout.addWidget(self.job_status)
+        self.trace_panel = TracePanel(self.tracer, self)
+        layout.addWidget(self.trace_panel)
+
         # Create Matplotlib figure and canvas for visualization
-        self.fig, self.axs = plt.subplots(1, 2, figsize=(12, 6))  # Create two subplots
-        self.canvas = FigureCanvas(self.fig)
+        # 直接创建 Figure 而不经过 pyplot，启动时不必加载 pyplot 及其全局图形管理
+        self.fig = Figure(figsize=(12, 6))
+        self.axs = self.fig.subplots(1, 2)  # Create two subplots
+        self.canvas = TracedCanvas(self.fig, self.tracer)
+        # 大图按视口分层次绘制，可用工具栏或滚轮平移、缩放
+        self.views = [GraphView(ax, self.canvas) for ax in self.axs]
+        self.toolbar = NavigationToolbar(self.canvas, self)
 
         # Create two labels for the titles
         self.title_label_1 = QLabel('原始图', self)
@@ -82,6 +150,9 @@ class EdgeColoringApp(QWidget):
         self.title_label_2.setAutoFillBackground(True)
         self.title_label_2.setStyleSheet("background-color: lightblue; font-size: 16px;")
 
+        # Pan/zoom toolbar (平移、缩放)
+        layout.addWidget(self.toolbar)
+
         # Create layout for the two regions with some space between them
         graph_layout = QHBoxLayout()
         graph_layout.addWidget(self.canvas)
@@ -101,6 +172,7 @@ class EdgeColoringApp(QWidget):
 
     def add_edge(self):
         # Add an edge to the graph
+        self.tracer.action('添加边')
         head_node = self.head_node_input.text()
         tail_node = self.tail_node_input.text()
 
@@ -109,32 +181,96 @@ class EdgeColoringApp(QWidget):
             return
 
         self.graph.add_edge(head_node, tail_node)
+        self.graph_version += 1
+        self.invalidate_layout([head_node, tail_node])
         self.head_node_input.clear()
         self.tail_node_input.clear()
-        self.update_graph_visualization()
+        self.recolor([(head_node, tail_node)])
+        self.redraw.request()
+
+    def import_edges_from_file(self):
+        filename, _ = QFileDialog.getOpenFileName(self, '导入边列表', '', '边列表文件 (*.csv *.tsv *.txt);;所有文件 (*)')
+        if filename:
+            self.import_edges(filename=filename)
+
+    def import_edges_from_clipboard(self):
+        self.import_edges(QApplication.clipboard().text())
+
+    def import_edges(self, text=None, filename=None):
+        # 整体校验后一次性加入图中，只触发一次重绘；给出 filename 时从文件读取，读取失败与格式错误一样提示
+        self.tracer.action('导入边')
+        try:
+            if filename is not None:
+                text = read_edge_list_file(filename)
+            heads, tails, _ = parse_edge_list(text)
+        except EdgeListError as e:
+            QMessageBox.warning(self, '导入失败', str(e))
+            return
+
+        self.graph.add_edges_from(zip(heads, tails))
+        self.graph_version += 1
+        self.invalidate_layout(set(heads) | set(tails))
+        self.recolor(zip(heads, tails))
+        self.redraw.request()
+
+    def recolor(self, edges):
+        # 已着色时随加边增量维护着色：新边两端有共同空闲色时直接使用，否则只调整一端的扇形和一条交错路径，
+        # 结果图中只重画颜色有变化的边
+        if self.coloring is None:
+            return
+        try:
+            for u, v in edges:
+                self.coloring.add_edge(u, v)
+        except ValueError as e:
+            # 自环无法着色，放弃已有的着色结果
+            self.coloring = None
+            self.result_label.setText(f'结果：{e}')
+            return
+        changed = self.coloring.take_changed()
+        self.store_colors({(u, v): c for u, v, c in changed})
+        self.views[1].patch_overlay({(u, v): cm.tab20(c / 20) for u, v, c in changed},
+                                    {(u, v): c for u, v, c in changed})
 
     def load_graph(self):
-        # Load graph from JSON
-        filename, _ = QFileDialog.getOpenFileName(self, '打开图文件', '', 'JSON Files (*.json)')
+        # Load graph from JSON (流式解析) or .gbin (内存映射)
+        self.tracer.action('加载图')
+        filename, _ = QFileDialog.getOpenFileName(self, '打开图文件', '', FILE_FILTER)
 
         if filename:
-            with open(filename, 'r') as f:
-                data = json.load(f)
-                self.graph = nx.node_link_graph(data)
-                self.update_graph_visualization()
+            self.jobs.submit('file', load_graph_file, filename, on_result=self.set_graph,
+                             on_error=lambda e: QMessageBox.warning(self, '错误', f'加载图失败：{e}'))
+
+    def set_graph(self, graph):
+        if store_of(graph) is None:
+            # 颜色保存在图存储的 color 列中，有向图按无向图着色
+            source = graph
+            graph = GraphStore.from_networkx(graph.to_undirected(as_view=True) if graph.is_directed() else graph).networkx()
+            graph.graph.update(source.graph)
+        self.graph = graph
+        self.graph_version += 1
+        self.coloring = None
+        self.layout_cache.invalidate()
+        self.update_graph_visualization()
 
     def save_graph(self):
-        # Save graph to JSON
-        filename, _ = QFileDialog.getSaveFileName(self, '保存图文件', '', 'JSON Files (*.json)')
+        # Save graph to JSON or .gbin
+        self.tracer.action('保存图')
+        filename, _ = QFileDialog.getSaveFileName(self, '保存图文件', '', FILE_FILTER)
 
         if filename:
-            data = nx.node_link_data(self.graph)
-            with open(filename, 'w') as f:
-                json.dump(data, f)
+            self.jobs.submit('file', save_graph_file, self.graph, filename,
+                             on_error=lambda e: QMessageBox.warning(self, '错误', f'保存图失败：{e}'))
 
     from PyQt5.QtWidgets import QMessageBox
 
+    def set_editing_enabled(self, locked):
+        # 读取图的后台任务运行期间禁止修改图；布局任务在图的副本上计算，不影响修改
+        for button in (self.add_edge_button, self.import_file_button, self.import_clipboard_button, self.load_button,
+                       self.save_button):
+            button.setEnabled(not locked)
+
     def apply_edge_coloring(self):
+        self.tracer.action('边着色')
         try:
             # 检查是否输入边色数
             num_colors_text = self.num_colors_input.text()
@@ -146,119 +282,135 @@ class EdgeColoringApp(QWidget):
             if num_colors <= 0:
                 raise ValueError("边色数必须大于0。")
 
-            # 调用边着色函数
-            success = self.edge_coloring(num_colors)
-            if not success:
-                QMessageBox.warning(self, "警告", "无可行的边着色方案！")
-                return
-
-            # 更新着色结果
-            self.make_color_result()
+            # 在后台线程中调用边着色函数，再次点击会取代尚未完成的计算
+            self.requested_colors = num_colors
+            self.jobs.submit('coloring', self.edge_coloring, num_colors, on_result=self.show_coloring_result,
+                             on_error=lambda e: QMessageBox.warning(self, "错误", f"错误: {e}"))
 
         except ValueError as e:
             QMessageBox.warning(self, "错误", f"错误: {e}")
 
-    def edge_coloring(self, num_colors):
-        # 初始化边的颜色为未着色
-        self.edge_colors = {edge: -1 for edge in self.graph.edges}  # -1 表示未着色
-
-        # 使用贪心算法尝试为边着色
-        for edge in self.graph.edges:
-            available_colors = [True] * num_colors
-
-            # 检查相邻边的颜色
-            for neighbor in self.graph.neighbors(edge[0]):
-                if (edge[0], neighbor) in self.edge_colors:
-                    color = self.edge_colors[(edge[0], neighbor)]
-                    if color != -1:
-                        available_colors[color] = False
-                if (neighbor, edge[0]) in self.edge_colors:
-                    color = self.edge_colors[(neighbor, edge[0])]
-                    if color != -1:
-                        available_colors[color] = False
-
-            for neighbor in self.graph.neighbors(edge[1]):
-                if (edge[1], neighbor) in self.edge_colors:
-                    color = self.edge_colors[(edge[1], neighbor)]
-                    if color != -1:
-                        available_colors[color] = False
-                if (neighbor, edge[1]) in self.edge_colors:
-                    color = self.edge_colors[(neighbor, edge[1])]
-                    if color != -1:
-                        available_colors[color] = False
-
-            # 找到可用颜色
-            found_color = False
-            for color in range(num_colors):
-                if available_colors[color]:
-                    self.edge_colors[edge] = color
-                    found_color = True
-                    break
-
-            if not found_color:
-                return False  # 无法为某条边找到可用颜色
-
-        return True  # 所有边着色成功
+    def show_coloring_result(self, coloring):
+        if coloring is None:
+            delta = max_degree(self.graph)
+            if self.requested_colors < delta:
+                QMessageBox.warning(self, "警告", f"无可行的边着色方案！边色数不小于最大度 {delta}。")
+            else:
+                QMessageBox.warning(self, "警告", f"未找到 {delta} 种颜色的边着色方案，{delta + 1} 种颜色一定可行。")
+            return
 
-    def make_color_result(self):
-        self.axs[1].clear()
-        self.axs[1].set_axis_off()  # 隐藏坐标轴
-
-        # 使用 spring 布局安排节点
-        pos = nx.spring_layout(self.graph)
-
-        # 提取边的颜色和标签
-        edge_colors = [plt.cm.tab20(self.edge_colors.get(e, 0) / 20) for e in self.graph.edges]  # 映射颜色
-        edge_labels = {e: self.edge_colors.get(e, 0) for e in self.graph.edges}  # 颜色编号作为标签
-
-        # 绘制图形节点和边
-        nx.draw(
-            self.graph,
-            pos,
-            with_labels=True,
-            node_size=500,
-            node_color='lightblue',
-            font_size=10,
-            ax=self.axs[1],
-            edge_color=edge_colors,
-        )
-
-        # 绘制边的标签
-        nx.draw_networkx_edge_labels(
-            self.graph,
-            pos,
-            edge_labels=edge_labels,
-            font_color="black",  # 标签字体颜色
-            font_size=10,
-            ax=self.axs[1],
-        )
-
-        # 刷新画布
-        self.canvas.draw()
+        # 在界面线程中保存并更新着色结果
+        self.coloring = coloring
+        self.store_colors(coloring.edge_colors(self.graph))
+        self.result_label.setText(f'结果：{self.requested_colors} 种颜色的边着色方案')
+        self.make_color_result()
 
-    def update_graph_visualization(self):
-        # Clear previous plot
-        for ax in self.axs:
-            ax.clear()
+    def find_chromatic_index(self):
+        self.tracer.action('求边色数')
+        if not self.graph.number_of_edges():
+            QMessageBox.warning(self, "警告", "图中没有边！")
+            return
+        self.jobs.submit('coloring', chromatic_index, self.graph, self.time_budget_input.value(),
+                         on_result=self.show_chromatic_index,
+                         on_error=lambda e: QMessageBox.warning(self, "错误", f"错误: {e}"))
+
+    def auto_edge_coloring(self):
+        self.tracer.action('自动着色')
+        if not self.graph.number_of_edges():
+            QMessageBox.warning(self, "警告", "图中没有边！")
+            return
+        self.jobs.submit('coloring', minimize_edge_colors, self.graph, self.time_budget_input.value(),
+                         on_result=self.show_auto_coloring,
+                         on_error=lambda e: QMessageBox.warning(self, "错误", f"错误: {e}"))
+
+    def show_auto_coloring(self, result):
+        coloring, steps = result
+        # 逐个列出尝试过的颜色数及其用时
+        parts = [f'{k} 色 {seconds:.2f} 秒' + ('' if ok else '（未找到）') for k, seconds, ok in steps]
+        self.result_label.setText(f'结果：{coloring.num_colors} 种颜色（' + ' → '.join(parts) + '）')
+        self.num_colors_input.setText(str(coloring.num_colors))
+        self.coloring = coloring
+        self.store_colors(coloring.edge_colors(self.graph))
+        self.make_color_result()
+
+    def show_chromatic_index(self, result):
+        if result.exact:
+            text = f'边色数 = {result.num_colors}（{result.method}）'
+        else:
+            # 未在预算内得出结论：给出已证明的下界和找到的最好方案
+            text = f'边色数在 {result.lower_bound} 与 {result.num_colors} 之间（{result.method}），已显示 {result.num_colors} 色方案'
+        self.result_label.setText(f'结果：{text}，用时 {result.elapsed:.2f} 秒')
+        self.store_colors(result.edge_colors)
+        self.coloring = EdgeColoring.from_colors(self.graph, result.edge_colors)
+        self.make_color_result()
+
+    def edge_coloring(self, num_colors, progress=None):
+        # 在后台线程中运行，只计算不修改界面状态，返回着色方案，失败时返回 None。
+        # 着色算法在 graph_core.edge_coloring 中，不依赖界面。
+        # Misra–Gries 至多使用 最大度 + 1 种颜色，因此只有颜色数少于最大度（一定不可行）
+        # 或恰好等于最大度而构造出的方案多用了一种颜色时才会失败
+        if num_colors < max_degree(self.graph):
+            return None
+        coloring = misra_gries_edge_coloring(self.graph, progress)
+        if coloring.num_colors > num_colors:
+            return None
+        return coloring
+
+    def store_colors(self, edge_colors):
+        # 把 {边: 颜色编号} 写入图存储的 color 列，不另外保存按边元组索引的字典
+        store = self.graph.store
+        store.set_values('color', store.edge_ids(edge_colors), list(edge_colors.values()))
+
+    def make_color_result(self):
+        # 底图每个图版本只画一次（使用缓存的 spring 布局，与原始图保持一致），重新着色只更新覆盖层
+        if self.pos_version != self.graph_version:
+            # 布局尚未完成，完成后 draw_graph 会按新坐标画出着色结果
+            return
+        if self.views[1].version != self.graph_version:
+            self.views[1].set_graph(self.graph, self.pos, version=self.graph_version)
 
-        # Remove any borders, ticks, etc.
-        for ax in self.axs:
-            ax.set_axis_off()  # Hide axis and ticks
+        # 按 graph.edges 的顺序取出 color 列，未着色的边按颜色 0 显示
+        colors = self.graph.store.edge_values('color', 0)
+        edge_colors = cm.tab20(colors / 20)  # 映射颜色
+        edge_labels = dict(zip(self.graph.edges, colors.tolist()))  # 颜色编号作为标签
 
-        # Create a layout for nodes
-        pos = nx.spring_layout(self.graph)  # Use spring layout for node positioning
+        # 绘制着色后的边和边的标签
+        self.views[1].set_overlay(edge_colors=edge_colors, edge_labels=edge_labels)
 
-        # Draw the graph in the first subplot (原始图)
-        nx.draw(self.graph, pos, with_labels=True, node_size=500, node_color='lightblue', font_size=10, ax=self.axs[0])
+    def invalidate_layout(self, nodes):
+        # 修改图后正在计算的布局对应旧图，直接作废，由合并后的重绘重新提交
+        self.layout_cache.invalidate(nodes)
+        self.jobs.cancel('layout')
 
-        # Refresh the canvas to display the new plot
-        self.canvas.draw()
+    def update_graph_visualization(self):
+        # 布局在后台基于图的副本计算（期间仍可修改图），完成后回到界面线程绘制；大图布局的收敛过程在原始图中随时显示
+        self.jobs.submit('layout', self.layout_cache.positions, self.graph.copy(), self.graph_version, locks=False,
+                         on_result=lambda pos, version=self.graph_version: self.set_positions(pos, version),
+                         on_partial=self.draw_partial)
+
+    def set_positions(self, pos, version):
+        self.pos, self.pos_version = pos, version
+        self.draw_graph(pos)
+
+    def draw_partial(self, pos):
+        # 同一图版本只画一次底图，之后只移动节点，保留用户当前的视口
+        if self.views[0].version == self.graph_version:
+            self.views[0].update_positions(pos)
+        else:
+            self.views[0].set_graph(self.graph, pos, version=self.graph_version)
+
+    def draw_graph(self, pos):
+        # Draw the graph in the first subplot (原始图)；着色结果已随加边增量更新，按新布局整体重画一次，没有着色时清空
+        self.draw_partial(pos)
+        if self.coloring is None:
+            self.views[1].clear()
+        else:
+            self.make_color_result()
 
     def clear_plots(self):
         # Initialize empty graphs (show only titles initially)
-        for ax in self.axs:
-            ax.clear()
-            ax.set_axis_off()  # Hide axis and ticks
+        for view in self.views:
+            view.clear()  # Hide axis and ticks
         self.canvas.draw()
 
 